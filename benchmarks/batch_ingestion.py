@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict
+
+import httpx
+
+from benchmarks.results import save_results
+from main import app
+from storage.sqlite_store import SQLiteStore
+
+CREATE_ACTIVITY_MUTATION = "mutation($name: String!) { createActivity(name: $name) }"
+CREATE_ACTIVITY_BATCH_MUTATION = ("mutation($items: [ActivityInput!]!) "
+                                  "{ createActivityBatch(items: $items) { id error } }")
+
+
+async def ingest_per_item(client: httpx.AsyncClient, items: int) -> float:
+    start = time.perf_counter()
+    for index in range(items):
+        response = await client.post("/graphql", json={"query": CREATE_ACTIVITY_MUTATION,
+                                                       "variables": {"name": f"activity-{index}"}})
+        if "errors" in response.json():
+            raise Exception(f"Per-item ingestion failed: {response.json()['errors']}")
+    return time.perf_counter() - start
+
+
+async def ingest_in_batches(client: httpx.AsyncClient, items: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    for batch_start in range(0, items, batch_size):
+        batch = [{"name": f"activity-{index}", "additionalParameters": [{"key": "index", "value": str(index)}]}
+                 for index in range(batch_start, min(batch_start + batch_size, items))]
+        response = await client.post("/graphql", json={"query": CREATE_ACTIVITY_BATCH_MUTATION,
+                                                       "variables": {"items": batch}})
+        if "errors" in response.json():
+            raise Exception(f"Batch ingestion failed: {response.json()['errors']}")
+    return time.perf_counter() - start
+
+
+async def run_benchmark(items: int, batch_size: int) -> Dict:
+    store = SQLiteStore(database_path=os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"))
+    await store.open()
+    app.state.repositories = store.create_repositories()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            per_item_time = await ingest_per_item(client, items)
+            batch_time = await ingest_in_batches(client, items, batch_size)
+    finally:
+        await store.close()
+    return {"items": items, "batch_size": batch_size,
+            "per_item": {"seconds": per_item_time, "items_per_second": items / per_item_time},
+            "batch": {"seconds": batch_time, "items_per_second": items / batch_time},
+            "speedup": per_item_time / batch_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares per-item and batch ingestion throughput of Activities.")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    save_results("batch_ingestion", asyncio.run(run_benchmark(arguments.items, arguments.batch_size)),
+                 arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.results import get_percentiles, save_results
+from storage.repository import ReferenceFilter
+from storage.sqlite_store import SQLiteStore
+from storage.tables import TableDefinition
+
+DATASET_SIZES = [1000, 10000, 100000]
+ACTIVITY_COUNT = 100
+
+
+def create_tables(indexed: bool) -> List[TableDefinition]:
+    # The layout the generator emits for an Activity with a duration and an ActivityExecution referencing it.
+    return [TableDefinition(name="activity", scalar_columns=("duration",),
+                            indexed_columns=("duration",) if indexed else ()),
+            TableDefinition(name="activity_execution", reference_columns=("has_activity_id",),
+                            scalar_columns=("duration",),
+                            indexed_columns=("has_activity_id", "duration") if indexed else ())]
+
+
+async def seed_store(store: SQLiteStore, executions: int, randomizer: random.Random) -> List[str]:
+    repositories = store.create_table_repositories()
+    activities = await repositories["activity"].create_many(
+        [{"name": f"activity-{index}", "additional_parameters": (), "duration": float(index)}
+         for index in range(ACTIVITY_COUNT)])
+    await repositories["activity_execution"].create_many(
+        [{"name": f"execution-{index}", "additional_parameters": (("index", str(index)),),
+          "has_activity_id": randomizer.choice(activities), "duration": float(index)} for index in range(executions)])
+    return activities
+
+
+async def measure_filter(repository, get_filters, requests: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(requests):
+        filters, additional_parameters = get_filters()
+        start = time.perf_counter()
+        await repository.find(filters, additional_parameters, after_id=None, limit=20)
+        latencies.append(time.perf_counter() - start)
+    return get_percentiles(latencies)
+
+
+async def benchmark_dataset(executions: int, indexed: bool, requests: int) -> Dict:
+    randomizer = random.Random(0)
+    store = SQLiteStore(database_path=os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"),
+                        tables=create_tables(indexed))
+    await store.open()
+    try:
+        activities = await seed_store(store, executions, randomizer)
+        repository = store.create_table_repositories()["activity_execution"]
+        filters = {
+            "scalar": lambda: ({"duration": float(randomizer.randrange(executions))}, []),
+            "reference": lambda: ({"has_activity_id": randomizer.choice(activities)}, []),
+            "referenced_scalar": lambda: ({"has_activity_id": ReferenceFilter(
+                table="activity", filters={"duration": float(randomizer.randrange(ACTIVITY_COUNT))})}, []),
+            "additional_parameter": lambda: ({}, [("index", str(randomizer.randrange(executions)))]),
+        }
+        return {"executions": executions, "indexed": indexed,
+                "latency": {name: await measure_filter(repository, get_filters, requests)
+                            for name, get_filters in filters.items()}}
+    finally:
+        await store.close()
+
+
+async def run_benchmark(sizes: List[int], requests: int) -> List[Dict]:
+    return [await benchmark_dataset(executions, indexed, requests) for executions in sizes for indexed in (True, False)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the latency of filtered lookups on generated tables with "
+                                                 "and without the generated secondary indexes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DATASET_SIZES)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    save_results("filtered_queries", asyncio.run(run_benchmark(arguments.sizes, arguments.requests)),
+                 arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mapping"))
+
+from benchmarks.ontology_fixtures import create_synthetic_ontology
+from benchmarks.results import save_results
+import generate_schema
+from generate_schema import generate_graphql_schema
+from generate_types import get_ontology_module_name, map_owl_file, order_graphql_types, process_owl_file
+
+FIXTURE_SIZES = [100, 1000, 10000]
+
+
+@contextmanager
+def working_directory(directory: str) -> Iterator[None]:
+    previous_directory = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(previous_directory)
+
+
+def measure(function, *arguments, **keyword_arguments):
+    start = time.perf_counter()
+    result = function(*arguments, **keyword_arguments)
+    return time.perf_counter() - start, result
+
+
+def benchmark_fixture(class_count: int, repeats: int) -> Dict:
+    fixture_directory = tempfile.mkdtemp()
+    fixture_path = create_synthetic_ontology(fixture_directory, class_count)
+    with open(fixture_path, 'r') as fixture_file:
+        fixture = fixture_file.read()
+    process_times, order_times, emission_times = [], [], []
+    for repeat in range(repeats):
+        # owlready2 keeps loaded ontologies, so each repeat reads a copy under its own IRI to parse the file again.
+        owl_file_path = os.path.join(fixture_directory, f"Synthetic{class_count}Repeat{repeat}.owl")
+        with open(owl_file_path, 'w') as owl_file:
+            owl_file.write(fixture.replace(f"Synthetic{class_count}.owl", f"Synthetic{class_count}Repeat{repeat}.owl"))
+        process_time, graphql_types = measure(process_owl_file, owl_file_path)
+        process_times.append(process_time)
+        mapped_types = map_owl_file(owl_file_path)
+        order_times.append(measure(order_graphql_types, mapped_types)[0])
+        # Every repeat emits into a clean directory, so the incremental manifest does not skip any class.
+        with working_directory(tempfile.mkdtemp()), open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            emission_times.append(measure(generate_graphql_schema,
+                                          [dict(graphql_type, module=get_ontology_module_name(owl_file_path))
+                                           for graphql_type in graphql_types])[0])
+    return {"classes": class_count, "fixture_bytes": os.path.getsize(fixture_path),
+            "process_owl_file_seconds": min(process_times), "order_graphql_types_seconds": min(order_times),
+            "emission_seconds": min(emission_times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times mapping, ordering and emission on synthetic ontologies.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=FIXTURE_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    # The snapshot imports the emitted modules into strawberry, which is timed by the startup benchmark instead.
+    generate_schema.GENERATE_SCHEMA_SNAPSHOT = False
+    results: List[Dict] = [benchmark_fixture(class_count, arguments.repeats) for class_count in arguments.sizes]
+    save_results("generation", results, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
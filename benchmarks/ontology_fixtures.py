@@ -0,0 +1,86 @@
+import os
+import random
+from typing import Dict, Tuple
+
+from owlready2 import DataProperty, ObjectProperty, Thing, World, types
+
+DATA_PROPERTY_TYPES = [int, float, str, bool]
+MAX_INTERFACES = 2
+MAX_FIELDS = 6
+PROPERTY_COUNT = 50
+HIGH_QUANTITY_RATIO = 0.05
+ABSTRACT_CLASS_RATIO = 0.1
+
+
+def have_compatible_properties(interfaces: Tuple, inherited_properties: Dict) -> bool:
+    merged_properties = {}
+    for interface in interfaces:
+        for road_property, property_type in inherited_properties.get(interface, {}).items():
+            if merged_properties.setdefault(road_property, property_type) is not property_type:
+                return False
+    return True
+
+
+def create_synthetic_ontology(directory: str, class_count: int, seed: int = 0) -> str:
+    """
+    Writes an ontology shaped like the ROAD ones: every class specialises one or two earlier classes and carries
+    data and object property restrictions, the latter only pointing to earlier classes so the ontology stays acyclic.
+    """
+    randomizer = random.Random(seed)
+    world = World()
+    ontology = world.get_ontology(f"https://road.affectivese.org/Synthetic{class_count}.owl#")
+    with ontology:
+        data_properties = [types.new_class(f"dataProperty{index}", (DataProperty,)) for index in range(PROPERTY_COUNT)]
+        object_properties = [types.new_class(f"hasRelation{index}", (ObjectProperty,))
+                             for index in range(PROPERTY_COUNT)]
+        road_classes = []
+        # Plain classes with the same hierarchy, used to pick only interfaces the generated code can inherit from.
+        python_classes = {}
+        # Properties restricted by a class or any of its ancestors, with their types, which its own restrictions must
+        # not redefine.
+        inherited_properties = {}
+        for index in range(class_count):
+            interface_count = randomizer.randint(1, MAX_INTERFACES) if road_classes else 1
+            interfaces = tuple(randomizer.sample(road_classes, min(interface_count, len(road_classes)))) or (Thing,)
+            try:
+                if not have_compatible_properties(interfaces, inherited_properties):
+                    raise TypeError("Interfaces restrict the same property to different types")
+                python_class = type(f"SyntheticClass{index}",
+                                    tuple(python_classes.get(interface, object) for interface in interfaces), {})
+            except TypeError:
+                interfaces = interfaces[:1]
+                python_class = type(f"SyntheticClass{index}", (python_classes[interfaces[0]],), {})
+            road_class = types.new_class(f"SyntheticClass{index}", interfaces)
+            python_classes[road_class] = python_class
+            road_class.comment = [f"Synthetic class number {index}."]
+            if randomizer.random() < ABSTRACT_CLASS_RATIO:
+                road_class.label.append("AbstractClass")
+            elif randomizer.random() < HIGH_QUANTITY_RATIO:
+                road_class.label.append("HighQuantity")
+            used_properties = {}
+            for interface in interfaces:
+                used_properties.update(inherited_properties.get(interface, {}))
+            available_data_properties = [data_property for data_property in data_properties
+                                         if data_property not in used_properties]
+            for data_property in randomizer.sample(available_data_properties,
+                                                   min(randomizer.randint(0, MAX_FIELDS // 2),
+                                                       len(available_data_properties))):
+                data_type = randomizer.choice(DATA_PROPERTY_TYPES)
+                road_class.is_a.append(data_property.some(data_type))
+                used_properties[data_property] = data_type
+            available_object_properties = [object_property for object_property in object_properties
+                                           if object_property not in used_properties]
+            if road_classes:
+                for object_property in randomizer.sample(available_object_properties,
+                                                         min(randomizer.randint(0, MAX_FIELDS // 2),
+                                                             len(available_object_properties))):
+                    related_class = randomizer.choice(road_classes)
+                    road_class.is_a.append(object_property.some(related_class))
+                    used_properties[object_property] = related_class
+            inherited_properties[road_class] = used_properties
+            road_classes.append(road_class)
+
+    owl_file_path = os.path.join(directory, f"Synthetic{class_count}.owl")
+    ontology.save(owl_file_path)
+    world.close()
+    return owl_file_path
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY_DIRECTORY, "mapping"))
+
+from benchmarks.ontology_fixtures import create_synthetic_ontology
+from benchmarks.results import save_results
+from common import get_file_hash
+from generate_types import map_owl_file
+from owl_cache import close_ontology_world, get_quadstore_path, load_owl_files_into_world, open_ontology_world
+
+FIXTURE_SIZES = [1000, 10000]
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss carries over the peak of the parent process across exec, VmHWM only covers this process.
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", 'r') as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_and_map(owl_file_path: str) -> Dict:
+    start = time.perf_counter()
+    quadstore_path = get_quadstore_path("benchmark")
+    world = open_ontology_world(quadstore_path)
+    if quadstore_path is not None:
+        owl_file_path = load_owl_files_into_world(world, quadstore_path, {owl_file_path: owl_file_path},
+                                                  {owl_file_path: get_file_hash(owl_file_path)})[owl_file_path]
+    graphql_types = map_owl_file(owl_file_path, world=world)
+    close_ontology_world(world)
+    return {"seconds": time.perf_counter() - start, "classes": len(graphql_types), "peak_rss_mb": get_peak_rss_mb()}
+
+
+def run_in_process(owl_file_path: str, directory: str, persistent_quadstore: bool) -> Dict:
+    # Every run is a fresh process, as a generation run is, so its peak RSS is its own. The quadstore is created
+    # under the working directory.
+    environment = dict(os.environ, PYTHONPATH=REPOSITORY_DIRECTORY,
+                       GRISERA_PERSISTENT_QUADSTORE="1" if persistent_quadstore else "0")
+    output = subprocess.run([sys.executable, "-m", "benchmarks.ontology_loading", "--load-and-map", owl_file_path],
+                            cwd=directory, env=environment, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark_fixture(class_count: int) -> Dict:
+    fixture_path = create_synthetic_ontology(tempfile.mkdtemp(), class_count)
+    quadstore_directory = tempfile.mkdtemp()
+    return {"classes": class_count, "fixture_bytes": os.path.getsize(fixture_path),
+            "in_memory": run_in_process(fixture_path, tempfile.mkdtemp(), False),
+            "cold": run_in_process(fixture_path, quadstore_directory, True),
+            "warm": run_in_process(fixture_path, quadstore_directory, True)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares loading and mapping synthetic ontologies in memory with a "
+                                                 "cold and a warm persistent quadstore.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=FIXTURE_SIZES)
+    parser.add_argument("--output")
+    parser.add_argument("--load-and-map", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.load_and_map:
+        print(json.dumps(load_and_map(arguments.load_and_map)))
+        return
+    results: List[Dict] = [benchmark_fixture(class_count) for class_count in arguments.sizes]
+    save_results("ontology_loading", results, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import asyncio
+import importlib
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+from strawberry.utils.str_converters import to_camel_case
+
+from benchmarks.results import get_percentiles, save_results
+from storage.partitions import PartitionedStore
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY_DIRECTORY, "mapping"))
+
+from common import camel_to_snake_case
+
+WORKER_COUNTS = [1, 2, 4]
+SERVER_STARTUP_TIMEOUT_SECONDS = 60
+
+
+def get_query(type_name: str) -> str:
+    query_name = to_camel_case(f"get_{camel_to_snake_case(type_name)}")
+    return f"query($dataset: String!, $name: String) {{ {query_name}(datasetContext: {{name: $dataset}}, " \
+           f"name: $name) {{ id name }} }}"
+
+
+async def seed_partitions(directory: str, data_directory: str, type_name: str, datasets: int, objects: int):
+    sys.path.insert(0, directory)
+    tables = importlib.import_module("generated_storage_tables").GENERATED_TABLES
+    partitions = PartitionedStore(data_directory=data_directory, tables=list(tables.values()))
+    await partitions.open()
+    try:
+        await partitions.create_datasets([{"name": f"dataset-{dataset}", "additional_parameters": ()}
+                                          for dataset in range(datasets)])
+        for dataset in range(datasets):
+            repositories = await partitions.get_repositories(f"dataset-{dataset}")
+            await repositories[tables[type_name].name].create_many(
+                [{"name": f"object-{index}", "additional_parameters": ()} for index in range(objects)])
+    finally:
+        await partitions.close()
+
+
+def start_server(directory: str, data_directory: str, workers: int, port: int) -> subprocess.Popen:
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([REPOSITORY_DIRECTORY, os.path.join(REPOSITORY_DIRECTORY, "mapping")])
+    environment["GRISERA_DATA_DIRECTORY"] = data_directory
+    # uvicorn starts as many workers as WEB_CONCURRENCY, which also tells the workers not to cache responses in memory.
+    environment["WEB_CONCURRENCY"] = str(workers)
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "test_graphql_server:app", "--port", str(port),
+                             "--log-level", "warning"], cwd=directory, env=environment)
+
+
+def wait_until_ready(url: str):
+    deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            if httpx.post(f"{url}/graphql", json={"query": "{ __typename }"}).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise Exception(f"Server at {url} did not start within {SERVER_STARTUP_TIMEOUT_SECONDS} seconds")
+
+
+async def run_client(url: str, query: str, datasets: int, objects: int, concurrency: int, duration: float,
+                     seed: int) -> List[float]:
+    randomizer = random.Random(seed)
+    latencies = []
+    deadline = time.monotonic() + duration
+
+    async def send_requests(client: httpx.AsyncClient):
+        while time.monotonic() < deadline:
+            variables = {"dataset": f"dataset-{randomizer.randrange(datasets)}",
+                         "name": f"object-{randomizer.randrange(objects)}"}
+            start = time.perf_counter()
+            response = await client.post("/graphql", json={"query": query, "variables": variables})
+            latencies.append(time.perf_counter() - start)
+            if "errors" in response.json():
+                raise Exception(f"Query failed: {response.json()['errors']}")
+
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        await asyncio.gather(*[send_requests(client) for _ in range(concurrency)])
+    return latencies
+
+
+def run_client_process(arguments) -> List[float]:
+    return asyncio.run(run_client(*arguments))
+
+
+def benchmark_workers(directory: str, data_directory: str, query: str, workers: int, arguments) -> Dict:
+    url = f"http://127.0.0.1:{arguments.port}"
+    server = start_server(directory, data_directory, workers, arguments.port)
+    try:
+        wait_until_ready(url)
+        # Clients run in processes of their own, so generating the load does not limit the measured throughput.
+        with multiprocessing.Pool(arguments.clients) as pool:
+            client_latencies = pool.map(run_client_process,
+                                        [(url, query, arguments.datasets, arguments.objects, arguments.concurrency,
+                                          arguments.duration, seed) for seed in range(arguments.clients)])
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = [latency for latencies in client_latencies for latency in latencies]
+    return {"workers": workers, "requests": len(latencies), "requests_per_second": len(latencies) / arguments.duration,
+            "latency_seconds": get_percentiles(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load tests the generated server with several uvicorn workers "
+                                                 "serving a workload spread over dataset partitions.")
+    parser.add_argument("--directory", default=REPOSITORY_DIRECTORY, help="Directory with the generated modules")
+    parser.add_argument("--type", default="Activity", help="Generated type the queries look objects up in")
+    parser.add_argument("--datasets", type=int, default=8)
+    parser.add_argument("--objects", type=int, default=1000, help="Objects of every dataset")
+    parser.add_argument("--workers", type=int, nargs="+", default=WORKER_COUNTS)
+    parser.add_argument("--clients", type=int, default=4, help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests of every client")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds every worker count is loaded for")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    directory = os.path.abspath(arguments.directory)
+    data_directory = tempfile.mkdtemp()
+    asyncio.run(seed_partitions(directory, data_directory, arguments.type, arguments.datasets, arguments.objects))
+    query = get_query(arguments.type)
+    results = {"type": arguments.type, "datasets": arguments.datasets, "objects_per_dataset": arguments.objects,
+               "clients": arguments.clients, "concurrency": arguments.concurrency, "cpu_count": os.cpu_count(),
+               "runs": [benchmark_workers(directory, data_directory, query, workers, arguments)
+                        for workers in arguments.workers]}
+    save_results("partitioned_serving", results, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.results import get_percentiles, save_results
+from extensions.response_cache import configure_cache_backend, InMemoryCacheBackend
+from main import schema
+from resolvers import projection
+from resolvers.loaders import create_loaders
+from storage.repository import GriseraRepositories
+from storage.sqlite_store import SQLiteStore
+
+PAGE_SIZE = 100
+OPERATIONS = {
+    "ids": "{ participantStates(first: %d) { edges { node { id } } } }" % PAGE_SIZE,
+    "names": "{ participantStates(first: %d) { edges { node { name } } } }" % PAGE_SIZE,
+    "nested_names": "{ participantStates(first: %d) { edges { node { name hasParticipant { name } } } } }" % PAGE_SIZE,
+    "full": "{ participantStates(first: %d) { edges { node { name additionalParameters { key value } "
+            "hasParticipant { name additionalParameters { key value } } } } } }" % PAGE_SIZE,
+}
+
+
+async def seed_dataset(repositories: GriseraRepositories, participant_states: int, parameters: int):
+    # Wide objects, whose additional parameters dominate the size of a row.
+    additional_parameters = tuple((f"parameter-{index}", f"value-{index}") for index in range(parameters))
+    participants = await repositories.participant.create_many(
+        [{"name": f"participant-{index}", "additional_parameters": additional_parameters}
+         for index in range(participant_states // 10 or 1)])
+    await repositories.participant_state.create_many(
+        [{"name": f"state-{index}", "additional_parameters": additional_parameters,
+          "participant_id": participants[index % len(participants)]} for index in range(participant_states)])
+
+
+async def measure_operation(repositories: GriseraRepositories, operation: str, requests: int) -> Dict:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        result = await schema.execute(OPERATIONS[operation], context_value={"repositories": repositories,
+                                                                            "loaders": create_loaders(repositories)})
+        latencies.append(time.perf_counter() - start)
+        if result.errors:
+            raise Exception(f"{operation} failed: {result.errors}")
+    return get_percentiles(latencies)
+
+
+async def run_benchmark(participant_states: int, parameters: int, requests: int) -> Dict:
+    configure_cache_backend(InMemoryCacheBackend(maxsize=0))
+    store = SQLiteStore(database_path=os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"))
+    await store.open()
+    results = {"participant_states": participant_states, "additional_parameters": parameters,
+               "page_size": PAGE_SIZE, "latency_seconds": {}}
+    try:
+        repositories = store.create_repositories()
+        await seed_dataset(repositories, participant_states, parameters)
+        for pushdown in (False, True):
+            projection.PROJECTION_PUSHDOWN = pushdown
+            results["latency_seconds"]["pushdown" if pushdown else "full_objects"] = {
+                operation: await measure_operation(repositories, operation, requests)
+                for operation in OPERATIONS}
+    finally:
+        await store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures the latency of selections of few and all fields of wide "
+                                                 "ROAD objects with and without projection pushdown.")
+    parser.add_argument("--participant-states", type=int, default=1000)
+    parser.add_argument("--parameters", type=int, default=100, help="Additional parameters of every object")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    save_results("projection", asyncio.run(run_benchmark(arguments.participant_states, arguments.parameters,
+                                                         arguments.requests)), arguments.output)
+
+
+if __name__ == "__main__":
+    main()
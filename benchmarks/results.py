@@ -0,0 +1,35 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+def get_git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered_samples = sorted(samples)
+    return {f"p{percentile}": ordered_samples[min(len(ordered_samples) - 1, len(ordered_samples) * percentile // 100)]
+            for percentile in (50, 95, 99)}
+
+
+def save_results(benchmark: str, results: Dict, output_path: Optional[str] = None):
+    """
+    Prints the results as JSON, along with the revision and environment they were measured on, and optionally
+    writes them to a file so runs of different versions can be compared.
+    """
+    report = {"benchmark": benchmark, "revision": get_git_revision(), "timestamp": time.time(),
+              "python": sys.version.split()[0], "platform": platform.platform(), "results": results}
+    report_json = json.dumps(report, indent=2)
+    print(report_json)
+    if output_path is not None:
+        with open(output_path, 'w') as output_file:
+            output_file.write(report_json)
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.results import get_percentiles, save_results
+from extensions.response_cache import configure_cache_backend, InMemoryCacheBackend
+from main import app
+from storage.repository import GriseraRepositories
+from storage.sqlite_store import SQLiteStore
+
+PARTICIPATION_QUERY = """
+query($id: String!) {
+  participation(Id: $id) {
+    name
+    hasActivityExecution { name hasActivity { name additionalParameters { key value } } }
+    hasParticipantState { name hasParticipant { name } }
+  }
+}"""
+PARTICIPANT_STATES_QUERY = """
+query($first: Int!) {
+  participantStates(first: $first) {
+    edges { node { name additionalParameters { key value } hasParticipant { name } } }
+    pageInfo { hasNextPage endCursor }
+  }
+}"""
+ACTIVITY_BY_NAME_QUERY = "query($name: String!) { activityByName(name: $name) { id name } }"
+
+
+async def seed_dataset(repositories: GriseraRepositories, participations: int) -> Dict[str, List[str]]:
+    parameters = (("condition", "baseline"), ("device", "E4"))
+    activities = await repositories.activity.create_many(
+        [{"name": f"activity-{index}", "additional_parameters": parameters} for index in range(10)])
+    activity_executions = await repositories.activity_execution.create_many(
+        [{"name": f"execution-{index}", "additional_parameters": (), "activity_id": activities[index % 10]}
+         for index in range(participations // 10 or 1)])
+    participants = await repositories.participant.create_many(
+        [{"name": f"participant-{index}", "additional_parameters": ()} for index in range(participations // 10 or 1)])
+    participant_states = await repositories.participant_state.create_many(
+        [{"name": f"state-{index}", "additional_parameters": parameters,
+          "participant_id": participants[index % len(participants)]} for index in range(participations)])
+    participation_ids = await repositories.participation.create_many(
+        [{"name": f"participation-{index}", "additional_parameters": (),
+          "activity_execution_id": activity_executions[index % len(activity_executions)],
+          "participant_state_id": participant_states[index]} for index in range(participations)])
+    return {"participations": participation_ids, "activities": [f"activity-{index}" for index in range(10)]}
+
+
+def get_operations(dataset: Dict[str, List[str]], randomizer: random.Random) -> Dict[str, Dict]:
+    return {"nested_participation": {"query": PARTICIPATION_QUERY,
+                                     "variables": {"id": randomizer.choice(dataset["participations"])}},
+            "participant_states_page": {"query": PARTICIPANT_STATES_QUERY, "variables": {"first": 50}},
+            "activity_by_name": {"query": ACTIVITY_BY_NAME_QUERY,
+                                 "variables": {"name": randomizer.choice(dataset["activities"])}}}
+
+
+async def run_client(client: httpx.AsyncClient, operation: str, dataset: Dict[str, List[str]], requests: int,
+                     seed: int) -> List[float]:
+    randomizer = random.Random(seed)
+    latencies = []
+    for _ in range(requests):
+        payload = get_operations(dataset, randomizer)[operation]
+        start = time.perf_counter()
+        response = await client.post("/graphql", json=payload)
+        latencies.append(time.perf_counter() - start)
+        if "errors" in response.json():
+            raise Exception(f"{operation} failed: {response.json()['errors']}")
+    return latencies
+
+
+async def run_benchmark(participations: int, concurrency: int, requests: int, response_cache: bool) -> Dict:
+    if not response_cache:
+        configure_cache_backend(InMemoryCacheBackend(maxsize=0))
+    store = SQLiteStore(database_path=os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3"))
+    await store.open()
+    app.state.repositories = store.create_repositories()
+    results = {"participations": participations, "concurrency": concurrency, "requests_per_client": requests,
+               "response_cache": response_cache, "operations": {}}
+    try:
+        dataset = await seed_dataset(app.state.repositories, participations)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+            for operation in get_operations(dataset, random.Random(0)):
+                start = time.perf_counter()
+                client_latencies = await asyncio.gather(*[run_client(client, operation, dataset, requests, seed)
+                                                          for seed in range(concurrency)])
+                elapsed_time = time.perf_counter() - start
+                latencies = [latency for latencies in client_latencies for latency in latencies]
+                results["operations"][operation] = {"requests_per_second": len(latencies) / elapsed_time,
+                                                    "latency_seconds": get_percentiles(latencies)}
+    finally:
+        await store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load tests representative queries against the app in-process.")
+    parser.add_argument("--participations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100, help="Requests sent by each client per operation")
+    parser.add_argument("--no-response-cache", action="store_true")
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    results = asyncio.run(run_benchmark(arguments.participations, arguments.concurrency, arguments.requests,
+                                        response_cache=not arguments.no_response_cache))
+    save_results("serving", results, arguments.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.results import save_results
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# A worker has to be ready to serve within this time to keep deploys and autoscaling responsive.
+STARTUP_TIME_TARGET_SECONDS = 2.0
+
+
+def measure_startup(module: str, directory: str, environment: Dict[str, str]) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=directory, env=environment, check=True)
+    return time.perf_counter() - start
+
+
+def run_benchmark(module: str, directory: str, repeats: int, operations: Optional[str]) -> Dict:
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([REPOSITORY_DIRECTORY, os.path.join(REPOSITORY_DIRECTORY, "mapping")])
+    if operations is not None:
+        environment["GRISERA_ENABLED_OPERATIONS"] = operations
+    # The first import writes the bytecode caches, which every later worker start reuses.
+    measure_startup(module, directory, environment)
+    startup_times: List[float] = [measure_startup(module, directory, environment) for _ in range(repeats)]
+    median_startup_time = statistics.median(startup_times)
+    return {"module": module, "operations": operations, "repeats": repeats, "min_seconds": min(startup_times),
+            "median_seconds": median_startup_time, "target_seconds": STARTUP_TIME_TARGET_SECONDS,
+            "within_target": median_startup_time <= STARTUP_TIME_TARGET_SECONDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measures how long a fresh worker takes to import the GraphQL app.")
+    parser.add_argument("--module", default="main", help="main, or test_graphql_server for the generated schema")
+    parser.add_argument("--directory", default=REPOSITORY_DIRECTORY, help="Directory with the generated modules")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--operations", help="Operation types enabled in the generated schema, e.g. query")
+    parser.add_argument("--output")
+    arguments = parser.parse_args()
+    results = run_benchmark(arguments.module, arguments.directory, arguments.repeats, arguments.operations)
+    save_results("startup", results, arguments.output)
+    if not results["within_target"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
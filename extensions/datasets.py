@@ -0,0 +1,83 @@
+import re
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from graphql import ExecutionResult as GraphQLExecutionResult, FieldNode, FragmentDefinitionNode, \
+    FragmentSpreadNode, GraphQLError, InlineFragmentNode, SelectionSetNode, value_from_ast_untyped
+from graphql.utilities import get_operation_ast
+from strawberry.extensions import SchemaExtension
+
+from storage.partitions import DEFAULT_PARTITION
+
+DATASET_ARGUMENT = "datasetContext"
+# Root fields of the Dataset type read and change the catalog of datasets, whatever dataset context they are given.
+CATALOG_FIELD_PATTERN = re.compile(r"(get|create|update|delete|stream)Dataset(Batch)?")
+
+
+def get_root_fields(selection_set: SelectionSetNode, fragments: Dict[str, FragmentDefinitionNode]) \
+        -> Iterator[FieldNode]:
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from get_root_fields(selection.selection_set, fragments)
+        elif isinstance(selection, FragmentSpreadNode) and selection.name.value in fragments:
+            yield from get_root_fields(fragments[selection.name.value].selection_set, fragments)
+
+
+def get_operation_dataset(document, operation_name: Optional[str], variables: Optional[Dict]) -> str:
+    """
+    Returns the name of the dataset the root fields of the operation are given as their dataset context, or the
+    catalog when none of them takes one or they access the datasets themselves. Fails when the root fields access
+    several datasets.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return DEFAULT_PARTITION
+    fragments = {definition.name.value: definition for definition in document.definitions
+                 if isinstance(definition, FragmentDefinitionNode)}
+    datasets = set()
+    for field in get_root_fields(operation.selection_set, fragments):
+        if field.name.value.startswith("__"):
+            continue
+        if CATALOG_FIELD_PATTERN.fullmatch(field.name.value):
+            datasets.add(DEFAULT_PARTITION)
+            continue
+        dataset_context = next((value_from_ast_untyped(argument.value, variables) for argument in field.arguments
+                                if argument.name.value == DATASET_ARGUMENT), None)
+        if dataset_context is None:
+            datasets.add(DEFAULT_PARTITION)
+        elif not dataset_context.get("name"):
+            raise Exception(f"{field.name.value} must name the dataset in its {DATASET_ARGUMENT}")
+        else:
+            datasets.add(dataset_context["name"])
+    if len(datasets) > 1:
+        raise Exception(f"An operation can only access a single dataset, found {', '.join(sorted(datasets))}")
+    return datasets.pop() if datasets else DEFAULT_PARTITION
+
+
+class DatasetRouter(SchemaExtension):
+    """
+    Executes every operation against the partition of the dataset its root fields name in their dataset context,
+    setting the dataset and its repositories in the request context and keeping the partition open until the
+    operation ends. Operations accessing several datasets are rejected, so the objects of a request and the
+    DataLoaders caching them never mix datasets. Datasets are only created by createDataset, so operations naming
+    unknown datasets fail and leave no files behind.
+    """
+
+    def __init__(self, *, execution_context=None):
+        self.execution_context = execution_context
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        context = self.execution_context.context
+        async with AsyncExitStack() as stack:
+            try:
+                dataset_name = get_operation_dataset(self.execution_context.graphql_document,
+                                                     self.execution_context.operation_name,
+                                                     self.execution_context.variables)
+                context["repositories"] = await stack.enter_async_context(
+                    context["partitions"].use_repositories(dataset_name))
+                context["dataset"] = dataset_name
+            except Exception as error:
+                self.execution_context.result = GraphQLExecutionResult(data=None, errors=[GraphQLError(str(error))])
+            yield
@@ -0,0 +1,41 @@
+import hashlib
+import os
+from typing import Iterator
+
+from graphql import specified_rules
+from strawberry.extensions import SchemaExtension
+
+from extensions.lru_cache import LRUCache
+
+DOCUMENT_CACHE_SIZE = int(os.environ.get("GRISERA_DOCUMENT_CACHE_SIZE", "1000"))
+
+document_cache = LRUCache(maxsize=DOCUMENT_CACHE_SIZE)
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+class DocumentCache(SchemaExtension):
+    """
+    Reuses parsed documents which already passed the standard validation rules, keyed by the hash of the query.
+    Rules added by other extensions, like the query cost limiter, still run on every request as they depend on the
+    variables of the operation.
+    """
+
+    def on_parse(self) -> Iterator[None]:
+        query_hash = get_query_hash(self.execution_context.query)
+        cached_document = document_cache.get(query_hash)
+        if cached_document is not None:
+            self.execution_context.graphql_document = cached_document
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        query_hash = get_query_hash(self.execution_context.query)
+        is_validated = query_hash in document_cache.entries
+        if is_validated:
+            self.execution_context.validation_rules = tuple(
+                rule for rule in self.execution_context.validation_rules if rule not in specified_rules)
+        yield
+        if not is_validated and not self.execution_context.errors:
+            document_cache.set(query_hash, self.execution_context.graphql_document)
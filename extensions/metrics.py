@@ -0,0 +1,211 @@
+import dataclasses
+import hmac
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from strawberry.extensions import SchemaExtension
+
+from storage.repository import GriseraRepositories, Repository
+
+METRICS_ENABLED = os.environ.get("GRISERA_METRICS_ENABLED", "1") == "1"
+# Timing every resolved field adds two clock reads and two records to each field of a response, so it is only done
+# on request.
+RESOLVER_METRICS_ENABLED = os.environ.get("GRISERA_RESOLVER_METRICS_ENABLED", "0") == "1"
+DEBUG_HEADER = "X-Grisera-Debug"
+# Metrics are served to requests bearing this token or, when none is configured, only to clients on the same host.
+METRICS_TOKEN = os.environ.get("GRISERA_METRICS_TOKEN")
+LOCAL_HOSTS = ["127.0.0.1", "::1"]
+
+
+class Timings:
+    """
+    Call counts and total durations keyed by label values.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Tuple[str, ...], int] = {}
+        self.seconds: Dict[Tuple[str, ...], float] = {}
+
+    def record(self, labels: Tuple[str, ...], seconds: float):
+        self.calls[labels] = self.calls.get(labels, 0) + 1
+        self.seconds[labels] = self.seconds.get(labels, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {".".join(labels): {"calls": calls, "seconds": self.seconds[labels]}
+                for labels, calls in self.calls.items()}
+
+
+@dataclasses.dataclass
+class RequestMetrics:
+    phases: Timings = dataclasses.field(default_factory=Timings)
+    resolvers: Timings = dataclasses.field(default_factory=Timings)
+    backend: Timings = dataclasses.field(default_factory=Timings)
+
+
+# Totals since the worker started, and the metrics of the request being executed when it asked for them.
+server_metrics = RequestMetrics()
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request_metrics", default=None)
+
+
+def record(category: str, labels: Tuple[str, ...], seconds: float):
+    getattr(server_metrics, category).record(labels, seconds)
+    request_metrics = current_request_metrics.get()
+    if request_metrics is not None:
+        getattr(request_metrics, category).record(labels, seconds)
+
+
+def format_timings(name: str, help_text: str, timings: Timings, label_names: List[str]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+    for labels, calls in sorted(timings.calls.items()):
+        label_string = ",".join(f'{label_name}="{label}"' for label_name, label in zip(label_names, labels))
+        lines.append(f"{name}_count{{{label_string}}} {calls}")
+        lines.append(f"{name}_sum{{{label_string}}} {timings.seconds[labels]}")
+    return lines
+
+
+def get_prometheus_metrics() -> str:
+    lines = format_timings("grisera_graphql_phase_duration_seconds", "Time spent parsing, validating and executing "
+                           "GraphQL operations.", server_metrics.phases, ["phase"])
+    lines += format_timings("grisera_graphql_resolver_duration_seconds", "Time spent resolving GraphQL fields.",
+                            server_metrics.resolvers, ["type", "field"])
+    lines += format_timings("grisera_backend_call_duration_seconds", "Time spent in storage backend calls.",
+                            server_metrics.backend, ["repository", "method"])
+    return "\n".join(lines) + "\n"
+
+
+def is_metrics_request_allowed(request) -> bool:
+    if METRICS_TOKEN:
+        return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}")
+    return request.client is not None and request.client.host in LOCAL_HOSTS
+
+
+class OperationTimer(SchemaExtension):
+    """
+    Records the duration of every GraphQL phase, as well as the storage backend calls made by the operation.
+    Requests sending the debug header get their own timings in the response extensions.
+    """
+
+    def __init__(self, *, execution_context=None):
+        self.execution_context = execution_context
+        self.request_metrics = RequestMetrics()
+
+    def on_operation(self) -> Iterator[None]:
+        current_request_metrics.set(self.request_metrics)
+        yield
+        current_request_metrics.set(None)
+
+    def time_phase(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        record("phases", (phase,), time.perf_counter() - start)
+
+    def on_parse(self) -> Iterator[None]:
+        yield from self.time_phase("parse")
+
+    def on_validate(self) -> Iterator[None]:
+        yield from self.time_phase("validate")
+
+    def on_execute(self) -> Iterator[None]:
+        yield from self.time_phase("execute")
+
+    def get_results(self) -> Dict[str, Any]:
+        request = (self.execution_context.context or {}).get("request")
+        if request is None or DEBUG_HEADER not in request.headers:
+            return {}
+        return {"timing": {"phases": self.request_metrics.phases.to_dict(),
+                           "resolvers": self.request_metrics.resolvers.to_dict(),
+                           "backend": self.request_metrics.backend.to_dict()}}
+
+
+class ResolverTimer(OperationTimer):
+    """
+    Records the duration of every resolved field on top of the timings of the operation.
+    """
+
+    def resolve(self, _next: Callable, root: Any, info, *args, **kwargs) -> Any:
+        if info.field_name.startswith("__"):
+            return _next(root, info, *args, **kwargs)
+        labels = (info.parent_type.name, info.field_name)
+        start = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return self.time_awaitable(labels, start, result)
+        record("resolvers", labels, time.perf_counter() - start)
+        return result
+
+    async def time_awaitable(self, labels: Tuple[str, ...], start: float, result) -> Any:
+        try:
+            return await result
+        finally:
+            record("resolvers", labels, time.perf_counter() - start)
+
+
+def get_metrics_extensions() -> List[Type[SchemaExtension]]:
+    if not METRICS_ENABLED:
+        return []
+    return [ResolverTimer if RESOLVER_METRICS_ENABLED else OperationTimer]
+
+
+class InstrumentedRepository(Repository):
+    """
+    Wraps a repository, recording the duration of every call made to it.
+    """
+
+    def __init__(self, name: str, repository: Repository):
+        self.name = name
+        self.repository = repository
+
+    async def call(self, method: str, *arguments) -> Any:
+        start = time.perf_counter()
+        try:
+            return await getattr(self.repository, method)(*arguments)
+        finally:
+            record("backend", (self.name, method), time.perf_counter() - start)
+
+    async def get_by_ids(self, ids, columns=None):
+        return await self.call("get_by_ids", ids, columns)
+
+    async def get_by_name(self, name, columns=None):
+        return await self.call("get_by_name", name, columns)
+
+    async def get_page(self, after_id, limit, columns=None):
+        return await self.call("get_page", after_id, limit, columns)
+
+    async def find(self, filters, additional_parameters, after_id, limit, columns=None):
+        return await self.call("find", filters, additional_parameters, after_id, limit, columns)
+
+    async def find_implementations(self, after_id, limit):
+        return await self.call("find_implementations", after_id, limit)
+
+    async def get_implementation_tables(self, ids):
+        return await self.call("get_implementation_tables", ids)
+
+    async def create(self, entity):
+        return await self.call("create", entity)
+
+    async def update(self, _id, entity):
+        return await self.call("update", _id, entity)
+
+    async def delete(self, _id):
+        return await self.call("delete", _id)
+
+    async def create_many(self, entities):
+        return await self.call("create_many", entities)
+
+    async def update_many(self, entities):
+        return await self.call("update_many", entities)
+
+    async def delete_many(self, ids):
+        return await self.call("delete_many", ids)
+
+
+def instrument_repositories(repositories: GriseraRepositories) -> GriseraRepositories:
+    return GriseraRepositories(**{field.name: InstrumentedRepository(field.name, getattr(repositories, field.name))
+                                  for field in dataclasses.fields(repositories)})
+
+
+def instrument_table_repositories(repositories: Dict[str, Repository]) -> Dict[str, Repository]:
+    return {name: InstrumentedRepository(name, repository) for name, repository in repositories.items()}
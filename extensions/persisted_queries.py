@@ -0,0 +1,42 @@
+import json
+import os
+from typing import Any, Dict
+
+from extensions.document_cache import get_query_hash
+from extensions.lru_cache import LRUCache
+
+PERSISTED_QUERIES_SIZE = int(os.environ.get("GRISERA_PERSISTED_QUERIES_SIZE", "10000"))
+
+persisted_queries = LRUCache(maxsize=PERSISTED_QUERIES_SIZE)
+
+
+class PersistedQueryError(Exception):
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def resolve_persisted_query(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Implements automatic persisted queries: a request carrying only the sha256 hash of a query in
+    extensions.persistedQuery is resolved from the registered queries, a request carrying both registers the query.
+    """
+    extensions = data.get("extensions")
+    if isinstance(extensions, str):
+        extensions = json.loads(extensions)
+    if not isinstance(extensions, dict) or "persistedQuery" not in extensions:
+        return data
+
+    query_hash = extensions["persistedQuery"].get("sha256Hash")
+    if data.get("query"):
+        if get_query_hash(data["query"]) != query_hash:
+            raise PersistedQueryError("provided sha does not match query", code="INTERNAL_SERVER_ERROR")
+        persisted_queries.set(query_hash, data["query"])
+        return data
+
+    query = persisted_queries.get(query_hash)
+    if query is None:
+        raise PersistedQueryError("PersistedQueryNotFound", code="PERSISTED_QUERY_NOT_FOUND")
+    return {**data, "query": query}
@@ -0,0 +1,140 @@
+import os
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from graphql import FieldNode, FragmentSpreadNode, GraphQLError, GraphQLField, GraphQLList, GraphQLNamedType, \
+    InlineFragmentNode, IntValueNode, OperationDefinitionNode, SelectionSetNode, ValidationRule, VariableNode, \
+    get_named_type, get_nullable_type
+from strawberry.extensions import SchemaExtension
+
+from resolvers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_QUERY_DEPTH = int(os.environ.get("GRISERA_MAX_QUERY_DEPTH", "10"))
+MAX_QUERY_COST = int(os.environ.get("GRISERA_MAX_QUERY_COST", "5000"))
+FIELD_WEIGHT = 1
+PAGINATED_FIELD_WEIGHT = 10
+FIELD_WEIGHTS = {"additionalParameters": 5}
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Computes the depth and cost of an operation before it is executed and rejects operations above the configured
+    budgets. The cost of a field is its weight plus the cost of its selection, multiplied by the requested page size
+    for paginated fields. The computed cost is reported in the response extensions.
+    """
+
+    def __init__(self, *, execution_context=None, max_depth: int = MAX_QUERY_DEPTH, max_cost: int = MAX_QUERY_COST):
+        self.execution_context = execution_context
+        self.max_depth = max_depth
+        self.max_cost = max_cost
+        self.query_cost: Optional[int] = None
+        self.query_depth: Optional[int] = None
+
+    def on_operation(self) -> Iterator[None]:
+        extension = self
+
+        class QueryCostRule(ValidationRule):
+
+            def enter_operation_definition(self, node: OperationDefinitionNode, *_args):
+                operation_name = extension.execution_context.operation_name
+                if operation_name is not None and (node.name is None or node.name.value != operation_name):
+                    return
+                root_type = self.context.schema.get_root_type(node.operation)
+                if root_type is None:
+                    return
+                extension.query_cost, extension.query_depth = extension.get_selection_cost(
+                    self.context, root_type, node.selection_set, depth=0, visited_fragments=set())
+                if extension.query_depth > extension.max_depth:
+                    self.report_error(GraphQLError(f"Query depth {extension.query_depth} exceeds the maximum "
+                                                   f"allowed depth {extension.max_depth}", node))
+                if extension.query_cost > extension.max_cost:
+                    self.report_error(GraphQLError(f"Query cost {extension.query_cost} exceeds the maximum "
+                                                   f"allowed cost {extension.max_cost}", node))
+
+        self.execution_context.validation_rules = self.execution_context.validation_rules + (QueryCostRule,)
+        yield
+
+    def get_selection_cost(self, validation_context, parent_type: GraphQLNamedType, selection_set: SelectionSetNode,
+                           depth: int, visited_fragments: Set[str]) -> Tuple[int, int]:
+        cost = 0
+        max_depth = depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_name = selection.name.value
+                field = getattr(parent_type, "fields", {}).get(field_name)
+                if field_name.startswith("__") or field is None:
+                    continue
+                field_cost, field_depth = self.get_field_cost(validation_context, selection, field, depth + 1,
+                                                              visited_fragments)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = validation_context.schema.get_type(selection.type_condition.name.value)
+                if fragment_type is None:
+                    continue
+                field_cost, field_depth = self.get_selection_cost(validation_context, fragment_type,
+                                                                  selection.selection_set, depth, visited_fragments)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = validation_context.get_fragment(selection.name.value)
+                if fragment is None or fragment.name.value in visited_fragments:
+                    continue
+                fragment_type = validation_context.schema.get_type(fragment.type_condition.name.value)
+                if fragment_type is None:
+                    continue
+                field_cost, field_depth = self.get_selection_cost(validation_context, fragment_type,
+                                                                  fragment.selection_set, depth,
+                                                                  visited_fragments | {fragment.name.value})
+            else:
+                continue
+            cost += field_cost
+            max_depth = max(max_depth, field_depth)
+        return cost, max_depth
+
+    def get_field_cost(self, validation_context, node: FieldNode, field: GraphQLField, depth: int,
+                       visited_fragments: Set[str]) -> Tuple[int, int]:
+        selection_cost, selection_depth = 0, depth
+        if node.selection_set is not None:
+            selection_cost, selection_depth = self.get_selection_cost(
+                validation_context, get_named_type(field.type), node.selection_set, depth, visited_fragments)
+        if is_paginated_field(field):
+            return PAGINATED_FIELD_WEIGHT + self.get_page_size(node, field) * selection_cost, selection_depth
+        return FIELD_WEIGHTS.get(node.name.value, FIELD_WEIGHT) + selection_cost, selection_depth
+
+    def get_page_size(self, node: FieldNode, field: GraphQLField) -> int:
+        for argument in node.arguments:
+            if argument.name.value != "first":
+                continue
+            if isinstance(argument.value, IntValueNode):
+                return get_counted_page_size(argument.value.value)
+            if isinstance(argument.value, VariableNode):
+                variables = self.execution_context.variables or {}
+                return get_counted_page_size(variables.get(argument.value.name.value))
+            return MAX_PAGE_SIZE
+        if "first" in field.args and isinstance(field.args["first"].default_value, int):
+            return get_counted_page_size(field.args["first"].default_value)
+        return DEFAULT_PAGE_SIZE
+
+    def get_results(self) -> Dict[str, Any]:
+        if self.query_cost is None:
+            return {}
+        return {"cost": {"requestedQueryCost": self.query_cost, "maximumQueryCost": self.max_cost,
+                         "queryDepth": self.query_depth, "maximumQueryDepth": self.max_depth}}
+
+
+def get_counted_page_size(value: Any) -> int:
+    # Page sizes are counted within the range the resolvers accept. Missing or invalid values, which fail when the
+    # field is resolved, count as the largest page, so they never lower the cost of the fields next to them.
+    if isinstance(value, bool):
+        return MAX_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return MAX_PAGE_SIZE
+    return min(max(page_size, 0), MAX_PAGE_SIZE)
+
+
+def is_paginated_field(field: GraphQLField) -> bool:
+    field_type = get_named_type(field.type)
+    if field_type.name.endswith("Connection"):
+        return True
+    return isinstance(get_nullable_type(field.type), GraphQLList) and \
+        "PAGINATION_REQUIRED" in (field_type.description or "")
@@ -0,0 +1,227 @@
+import dataclasses
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from graphql import FieldNode, FragmentSpreadNode, GraphQLNamedType, InlineFragmentNode, SelectionSetNode, \
+    get_named_type, is_composite_type
+from strawberry.extensions import FieldExtension
+from strawberry.types import Info
+
+from resolvers.projection import get_projection_key
+from storage.partitions import DEFAULT_PARTITION
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("GRISERA_RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL = float(os.environ.get("GRISERA_RESPONSE_CACHE_TTL", "300"))
+# Worker processes of the server, as uvicorn and gunicorn read their number from WEB_CONCURRENCY. Each worker has a
+# cache of its own, so with several of them results are only cached in a backend shared by the workers.
+WORKER_COUNT = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+
+class CacheBackend(ABC):
+    """
+    Storage of cached query results. Every entry is tagged with the dataset and the ROAD type, or the ROAD type and
+    ID, it was read from, so mutations can invalidate exactly the entries they affect. Backends shared by every
+    worker of the server, which see the invalidations of all of them, are marked as shared.
+    """
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Any]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, tags: List[str]):
+        ...
+
+    @abstractmethod
+    async def invalidate(self, tags: List[str]):
+        ...
+
+    @abstractmethod
+    def get_statistics(self) -> Dict[str, float]:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    A per-worker cache evicting the least recently used entries and entries older than the time to live. It is only
+    used when the server runs a single worker, as the others would not see its invalidations.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.tagged_keys: Dict[str, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[Tuple[Any]]:
+        entry = self.entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                self.remove(key)
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return (entry[0],)
+
+    async def set(self, key: str, value: Any, tags: List[str]):
+        self.remove(key)
+        self.entries[key] = (value, time.monotonic() + self.ttl, tags)
+        for tag in tags:
+            self.tagged_keys.setdefault(tag, set()).add(key)
+        if len(self.entries) > self.maxsize:
+            self.remove(next(iter(self.entries)))
+
+    async def invalidate(self, tags: List[str]):
+        for tag in tags:
+            for key in list(self.tagged_keys.get(tag, ())):
+                self.remove(key)
+                self.invalidations += 1
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            self.tagged_keys[tag].discard(key)
+            if not self.tagged_keys[tag]:
+                del self.tagged_keys[tag]
+
+    def get_statistics(self) -> Dict[str, float]:
+        requests = self.hits + self.misses
+        return {"size": len(self.entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                "invalidations": self.invalidations, "hit_ratio": self.hits / requests if requests else 0.0}
+
+
+cache_backend: CacheBackend = InMemoryCacheBackend()
+
+
+def configure_cache_backend(backend: CacheBackend):
+    global cache_backend
+    cache_backend = backend
+
+
+def serialize_argument(argument: Any) -> Any:
+    if dataclasses.is_dataclass(argument):
+        return dataclasses.asdict(argument)
+    return str(argument)
+
+
+def is_cache_enabled() -> bool:
+    return WORKER_COUNT <= 1 or cache_backend.shared
+
+
+def get_cache_key(dataset_name: str, field_name: str, arguments: Dict[str, Any], projection_key: str = "") -> str:
+    return json.dumps([dataset_name, field_name, arguments, projection_key], sort_keys=True,
+                      default=serialize_argument)
+
+
+def get_cache_tag(dataset_name: str, type_name: str, _id: Optional[str] = None) -> str:
+    return json.dumps([dataset_name, type_name] if _id is None else [dataset_name, type_name, _id])
+
+
+def get_dataset_cache_tag(dataset_name: str) -> str:
+    return json.dumps([dataset_name])
+
+
+def get_context_dataset(info: Info) -> str:
+    # Set by DatasetRouter, operations of a schema without datasets read the default partition.
+    return info.context.get("dataset", DEFAULT_PARTITION)
+
+
+async def invalidate_cached_types(type_names: List[str], ids: List[str], dataset_name: str = DEFAULT_PARTITION):
+    """
+    Invalidates the cached results listing or searching objects of the types in the dataset and the cached results
+    of the objects with the given IDs.
+    """
+    if not is_cache_enabled():
+        return
+    await cache_backend.invalidate([get_cache_tag(dataset_name, type_name, _id) for type_name in type_names
+                                    for _id in [None, *ids]])
+
+
+async def invalidate_cached_type(type_name: str, _id: Optional[str] = None, dataset_name: str = DEFAULT_PARTITION):
+    await invalidate_cached_types([type_name], [_id] if _id is not None else [], dataset_name)
+
+
+async def invalidate_cached_dataset(dataset_name: str):
+    # Every result cached from a dataset is tagged with it, so a deleted dataset leaves no results behind.
+    if is_cache_enabled():
+        await cache_backend.invalidate([get_dataset_cache_tag(dataset_name)])
+
+
+def get_reference_type_names(arguments: Dict[str, Any]) -> Set[str]:
+    # Input objects given as arguments filter on the objects of their type, e.g. a reference given by name.
+    type_names = set()
+    for argument, value in arguments.items():
+        if argument != "dataset_context" and dataclasses.is_dataclass(value) \
+                and type(value).__name__.endswith("Input"):
+            type_names.add(type(value).__name__[:-len("Input")])
+            type_names.update(get_reference_type_names(vars(value)))
+    return type_names
+
+
+def get_selected_type_names(info: Info) -> Set[str]:
+    """
+    Returns the names of the types of the fields nested in the selection of the field, e.g. of the objects it
+    references.
+    """
+    raw_info = info._raw_info
+    type_names = set()
+
+    def add_selection_types(parent_type: GraphQLNamedType, selection_set: Optional[SelectionSetNode]):
+        for selection in selection_set.selections if selection_set is not None else ():
+            if isinstance(selection, FieldNode):
+                field = getattr(parent_type, "fields", {}).get(selection.name.value)
+                if field is not None and is_composite_type(get_named_type(field.type)):
+                    type_names.add(get_named_type(field.type).name)
+                    add_selection_types(get_named_type(field.type), selection.selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = raw_info.schema.get_type(selection.type_condition.name.value) \
+                    if selection.type_condition is not None else parent_type
+                add_selection_types(fragment_type, selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode) and selection.name.value in raw_info.fragments:
+                fragment = raw_info.fragments[selection.name.value]
+                add_selection_types(raw_info.schema.get_type(fragment.type_condition.name.value),
+                                    fragment.selection_set)
+
+    for field_node in raw_info.field_nodes:
+        add_selection_types(get_named_type(raw_info.return_type), field_node.selection_set)
+    return type_names
+
+
+class CachedQuery(FieldExtension):
+    """
+    Caches the result of a query field keyed by the dataset, its name, arguments and the columns its selection reads.
+    Results of lookups by ID are tagged with that ID, any other results with the whole type. Results are also tagged
+    with the types of the objects their arguments filter on and of the objects nested in their selection.
+    """
+
+    def __init__(self, type_name: str, id_argument: Optional[str] = None):
+        self.type_name = type_name
+        self.id_argument = id_argument
+
+    async def resolve_async(self, next_: Callable[..., Awaitable[Any]], source: Any, info: Info, **kwargs) -> Any:
+        if not is_cache_enabled():
+            return await next_(source, info, **kwargs)
+        dataset_name = get_context_dataset(info)
+        cache_key = get_cache_key(dataset_name, info.field_name, kwargs, get_projection_key(info))
+        cached_result = await cache_backend.get(cache_key)
+        if cached_result is not None:
+            return cached_result[0]
+
+        result = await next_(source, info, **kwargs)
+        related_type_names = get_reference_type_names(kwargs) | get_selected_type_names(info)
+        await cache_backend.set(cache_key, result, [get_cache_tag(dataset_name, self.type_name,
+                                                                  kwargs.get(self.id_argument))]
+                                + [get_cache_tag(dataset_name, type_name) for type_name in sorted(related_type_names)]
+                                + [get_dataset_cache_tag(dataset_name)])
+        return result
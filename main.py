@@ -1,14 +1,83 @@
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Mapping, Union
+
 import strawberry
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.websockets import WebSocket
+from graphql import GraphQLError
 from strawberry.asgi import GraphQL
+from strawberry.types import ExecutionResult
 
+from extensions.document_cache import DocumentCache, document_cache
+from extensions.metrics import get_metrics_extensions, get_prometheus_metrics, instrument_repositories, \
+    is_metrics_request_allowed, METRICS_ENABLED
+from extensions.persisted_queries import PersistedQueryError, persisted_queries, resolve_persisted_query
+from extensions.query_cost import QueryCostLimiter
+from extensions import response_cache
 from mutation.mutation import GriseraMutation
 from query.query import GriseraQuery
+from resolvers.loaders import create_loaders
+from storage.sqlite_store import SQLiteStore
+from subscription.subscription import GriseraSubscription
+
+
+class GriseraGraphQL(GraphQL):
+
+    async def get_context(self, request: Union[Request, WebSocket], response: Response):
+        repositories = request.app.state.repositories
+        return {"request": request, "response": response, "repositories": repositories,
+                "loaders": create_loaders(repositories)}
+
+    def should_render_graphiql(self, request) -> bool:
+        return "extensions" not in request.query_params and super().should_render_graphiql(request)
+
+    def parse_json(self, data: Union[str, bytes]) -> Dict[str, Any]:
+        return resolve_persisted_query(super().parse_json(data))
+
+    def parse_query_params(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+        return resolve_persisted_query(super().parse_query_params(params))
+
+    async def execute_operation(self, request: Request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryError as error:
+            return ExecutionResult(data=None, errors=[GraphQLError(error.message, extensions={"code": error.code})])
 
-schema = strawberry.Schema(query=GriseraQuery, mutation=GriseraMutation)
 
-graphql_app = GraphQL(schema)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Operations of the hand-written schema take no dataset context, so it serves a single database. Datasets are
+    # partitions of the generated server, where DatasetRouter picks the partition of each operation.
+    store = SQLiteStore()
+    await store.open()
+    repositories = store.create_repositories()
+    app.state.repositories = instrument_repositories(repositories) if METRICS_ENABLED else repositories
+    yield
+    await store.close()
 
-app = FastAPI()
+
+schema = strawberry.Schema(query=GriseraQuery, mutation=GriseraMutation, subscription=GriseraSubscription,
+                           extensions=[QueryCostLimiter, DocumentCache] + get_metrics_extensions())
+
+graphql_app = GriseraGraphQL(schema)
+
+app = FastAPI(lifespan=lifespan)
 app.add_route("/graphql", graphql_app)
 app.add_websocket_route("/graphql", graphql_app)
+
+
+@app.get("/statistics")
+async def statistics():
+    return {"document_cache": document_cache.get_statistics(),
+            "persisted_queries": persisted_queries.get_statistics(),
+            "response_cache": response_cache.cache_backend.get_statistics()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    if not is_metrics_request_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return get_prometheus_metrics()
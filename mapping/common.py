@@ -1,14 +1,112 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List
+
 BASIC_TYPES = ["str", "int", "float", "bool"]
+# Acronyms kept as a single word when converting names, e.g. hasPADs becomes has_pads rather than has_pa_ds. They
+# are only matched as whole words, not within other words such as SPADE.
+ACRONYMS = ["PAD"]
+ACRONYM_PATTERNS = [(re.compile(rf"(?<![A-Z]){acronym}(?=$|[A-Z][a-z]|[^A-Za-z]|s(?![a-z]))"), acronym.capitalize())
+                    for acronym in ACRONYMS]
+# Arguments emitted next to the ontology properties, which no property may be converted to.
+RESERVED_ARGUMENT_NAMES = ["self", "info", "_id", "name", "additional_parameters", "dataset_context", "first",
+                           "after", "chunk_size", "items", "ids"]
+GENERATION_MANIFEST_FILE_PATH = ".generation_manifest.json"
+NAME_MAPPING_FILE_PATH = "generated_name_mapping.json"
+# Bumped whenever the emitted code changes, so class specifications and code cached in the manifest are discarded.
+GENERATOR_VERSION = 9
+
+
+def is_pagination_required(class_specification: Dict) -> bool:
+    return "HighQuantity" in class_specification["labels"]
+
+
+def is_interface(class_specification: Dict) -> bool:
+    return "AbstractClass" in class_specification["labels"]
+
 
+def has_connection(class_specification: Dict) -> bool:
+    # Interfaces are listed through a connection of the objects of every type implementing them.
+    return is_pagination_required(class_specification) or is_interface(class_specification)
 
-def camel_to_snake_case(name: str):
-    snake_case = name[0]
+
+@lru_cache(maxsize=None)
+def camel_to_snake_case(name: str) -> str:
+    for acronym_pattern, word in ACRONYM_PATTERNS:
+        name = acronym_pattern.sub(word, name)
+    snake_case = [name[0]]
     for idx in range(1, len(name) - 1):
         is_upper = name[idx].isupper()
         followed_by_lower = not name[idx + 1].isupper()
         preceded_by_lower = not name[idx - 1].isupper()
-        if (is_upper and followed_by_lower) or (is_upper and preceded_by_lower):
-            snake_case += '_'
-        snake_case += name[idx]
-    snake_case += name[len(name) - 1]  # append last letter
-    return snake_case.lower()
+        if is_upper and (followed_by_lower or preceded_by_lower):
+            snake_case.append('_')
+        snake_case.append(name[idx])
+    if len(name) > 1:
+        snake_case.append(name[-1])
+    return "".join(snake_case).lower()
+
+
+def build_name_mapping(graphql_types: List[Dict]) -> Dict[str, Dict]:
+    """
+    Maps every class to the snake case name used in its queries and mutations, and the argument names of its
+    properties back to the ontology property names. Fails when two names would be converted to the same one.
+    """
+    name_mapping = {}
+    class_names = {}
+    for graphql_type in graphql_types:
+        class_name = camel_to_snake_case(graphql_type["name"])
+        if class_name in class_names:
+            raise Exception(f"Classes {class_names[class_name]} and {graphql_type['name']} both map to {class_name}")
+        class_names[class_name] = graphql_type["name"]
+
+        properties = {}
+        for property_name in graphql_type["fields"]:
+            argument_name = camel_to_snake_case(property_name)
+            if argument_name in properties or argument_name in RESERVED_ARGUMENT_NAMES:
+                raise Exception(f"Property {property_name} of {graphql_type['name']} maps to {argument_name}, "
+                                f"which is already used by {properties.get(argument_name, 'a generated argument')}")
+            properties[argument_name] = property_name
+        name_mapping[graphql_type["name"]] = {"name": class_name, "properties": properties}
+    return name_mapping
+
+
+def save_name_mapping(name_mapping: Dict[str, Dict]) -> bool:
+    return write_file_if_changed(NAME_MAPPING_FILE_PATH, json.dumps(name_mapping, indent=2, sort_keys=True))
+
+
+def get_file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def get_specification_hash(specification: Dict) -> str:
+    return hashlib.sha256(json.dumps(specification, sort_keys=True).encode()).hexdigest()
+
+
+def write_file_if_changed(file_path: str, content: str) -> bool:
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as file:
+            if file.read() == content:
+                return False
+    with open(f"{file_path}.tmp", 'w') as file:
+        file.write(content)
+    os.replace(f"{file_path}.tmp", file_path)
+    return True
+
+
+def load_generation_manifest() -> Dict:
+    if os.path.exists(GENERATION_MANIFEST_FILE_PATH):
+        with open(GENERATION_MANIFEST_FILE_PATH, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get("version") == GENERATOR_VERSION:
+            return manifest
+    return {"version": GENERATOR_VERSION, "ontologies": {}, "classes": {}}
+
+
+def save_generation_manifest(manifest: Dict):
+    # Keys keep their insertion order, as the order of the cached class fields is the order they are emitted in.
+    write_file_if_changed(GENERATION_MANIFEST_FILE_PATH, json.dumps(manifest, indent=2))
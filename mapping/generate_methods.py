@@ -1,131 +1,231 @@
-import ast
-import os
-from typing import TextIO, Tuple
-from common import camel_to_snake_case, BASIC_TYPES
+import re
+from typing import Dict, List, Tuple
+from common import camel_to_snake_case, is_interface, is_pagination_required, BASIC_TYPES
+from generate_types import GENERATED_TYPES_PACKAGE
 
 GENERATED_QUERIES_FILE_PATH = "generated_graphql_queries.py"
 GENERATED_MUTATIONS_FILE_PATH = "generated_graphql_mutations.py"
-ACRONYMS = ["PAD"]
+GENERATED_SUBSCRIPTIONS_FILE_PATH = "generated_graphql_subscriptions.py"
+DEFAULT_PAGE_SIZE = 20
+MAX_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 1000
 
 
 def indent_builder(size: int) -> str:
     return "    " * size
 
 
-def resolve_imports(output_file: TextIO, types_file: str):
-    with open(types_file, 'r') as file:
-        code = file.read()
-    classes = ""
-    tree = ast.parse(code)
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and node.name != "AdditionalParameters":
-            classes = classes + f"{node.name}, "
-    output_file.write(f"from {types_file[:-3]} import {classes[:-2]}\n\n\n")
+def get_annotated_types(operations_code: str, type_names: List[str]) -> List[str]:
+    signatures = "".join(line for line in operations_code.splitlines() if line.lstrip().startswith("async def "))
+    signature_names = set(re.findall(r"\w+", signatures))
+    return [type_name for type_name in type_names if type_name in signature_names]
 
 
-def generate_file_header(file_type: str, generated_types_file_path: str):
+def resolve_imports(types_module: str, imported_types: List[str], type_modules: Dict[str, str]) -> str:
+    # Signatures annotate the types lazily and resolvers import the types they use when called, so importing the
+    # operations loads no ontology module until the schema is built.
+    return "\n" + "".join(f"{type_name} = Annotated[\"{type_name}\", "
+                   f"strawberry.lazy(\"{types_module}.{type_modules[type_name]}\")]\n"
+                   for type_name in imported_types) + "\n\n"
+
+
+def import_types(type_names: List[str]) -> str:
+    return f"{indent_builder(size=2)}from {GENERATED_TYPES_PACKAGE} import {', '.join(type_names)}\n"
+
+
+def generate_file_header(file_type: str, types_module: str, imported_types: List[str],
+                         type_modules: Dict[str, str]) -> str:
+    if file_type == "subscriptions":
+        file_header = ("from typing import Annotated, AsyncGenerator, Optional, List\n\nimport strawberry\n"
+                       "from strawberry.types import Info\n\nfrom resolvers.generated import stream_generated_models\n")
+    elif file_type == "queries":
+        file_header = ("from typing import Annotated, Optional, List\n\nimport strawberry\n"
+                       "from strawberry.types import Info\n\n"
+                       "from extensions.response_cache import CachedQuery\n"
+                       "from resolvers.generated import find_generated_connection, find_generated_object, "
+                       "find_implementation_connection\n")
+    else:
+        file_header = ("from typing import Annotated, Optional, List\n\nimport strawberry\n"
+                       "from strawberry.types import Info\n\n"
+                       "from resolvers.generated import create_generated_object, create_generated_objects, "
+                       "delete_generated_object, delete_generated_objects, update_generated_object, "
+                       "update_generated_objects\n")
+    file_header += resolve_imports(types_module=types_module, imported_types=imported_types, type_modules=type_modules)
     if file_type == "queries":
-        file_path = GENERATED_QUERIES_FILE_PATH
+        file_header += "@strawberry.type\nclass GriseraQuery:\n\n"
+    elif file_type == "subscriptions":
+        file_header += f"MAX_CHUNK_SIZE = {MAX_CHUNK_SIZE}\n\n\n"
+        file_header += "@strawberry.type\nclass GriseraSubscription:\n\n"
     else:
-        file_path = GENERATED_MUTATIONS_FILE_PATH
-
-    if os.path.exists(file_path):
-        os.remove(file_path)
-    with open(file_path, 'a') as file:
-        file.write("from typing import Optional, List\n\nimport strawberry\n\n")
-        resolve_imports(output_file=file, types_file=generated_types_file_path)
-        if file_type == "queries":
-            file.write("@strawberry.type\nclass GriseraQuery:\n\n")
-        else:
-            file.write("@strawberry.type\nclass GriseraMutation:\n\n")
+        file_header += f"MAX_BATCH_SIZE = {MAX_BATCH_SIZE}\n\n\n"
+        file_header += "@strawberry.type\nclass GriseraMutation:\n\n"
+    return file_header
 
 
-def get_property_content(class_property: ast.AnnAssign) -> Tuple[str, str]:
-    property_name = class_property.target.id
+def get_property_content(property_name: str, property_type: str) -> Tuple[str, str]:
     if property_name == "id":
         argument_name = "_id"
         property_type = "str"
     else:
-        if class_property.annotation.id not in BASIC_TYPES:
-            property_type = f"{class_property.annotation.id}Input"
-        else:
-            property_type = class_property.annotation.id
+        if property_type not in BASIC_TYPES:
+            property_type = f"{property_type}Input"
         argument_name = camel_to_snake_case(property_name)
     return argument_name, property_type
 
 
-def generate_graph_queries(generated_types_file_path: str):
-    print(f"Generating GraphQL queries...")
-    generate_file_header(file_type="queries", generated_types_file_path=generated_types_file_path)
-    with open(generated_types_file_path, 'r') as file:
-        tree = ast.parse(file.read())
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and "AdditionalParameters" not in node.name and "Input" not in node.name:
-            with open(GENERATED_QUERIES_FILE_PATH, 'a') as file:
-                query_params = "self, dataset_context: DatasetInput, "
-                for class_property in node.body:
-                    if isinstance(class_property, ast.Expr):
-                        if "PAGINATION_REQUIRED" in node.body[0].value.value:
-                            query_params += f"first: Optional[int] = None, offset: Optional[int] = None, "
-                    if isinstance(class_property, ast.AnnAssign):
-                        if class_property.target.id != "additionalParameters":
-                            argument_name, property_type = get_property_content(class_property)
-                            query_params = query_params + f"{argument_name}: Optional[{property_type}] = None, "
-
-                query_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
-
-                file.write(
-                    f"{indent_builder(size=1)}@strawberry.field\n"
-                    f"{indent_builder(size=1)}def get_{camel_to_snake_case(node.name)}({query_params}) -> {node.name}:\n"
-                    f"{indent_builder(size=2)}pass\n\n")
-    print(f"GraphQL queries generated and saved in {GENERATED_QUERIES_FILE_PATH}")
-
-
-def generate_graph_mutations(generated_types_file_path: str):
-    print(f"Generating GraphQL mutations...")
-    generate_file_header(file_type="mutations", generated_types_file_path=generated_types_file_path)
-    with open(generated_types_file_path, 'r') as file:
-        tree = ast.parse(file.read())
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef) and "AdditionalParameters" not in node.name and "Input" not in node.name:
-            with open(GENERATED_MUTATIONS_FILE_PATH, 'a') as file:
-                if node.name == "Dataset":
-                    delete_parameters = "self, "
-                    create_params = "self, "
-                    update_parameters = "self, "
-                else:
-                    create_params = "self, dataset_context: DatasetInput, "
-                    update_parameters = "self, dataset_context: DatasetInput, "
-                    delete_parameters = "self, dataset_context: DatasetInput, "
-                for class_property in node.body:
-                    if isinstance(class_property, ast.AnnAssign):
-                        if class_property.target.id != "additionalParameters":
-                            argument_name, property_type = get_property_content(class_property)
-                            if class_property.target.id != "id":
-                                create_params = create_params + f"{argument_name}: {property_type}, "
-                                update_parameters = update_parameters + f"{argument_name}: Optional[{property_type}] = None, "
-                            else:
-                                update_parameters = update_parameters + f"{argument_name}: {property_type}, "
-
-                delete_parameters = f"{delete_parameters} name: str" if node.name == "Dataset" else f"{delete_parameters} _id: str"
-                create_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
-                update_parameters += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
-
-                file.write(
-                    f"{indent_builder(size=1)}@strawberry.mutation\n"
-                    f"{indent_builder(size=1)}def create_{camel_to_snake_case(node.name)}({create_params}) -> str:\n"
-                    f"{indent_builder(size=2)}pass\n\n"
-                )
-
-                file.write(
-                    f"{indent_builder(size=1)}@strawberry.mutation\n"
-                    f"{indent_builder(size=1)}def delete_{camel_to_snake_case(node.name)}({delete_parameters}) -> str:\n"
-                    f"{indent_builder(size=2)}pass\n\n"
-                )
-
-                file.write(
-                    f"{indent_builder(size=1)}@strawberry.mutation\n"
-                    f"{indent_builder(size=1)}def update_{camel_to_snake_case(node.name)}({update_parameters}) -> str:\n"
-                    f"{indent_builder(size=2)}pass\n\n"
-                )
-    print(f"GraphQL mutations generated and saved in {GENERATED_MUTATIONS_FILE_PATH}")
+def get_class_arguments_from_specification(class_specification: Dict) -> List[Tuple[str, str, str]]:
+    class_arguments = [("id", *get_property_content("id", "strawberry.ID")),
+                       ("name", *get_property_content("name", "str"))]
+    for prop_name, prop_type in class_specification["fields"].items():
+        class_arguments.append((prop_name, *get_property_content(prop_name, prop_type)))
+    return class_arguments
+
+
+def get_query_arguments(class_specification: Dict) -> str:
+    query_arguments = ", ".join(f"\"{argument_name}\": {argument_name}" for _, argument_name, _
+                                in get_class_arguments_from_specification(class_specification))
+    return f"{{{query_arguments}}}"
+
+
+def create_query_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    query_params = "self, info: Info, dataset_context: DatasetInput, "
+    for _, argument_name, property_type in get_class_arguments_from_specification(class_specification):
+        query_params = query_params + f"{argument_name}: Optional[{property_type}] = None, "
+    query_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
+
+    query = (f"{indent_builder(size=1)}@strawberry.field(extensions=[CachedQuery(\"{class_name}\", "
+             f"id_argument=\"_id\")])\n"
+             f"{indent_builder(size=1)}async def get_{camel_to_snake_case(class_name)}({query_params}) -> "
+             f"Optional[{class_name}]:\n"
+             f"{import_types([class_name])}"
+             f"{indent_builder(size=2)}return await find_generated_object(info, {class_name}, "
+             f"{get_query_arguments(class_specification)}, additional_parameters)\n\n")
+    if is_interface(class_specification):
+        query += create_implementations_query_from_specification(class_specification)
+    elif is_pagination_required(class_specification):
+        query += create_list_query_from_specification(class_specification)
+    return query
+
+
+def create_list_query_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    query_params = (f"self, info: Info, dataset_context: DatasetInput, first: int = {DEFAULT_PAGE_SIZE}, "
+                    f"after: Optional[str] = None, ")
+    for _, argument_name, property_type in get_class_arguments_from_specification(class_specification):
+        query_params = query_params + f"{argument_name}: Optional[{property_type}] = None, "
+    query_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
+
+    return (f"{indent_builder(size=1)}@strawberry.field(extensions=[CachedQuery(\"{class_name}\")])\n"
+            f"{indent_builder(size=1)}async def list_{camel_to_snake_case(class_name)}({query_params}) -> "
+            f"{class_name}Connection:\n"
+            f"{import_types([class_name, f'{class_name}Edge', f'{class_name}Connection'])}"
+            f"{indent_builder(size=2)}return await find_generated_connection(info, {class_name}, {class_name}Edge, "
+            f"{class_name}Connection, {get_query_arguments(class_specification)}, additional_parameters, first, "
+            f"after)\n\n")
+
+
+def create_implementations_query_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    query_params = (f"self, info: Info, dataset_context: DatasetInput, first: int = {DEFAULT_PAGE_SIZE}, "
+                    f"after: Optional[str] = None")
+
+    return (f"{indent_builder(size=1)}@strawberry.field(extensions=[CachedQuery(\"{class_name}\")])\n"
+            f"{indent_builder(size=1)}async def list_{camel_to_snake_case(class_name)}({query_params}) -> "
+            f"{class_name}Connection:\n"
+            f"{import_types([class_name, f'{class_name}Edge', f'{class_name}Connection'])}"
+            f"{indent_builder(size=2)}return await find_implementation_connection(info, {class_name}, "
+            f"{class_name}Edge, {class_name}Connection, first, after)\n\n")
+
+
+def create_subscription_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    query_params = f"self, info: Info, dataset_context: DatasetInput, chunk_size: int = {DEFAULT_CHUNK_SIZE}, "
+    for _, argument_name, property_type in get_class_arguments_from_specification(class_specification):
+        query_params = query_params + f"{argument_name}: Optional[{property_type}] = None, "
+    query_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
+
+    return (f"{indent_builder(size=1)}@strawberry.subscription\n"
+            f"{indent_builder(size=1)}async def stream_{camel_to_snake_case(class_name)}"
+            f"({query_params}) -> AsyncGenerator[List[{class_name}], None]:\n"
+            f"{indent_builder(size=2)}if chunk_size < 1 or chunk_size > MAX_CHUNK_SIZE:\n"
+            f"{indent_builder(size=3)}raise Exception(f\"chunk_size must be between 1 and {{MAX_CHUNK_SIZE}}\")\n"
+            f"{import_types([class_name])}"
+            f"{indent_builder(size=2)}async for chunk in stream_generated_models(info, {class_name}, dataset_context, "
+            f"{get_query_arguments(class_specification)}, additional_parameters, chunk_size):\n"
+            f"{indent_builder(size=3)}yield chunk\n\n")
+
+
+def get_mutation_arguments(class_specification: Dict, with_id: bool) -> str:
+    # Mutations take the ID as _id, the resolvers as the id field of the object.
+    mutation_arguments = [f"\"id\": _id"] if with_id else []
+    mutation_arguments += [f"\"{argument_name}\": {argument_name}" for prop_name, argument_name, _
+                           in get_class_arguments_from_specification(class_specification) if prop_name != "id"]
+    mutation_arguments.append("\"additional_parameters\": additional_parameters")
+    return f"{{{', '.join(mutation_arguments)}}}"
+
+
+def create_mutations_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    if class_name == "Dataset":
+        delete_parameters = "self, info: Info, "
+        create_params = "self, info: Info, "
+        update_parameters = "self, info: Info, "
+    else:
+        create_params = "self, info: Info, dataset_context: DatasetInput, "
+        update_parameters = "self, info: Info, dataset_context: DatasetInput, "
+        delete_parameters = "self, info: Info, dataset_context: DatasetInput, "
+    for prop_name, argument_name, property_type in get_class_arguments_from_specification(class_specification):
+        if prop_name != "id":
+            create_params = create_params + f"{argument_name}: {property_type}, "
+            update_parameters = update_parameters + f"{argument_name}: Optional[{property_type}] = None, "
+        else:
+            update_parameters = update_parameters + f"{argument_name}: {property_type}, "
+
+    # Datasets are deleted by name, as their name is what operations give as their dataset context.
+    delete_parameters = f"{delete_parameters}name: str" if class_name == "Dataset" else f"{delete_parameters}_id: str"
+    delete_arguments = "{\"name\": name}" if class_name == "Dataset" else "{\"_id\": _id}"
+    create_params += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
+    update_parameters += "additional_parameters: Optional[List[AdditionalParameterInput]] = None"
+
+    return (f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def create_{camel_to_snake_case(class_name)}({create_params}) -> str:\n"
+            f"{import_types([class_name])}"
+            f"{indent_builder(size=2)}return await create_generated_object(info, {class_name}, "
+            f"{get_mutation_arguments(class_specification, with_id=False)})\n\n"
+            f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def delete_{camel_to_snake_case(class_name)}({delete_parameters}) -> str:\n"
+            f"{import_types([class_name])}"
+            f"{indent_builder(size=2)}return await delete_generated_object(info, {class_name}, {delete_arguments})\n\n"
+            f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def update_{camel_to_snake_case(class_name)}({update_parameters}) -> str:\n"
+            f"{import_types([class_name])}"
+            f"{indent_builder(size=2)}return await update_generated_object(info, {class_name}, "
+            f"{get_mutation_arguments(class_specification, with_id=True)})\n\n")
+
+
+def get_batch_mutation_body(resolver: str, class_name: str, batch_argument: str) -> str:
+    return (f"{indent_builder(size=2)}if len({batch_argument}) > MAX_BATCH_SIZE:\n"
+            f"{indent_builder(size=3)}raise Exception(f\"Batch cannot exceed {{MAX_BATCH_SIZE}} items\")\n"
+            f"{import_types([class_name, 'BatchItemResult'])}"
+            f"{indent_builder(size=2)}return await {resolver}(info, {class_name}, {batch_argument}, "
+            f"BatchItemResult)\n\n")
+
+
+def create_batch_mutations_from_specification(class_specification: Dict) -> str:
+    class_name = class_specification["name"]
+    snake_case_name = camel_to_snake_case(class_name)
+
+    return (f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def create_{snake_case_name}_batch(self, info: Info, "
+            f"dataset_context: DatasetInput, items: List[{class_name}Input]) -> List[BatchItemResult]:\n"
+            f"{get_batch_mutation_body('create_generated_objects', class_name, 'items')}"
+            f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def delete_{snake_case_name}_batch(self, info: Info, "
+            f"dataset_context: DatasetInput, ids: List[str]) -> List[BatchItemResult]:\n"
+            f"{get_batch_mutation_body('delete_generated_objects', class_name, 'ids')}"
+            f"{indent_builder(size=1)}@strawberry.mutation\n"
+            f"{indent_builder(size=1)}async def update_{snake_case_name}_batch(self, info: Info, "
+            f"dataset_context: DatasetInput, items: List[{class_name}Input]) -> List[BatchItemResult]:\n"
+            f"{get_batch_mutation_body('update_generated_objects', class_name, 'items')}")
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from common import build_name_mapping, get_specification_hash, has_connection, load_generation_manifest, \
+    save_generation_manifest, save_name_mapping, write_file_if_changed, NAME_MAPPING_FILE_PATH
+from generate_methods import create_batch_mutations_from_specification, create_mutations_from_specification, \
+    create_query_from_specification, create_subscription_from_specification, generate_file_header, \
+    get_annotated_types, GENERATED_MUTATIONS_FILE_PATH, GENERATED_QUERIES_FILE_PATH, GENERATED_SUBSCRIPTIONS_FILE_PATH
+from generate_tables import create_tables_file, GENERATED_TABLES_FILE_PATH
+from generate_types import create_class_from_specification, create_types_module_header, \
+    create_types_package_init, get_affected_graphql_types, get_module_imports, has_reference_fields, \
+    BASE_GRAPHQL_TYPE_SPECIFICATIONS, BASE_GRAPHQL_TYPES, BASE_GRAPHQL_TYPES_SPEC, BASE_TYPES_MODULE, \
+    GENERATED_TYPES_PACKAGE
+from schema_snapshot import GENERATED_SCHEMA_SNAPSHOT_FILE_PATH
+
+GENERATE_SCHEMA_SNAPSHOT = os.environ.get("GRISERA_GENERATE_SCHEMA_SNAPSHOT", "1") == "1"
+
+
+def save_generated_file(file_path: str, file_content: str) -> bool:
+    if write_file_if_changed(file_path, file_content):
+        print(f"Generated code saved in {file_path}")
+        return True
+    print(f"{file_path} is up to date")
+    return False
+
+
+def save_types_package(types_code: Dict[str, List[str]], module_imports: Dict[str, Dict[str, set]],
+                       type_modules: Dict[str, str], reference_modules: set) -> bool:
+    os.makedirs(GENERATED_TYPES_PACKAGE, exist_ok=True)
+    package_changed = [save_generated_file(os.path.join(GENERATED_TYPES_PACKAGE, "__init__.py"),
+                                           create_types_package_init(type_modules))]
+    for module, module_code in types_code.items():
+        package_changed.append(save_generated_file(os.path.join(GENERATED_TYPES_PACKAGE, f"{module}.py"),
+                                                   create_types_module_header(module_imports.get(module, {}),
+                                                                              module in reference_modules,
+                                                                              module == BASE_TYPES_MODULE)
+                                                   + "".join(module_code)))
+
+    # Modules of ontologies that no longer produce any type, and the former single types file, would shadow or
+    # outlive the package contents.
+    stale_files = [os.path.join(GENERATED_TYPES_PACKAGE, file_name) for file_name in os.listdir(GENERATED_TYPES_PACKAGE)
+                   if file_name.endswith(".py") and file_name != "__init__.py" and file_name[:-3] not in types_code]
+    if os.path.exists(f"{GENERATED_TYPES_PACKAGE}.py"):
+        stale_files.append(f"{GENERATED_TYPES_PACKAGE}.py")
+    for stale_file in stale_files:
+        os.remove(stale_file)
+        print(f"Removed stale {stale_file}")
+    return any(package_changed) or bool(stale_files)
+
+
+def create_operations_file(file_type: str, operations_code: List[str], imported_types: List[str],
+                           type_modules: Dict[str, str]) -> str:
+    code = "".join(operations_code)
+    return generate_file_header(file_type, GENERATED_TYPES_PACKAGE, get_annotated_types(code, imported_types),
+                                type_modules) + code
+
+
+def generate_schema_snapshot():
+    # Built in a fresh interpreter, so the snapshot reflects the files just written rather than any imported earlier.
+    subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_snapshot.py")],
+                   check=True)
+
+
+def generate_graphql_schema(graphql_types: List[Dict]):
+    print("Generating GraphQL types, queries and mutations...")
+    name_mapping = build_name_mapping(graphql_types)
+    manifest = load_generation_manifest()
+    affected_types = get_affected_graphql_types(graphql_types, emitted_classes=manifest["classes"])
+    print(f"Re-emitting {len(affected_types)} of {len(graphql_types)} GraphQL types")
+
+    types_code = {BASE_TYPES_MODULE: [BASE_GRAPHQL_TYPES_SPEC, "\n"]}
+    module_imports = {}
+    type_modules = {base_type: BASE_TYPES_MODULE for base_type in BASE_GRAPHQL_TYPES}
+    queries_code = [create_query_from_specification(base_type) for base_type in BASE_GRAPHQL_TYPE_SPECIFICATIONS]
+    mutations_code = [create_mutations_from_specification(base_type) for base_type in BASE_GRAPHQL_TYPE_SPECIFICATIONS]
+    imported_types = ["AdditionalParameterInput", "BatchItemResult", "Thing", "ThingEdge", "ThingConnection", "Dataset",
+                      "DatasetInput"]
+    subscriptions_code = []
+    reference_modules = set()
+    emitted_classes = {}
+    for class_specification in graphql_types:
+        queries_code.append(create_query_from_specification(class_specification))
+        mutations_code.append(create_mutations_from_specification(class_specification))
+        mutations_code.append(create_batch_mutations_from_specification(class_specification))
+        subscriptions_code.append(create_subscription_from_specification(class_specification))
+
+        class_name = class_specification["name"]
+        if class_name in affected_types:
+            class_code = create_class_from_specification(class_specification=class_specification)
+        else:
+            class_code = manifest["classes"][class_name]["code"]
+        emitted_classes[class_name] = {"hash": get_specification_hash(class_specification), "code": class_code}
+        module = class_specification["module"]
+        types_code.setdefault(module, []).append(class_code + "\n")
+        if has_reference_fields(class_specification):
+            reference_modules.add(module)
+        for imported_module, imported_module_types in get_module_imports(class_specification, type_modules).items():
+            module_imports.setdefault(module, {}).setdefault(imported_module, set()).update(imported_module_types)
+        class_types = [class_name, f"{class_name}Input"]
+        if has_connection(class_specification):
+            class_types += [f"{class_name}Edge", f"{class_name}Connection"]
+        for class_type in class_types:
+            type_modules[class_type] = module
+        imported_types += class_types
+
+    generated_files_changed = [
+        save_types_package(types_code, module_imports, type_modules, reference_modules),
+        save_generated_file(GENERATED_QUERIES_FILE_PATH,
+                            create_operations_file("queries", queries_code, imported_types, type_modules)),
+        save_generated_file(GENERATED_MUTATIONS_FILE_PATH,
+                            create_operations_file("mutations", mutations_code, imported_types, type_modules)),
+        save_generated_file(GENERATED_SUBSCRIPTIONS_FILE_PATH,
+                            create_operations_file("subscriptions", subscriptions_code, imported_types, type_modules)),
+        save_generated_file(GENERATED_TABLES_FILE_PATH,
+                            create_tables_file(BASE_GRAPHQL_TYPE_SPECIFICATIONS + graphql_types))]
+    if GENERATE_SCHEMA_SNAPSHOT and (any(generated_files_changed)
+                                     or not os.path.exists(GENERATED_SCHEMA_SNAPSHOT_FILE_PATH)):
+        generate_schema_snapshot()
+
+    if save_name_mapping(name_mapping):
+        print(f"Name mapping saved in {NAME_MAPPING_FILE_PATH}")
+
+    manifest["classes"] = emitted_classes
+    save_generation_manifest(manifest)
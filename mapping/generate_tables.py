@@ -0,0 +1,74 @@
+from typing import Dict, List
+
+from common import camel_to_snake_case, is_interface, BASIC_TYPES
+
+GENERATED_TABLES_FILE_PATH = "generated_storage_tables.py"
+
+
+def get_reference_column(property_name: str) -> str:
+    return f"{camel_to_snake_case(property_name)}_id"
+
+
+def format_columns(columns: List[str]) -> str:
+    quoted_columns = ", ".join(f"\"{column}\"" for column in columns)
+    return f"({quoted_columns},)" if len(columns) == 1 else f"({quoted_columns})"
+
+
+def get_inherited_fields(class_specification: Dict, specifications: Dict[str, Dict]) -> Dict[str, str]:
+    # Fields of the interfaces come first, in the order the generated dataclasses inherit them.
+    fields = {}
+    for interface in class_specification["interfaces"]:
+        if interface in specifications:
+            fields.update(get_inherited_fields(specifications[interface], specifications))
+    fields.update(class_specification["fields"])
+    return fields
+
+
+def get_interface_tables(class_specification: Dict, specifications: Dict[str, Dict]) -> List[str]:
+    """
+    Returns the tables of every interface the class implements, directly or through any of its ancestors, which is
+    the subclass closure the objects of the class are listed in the type index by.
+    """
+    interface_tables = []
+    for interface in class_specification["interfaces"]:
+        if interface not in specifications:
+            continue
+        ancestor_tables = get_interface_tables(specifications[interface], specifications)
+        if is_interface(specifications[interface]):
+            ancestor_tables.insert(0, camel_to_snake_case(interface))
+        interface_tables += [table for table in ancestor_tables if table not in interface_tables]
+    return interface_tables
+
+
+def create_table_from_specification(class_specification: Dict, specifications: Dict[str, Dict]) -> str:
+    reference_columns = []
+    scalar_columns = []
+    indexed_columns = []
+    # Interfaces hold no objects, so the queries of an interface filter on its properties in the tables of the types
+    # implementing it. Every inherited property is therefore indexed in each of them, as are its own.
+    for prop_name, prop_type in get_inherited_fields(class_specification, specifications).items():
+        if prop_type in BASIC_TYPES:
+            scalar_columns.append(camel_to_snake_case(prop_name))
+        else:
+            reference_columns.append(get_reference_column(prop_name))
+        indexed_columns.append(scalar_columns[-1] if prop_type in BASIC_TYPES else reference_columns[-1])
+    return (f"    \"{class_specification['name']}\": TableDefinition(\n"
+            f"        name=\"{camel_to_snake_case(class_specification['name'])}\",\n"
+            f"        reference_columns={format_columns(reference_columns)},\n"
+            f"        scalar_columns={format_columns(scalar_columns)},\n"
+            f"        indexed_columns={format_columns(indexed_columns)},\n"
+            f"        interfaces={format_columns(get_interface_tables(class_specification, specifications))},\n"
+            f"        is_interface={is_interface(class_specification)}),\n")
+
+
+def create_tables_file(graphql_types: List[Dict]) -> str:
+    specifications = {class_specification["name"]: class_specification for class_specification in graphql_types}
+    tables_code = "".join(create_table_from_specification(class_specification, specifications)
+                          for class_specification in graphql_types)
+    return f"""from storage.tables import TableDefinition
+
+# Storage tables of the generated types keyed by type name, with a secondary index on every property the queries of
+# the type filter on and the interfaces the objects of the type are listed under.
+GENERATED_TABLES = {{
+{tables_code}}}
+"""
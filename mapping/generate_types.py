@@ -1,31 +1,125 @@
+import heapq
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
-import requests
 from owlready2 import *
 
-from common import camel_to_snake_case, BASIC_TYPES
-
-GENERATED_TYPES_FILE_PATH = "generated_graphql_types.py"
+from common import camel_to_snake_case, get_file_hash, get_specification_hash, has_connection, is_interface, \
+    is_pagination_required, load_generation_manifest, save_generation_manifest, BASIC_TYPES
+from owl_cache import close_ontology_world, fetch_json, fetch_owl_files, get_quadstore_path, \
+    load_owl_files_into_world, open_ontology_world
+
+GENERATED_TYPES_PACKAGE = "generated_graphql_types"
+BASE_TYPES_MODULE = "base"
+GITHUB_BRANCH = "lniedzwiadek/add-additional-annotations"
+GITHUB_API_URL = "https://api.github.com/repos/GRISERA/road"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com/GRISERA/road"
+ROAD_WEBSITE_URL = "https://road.affectivese.org/documentation"
+# Ontology files are mapped in this many processes, as owlready2 parsing and mapping are bound to a single core.
+MAPPING_WORKERS = int(os.environ.get("GRISERA_MAPPING_WORKERS", "1"))
 OWL_ONTOLOGY_FILES = ["Main.owl", "Properties.owl", "Stimulus.owl", "Models.Measures.Emotion.PAD.owl",
                       "Models.Measures.Emotion.Ekman.owl", "Models.Measures.Emotion.Neutral.owl",
                       "Models.Measures.SignalDependent.EDA.owl", "Models.Appearance.Somatotype.owl",
                       "Models.Appearance.Occlusion.owl", "Models.Personality.BigFive.owl"]
+BASE_GRAPHQL_TYPES = ["AdditionalParameters", "AdditionalParameterInput", "PageInfo", "BatchItemResult", "Thing",
+                      "ThingEdge", "ThingConnection", "Dataset", "DatasetInput"]
+BASE_GRAPHQL_TYPE_SPECIFICATIONS = [
+    {"name": "Thing", "description": "", "fields": {}, "interfaces": [], "labels": ["AbstractClass"]},
+    {"name": "Dataset", "description": "", "fields": {}, "interfaces": ["Thing"], "labels": []},
+]
+GRAPHQL_TYPES_FILE_HEADER = "from typing import List, Optional\n\nimport strawberry\n\n"
+BASE_GRAPHQL_TYPES_SPEC = """
+@strawberry.type
+class AdditionalParameters:
+    \"""
+    A set of additional parameters that can be assigned to any ROAD class.
+    \"""
+    key: str
+    value: str\n
+    
+@strawberry.input
+class AdditionalParameterInput:
+    key: str = None
+    value: str = None\n
 
+@strawberry.type
+class PageInfo:
+    hasNextPage: bool
+    hasPreviousPage: bool
+    startCursor: Optional[str]
+    endCursor: Optional[str]\n
 
-def get_owl_files_from_github(branch: str, owl_root_file_name: str = "owlAC.owl") -> List[str]:
-    owl_files = []
-    url = f"https://api.github.com/repos/GRISERA/road/git/trees/{branch}?recursive=1"
-    response = requests.get(url)
-    response_json = response.json()
+@strawberry.type
+class BatchItemResult:
+    \"""
+    The outcome of a single item of a batch mutation, holding either the ID of the affected object or an error.
+    \"""
+    id: Optional[strawberry.ID]
+    error: Optional[str]\n
+
+@strawberry.interface
+class Thing:
+    id: strawberry.ID
+    name: str
+    additional_parameters: strawberry.Private[AdditionalParameterPairs]
+
+    @strawberry.field
+    def additionalParameters(self, keys: Optional[List[str]] = None) -> Optional[List[AdditionalParameters]]:
+        selected_keys = set(keys) if keys is not None else None
+        return [AdditionalParameters(key=key, value=value) for key, value in self.additional_parameters
+                if selected_keys is None or key in selected_keys]
+
+    # Objects are always created as their concrete type, so it is read from the object instead of being matched
+    # against every type implementing the interface.
+    @classmethod
+    def resolve_type(cls, obj, info, abstract_type) -> str:
+        return obj.__strawberry_definition__.name
+
+    @classmethod
+    def is_type_of(cls, obj, info) -> bool:
+        return type(obj) is cls
+
+
+@strawberry.type
+class ThingEdge:
+    cursor: str
+    node: Thing
+
+
+@strawberry.type
+class ThingConnection:
+    edges: List[ThingEdge]
+    pageInfo: PageInfo
+
+@strawberry.type
+class Dataset(Thing):
+    id: strawberry.ID
+    name: str\n
+
+@strawberry.input
+class DatasetInput:
+    name: str = None\n"""
+
+
+@lru_cache
+def get_owl_file_revisions_from_github(branch: str) -> Dict[str, str]:
+    response_json = fetch_json(f"{GITHUB_API_URL}/git/trees/{branch}?recursive=1")
     if "tree" not in response_json:
         raise Exception(f"Error fetching OWL files from GitHub: {response_json}")
 
+    owl_file_revisions = {}
     for gh_file in response_json["tree"]:
         if gh_file["path"].endswith(".owl"):
-            owl_files.append(f"https://raw.githubusercontent.com/GRISERA/road/{branch}/{gh_file['path']}")
+            owl_file_revisions[f"{GITHUB_RAW_URL}/{branch}/{gh_file['path']}"] = gh_file["sha"]
+    return owl_file_revisions
 
-    owl_files.insert(0, owl_files.pop(
-        owl_files.index(f"https://raw.githubusercontent.com/GRISERA/road/{branch}/{owl_root_file_name}")))
+
+def get_owl_files_from_github(branch: str, owl_root_file_name: str = "owlAC.owl") -> List[str]:
+    owl_files = list(get_owl_file_revisions_from_github(branch))
+    owl_files.insert(0, owl_files.pop(owl_files.index(f"{GITHUB_RAW_URL}/{branch}/{owl_root_file_name}")))
     return owl_files
 
 
@@ -45,7 +139,7 @@ def get_owl_files_from_local_directory(owl_root_file_name: str = "owlAC.owl") ->
 def get_owl_files_from_road_website() -> List[str]:
     owl_files = []
     for file in OWL_ONTOLOGY_FILES:
-        owl_files.append(f"https://road.affectivese.org/documentation/{file}")
+        owl_files.append(f"{ROAD_WEBSITE_URL}/{file}")
     return owl_files
 
 
@@ -87,28 +181,35 @@ def get_fields_from_owl(road_class) -> Dict:
     return fields_properties
 
 
-def get_class_properties_from_specification(class_specification: Dict) -> Tuple[str, str]:
-    if "fields" in class_specification:
-        unique_properties_str = ""
-        for prop_name, prop_type in class_specification['fields'].items():
-            converted_prop = camel_to_snake_case(prop_name)
-            formatted_str = f"\n    {converted_prop}: {prop_type}"
-            unique_properties_str += formatted_str
+def has_reference_fields(class_specification: Dict) -> bool:
+    return any(prop_type not in BASIC_TYPES for prop_type in class_specification["fields"].values())
+
 
-        unique_input_properties_str = ""
+def get_class_properties_from_specification(class_specification: Dict) -> Tuple[str, str, str]:
+    if "fields" in class_specification:
+        unique_properties = []
+        unique_input_properties = []
+        reference_resolvers = []
         for prop_name, prop_type in class_specification['fields'].items():
             converted_prop = camel_to_snake_case(prop_name)
             if prop_type in BASIC_TYPES:
-                formatted_str = f"\n    {converted_prop}: Optional[{prop_type}] = None"
+                unique_properties.append(f"\n    {converted_prop}: {prop_type}")
+                unique_input_properties.append(f"\n    {converted_prop}: Optional[{prop_type}] = None")
             else:
-                formatted_str = f"\n    {converted_prop}: Optional[{prop_type}Input] = None"
-            unique_input_properties_str += formatted_str
-        return unique_properties_str, unique_input_properties_str
-    return "", ""
+                # Only the ID of a referenced object is stored, the object is loaded when the field is selected.
+                unique_properties.append(f"\n    {converted_prop}_id: strawberry.Private[Optional[str]]")
+                unique_input_properties.append(f"\n    {converted_prop}: Optional[{prop_type}Input] = None")
+                reference_resolvers.append(f"""
+
+    @strawberry.field
+    async def {converted_prop}(self, info: Info) -> Optional[{prop_type}]:
+        return await load_reference(info, {prop_type}, self.{converted_prop}_id)""")
+        return "".join(unique_properties), "".join(unique_input_properties), "".join(reference_resolvers)
+    return "", "", ""
 
 
 def get_class_signature_details_from_specification(class_specification: Dict) -> Tuple[str, str]:
-    if "AbstractClass" in class_specification["labels"]:
+    if is_interface(class_specification):
         strawberry_header = "@strawberry.interface"
     else:
         strawberry_header = "@strawberry.type"
@@ -116,25 +217,25 @@ def get_class_signature_details_from_specification(class_specification: Dict) ->
     for interface in class_specification["interfaces"]:
         class_interfaces += f"{interface}, "
     class_interfaces = class_interfaces[:-2] + ")"
-
-    if "HighQuantity" in class_specification["labels"]:
-        class_specification["description"] += "\n    PAGINATION_REQUIRED"
     return strawberry_header, class_interfaces
 
 
 def create_class_from_specification(class_specification: Dict) -> str:
-    unique_properties_str, unique_input_properties_str = get_class_properties_from_specification(class_specification)
+    unique_properties_str, unique_input_properties_str, reference_resolvers_str = \
+        get_class_properties_from_specification(class_specification)
     strawberry_header, class_interfaces = get_class_signature_details_from_specification(class_specification)
+    class_description = class_specification["description"]
+    if is_pagination_required(class_specification):
+        class_description += "\n    PAGINATION_REQUIRED"
 
     class_definition = f"""
 {strawberry_header}
 class {class_specification["name"]}{class_interfaces}:
     \"""
-    {class_specification["description"]}
+    {class_description}
     \"""
     id: strawberry.ID
-    name: str
-    additionalParameters: Optional[List[AdditionalParameters]]{unique_properties_str}
+    name: str{unique_properties_str}{reference_resolvers_str}
     
     
 @strawberry.input
@@ -142,111 +243,203 @@ class {class_specification["name"]}Input:
     id: Optional[strawberry.ID] = None
     name: Optional[str] = None{unique_input_properties_str}
 """
+    if has_connection(class_specification):
+        class_definition += create_connection_from_specification(class_specification)
     return class_definition
 
 
-def check_if_subclass_exists(ordered_types: List[Dict], value: str) -> bool:
-    for ordered_type in ordered_types:
-        if value == ordered_type["name"] or value in BASIC_TYPES:
-            return True
-    return False
+def create_connection_from_specification(class_specification: Dict) -> str:
+    return f"""
 
+@strawberry.type
+class {class_specification["name"]}Edge:
+    cursor: str
+    node: {class_specification["name"]}
 
-def check_if_class_already_exists(road_class: str) -> bool:
-    with open(GENERATED_TYPES_FILE_PATH, 'r') as file:
-        for line in file.readlines():
-            if f"class {road_class}" in line:
-                return True
-    return False
 
+@strawberry.type
+class {class_specification["name"]}Connection:
+    edges: List[{class_specification["name"]}Edge]
+    pageInfo: PageInfo
+"""
 
-def order_graphql_types(graphql_types: List[Dict]) -> List[Dict]:
-    graphql_types = sorted(graphql_types, key=lambda x: len(x['fields']))
-    if len(graphql_types) == 1:
-        return graphql_types
 
-    ordered_types = []
+def get_ontology_module_name(owl_file: str) -> str:
+    ontology_name = os.path.basename(owl_file.split("?")[0])
+    if ontology_name.endswith(".owl"):
+        ontology_name = ontology_name[:-4]
+    return re.sub(r"[^0-9a-zA-Z]+", "_", ontology_name).lower()
+
+
+def get_module_imports(class_specification: Dict, type_modules: Dict[str, str]) -> Dict[str, set]:
+    """
+    Returns the types a generated class needs from other modules of the types package, grouped by module.
+    """
+    imported_types = list(class_specification["interfaces"])
+    for field_type in class_specification["fields"].values():
+        if field_type not in BASIC_TYPES:
+            imported_types += [field_type, f"{field_type}Input"]
+    if has_connection(class_specification):
+        imported_types.append("PageInfo")
+
+    module_imports = {}
+    for imported_type in imported_types:
+        module = BASE_TYPES_MODULE if imported_type in BASE_GRAPHQL_TYPES else type_modules.get(imported_type)
+        if module is not None and module != class_specification["module"]:
+            module_imports.setdefault(module, set()).add(imported_type)
+    return module_imports
+
+
+def create_types_module_header(module_imports: Dict[str, set], resolves_references: bool = False,
+                               base_module: bool = False) -> str:
+    module_header = GRAPHQL_TYPES_FILE_HEADER
+    if resolves_references:
+        module_header = module_header.replace("import strawberry\n",
+                                              "import strawberry\nfrom strawberry.types import Info\n")
+    if base_module:
+        module_header += "from models.data_types import AdditionalParameterPairs\n"
+    for module, imported_types in sorted(module_imports.items()):
+        module_header += f"from {GENERATED_TYPES_PACKAGE}.{module} import {', '.join(sorted(imported_types))}\n"
+    if resolves_references:
+        module_header += "from resolvers.generated import load_reference\n"
+    return module_header + "\n"
+
+
+def create_types_package_init(type_modules: Dict[str, str]) -> str:
+    type_modules_str = "".join(f"\n    \"{name}\": \"{module}\"," for name, module in type_modules.items())
+    return f"""import importlib
+
+# Every type is imported from its ontology module on first access, so only the ontologies in use are loaded.
+TYPE_MODULES = {{{type_modules_str}
+}}
+
+
+def __getattr__(name: str):
+    if name not in TYPE_MODULES:
+        raise AttributeError(f"module {{__name__}} has no attribute {{name}}")
+    # Kept in the package, so the resolvers importing the type on every call find it without calling this again.
+    graphql_type = globals()[name] = getattr(importlib.import_module(f"{{__name__}}.{{TYPE_MODULES[name]}}"), name)
+    return graphql_type
+"""
 
-    while len(ordered_types) != len(graphql_types):
-        for new_type in graphql_types:
-            dependencies = new_type["interfaces"].copy()
-            if len(new_type['fields']) > 0:
-                dependencies += list(new_type['fields'].values())
-            if len(dependencies) > 0:
-                good_to_go = False
-                for value in dependencies:
-                    if check_if_subclass_exists(ordered_types=ordered_types, value=value):
-                        good_to_go = True
-                    elif check_if_class_already_exists(road_class=value):
-                        good_to_go = True
-                    else:
-                        good_to_go = False
-                        break
-            else:
-                good_to_go = True
-            if good_to_go and new_type not in ordered_types:
-                ordered_types.append(new_type)
+
+def get_type_dependencies(graphql_type: Dict) -> List[str]:
+    dependencies = graphql_type["interfaces"] + list(graphql_type["fields"].values())
+    return [dependency for dependency in dependencies if dependency not in BASIC_TYPES]
+
+
+def order_graphql_types(graphql_types: List[Dict], generated_types: Dict[str, Dict] = None) -> List[Dict]:
+    generated_types = generated_types or {}
+    types_by_name = {graphql_type["name"]: graphql_type for graphql_type in graphql_types}
+    pending_dependencies = {name: set() for name in types_by_name}
+    dependents = {name: [] for name in types_by_name}
+
+    for name, graphql_type in types_by_name.items():
+        for dependency in get_type_dependencies(graphql_type):
+            if dependency not in types_by_name and (dependency in BASE_GRAPHQL_TYPES or dependency in generated_types):
+                continue
+            if dependency not in pending_dependencies[name]:
+                pending_dependencies[name].add(dependency)
+                if dependency in dependents:
+                    dependents[dependency].append(name)
+
+    # Ties are broken by field count and then by name, so the output does not depend on the OWL class order.
+    ready_types = [(len(types_by_name[name]["fields"]), name)
+                   for name, dependencies in pending_dependencies.items() if not dependencies]
+    heapq.heapify(ready_types)
+    ordered_types = []
+    while ready_types:
+        _, name = heapq.heappop(ready_types)
+        ordered_types.append(types_by_name[name])
+        for dependent in dependents[name]:
+            pending_dependencies[dependent].discard(name)
+            if not pending_dependencies[dependent]:
+                heapq.heappush(ready_types, (len(types_by_name[dependent]["fields"]), dependent))
+
+    if len(ordered_types) != len(types_by_name):
+        unresolved_types = {name: sorted(dependencies) for name, dependencies in sorted(pending_dependencies.items())
+                            if dependencies}
+        missing_types = sorted({dependency for dependencies in unresolved_types.values() for dependency in dependencies
+                                if dependency not in types_by_name})
+        raise Exception(f"Unable to order GraphQL types, missing types: {missing_types}, "
+                        f"unresolved (cyclic or dependent on missing) types: {unresolved_types}")
     return ordered_types
 
 
-def process_owl_file(owl_file_path: str) -> List[Dict]:
-    onto = get_ontology(owl_file_path).load()
-    road_classes = list(onto.classes())
-    graphql_types = []
-    for road_class in road_classes:
-        if check_if_class_already_exists(road_class.name):
-            continue
-        translated_owl_class = map_class_from_owl(road_class)
-        graphql_types.append(translated_owl_class)
+def map_owl_file(owl_file_path: str, world: World = None) -> List[Dict]:
+    # The ontology IRI may be given instead of the file path, get_ontology accepts either.
+    onto = (world or default_world).get_ontology(owl_file_path).load()
+    return [map_class_from_owl(road_class) for road_class in onto.classes()]
 
-    graphql_types = order_graphql_types(graphql_types)
-    return graphql_types
 
+def select_new_graphql_types(graphql_types: List[Dict], generated_types: Dict[str, Dict] = None) -> List[Dict]:
+    generated_types = generated_types or {}
+    graphql_types = [graphql_type for graphql_type in graphql_types
+                     if graphql_type["name"] not in BASE_GRAPHQL_TYPES and graphql_type["name"] not in generated_types]
+    return order_graphql_types(graphql_types, generated_types=generated_types)
 
-def save_types_into_file(graphql_types: List[Dict]):
-    with open(GENERATED_TYPES_FILE_PATH, 'a') as graphql_types_file:
-        for graphql_type in graphql_types:
-            graphql_types_file.write(create_class_from_specification(class_specification=graphql_type) + '\n')
 
+def process_owl_file(owl_file_path: str, generated_types: Dict[str, Dict] = None) -> List[Dict]:
+    return select_new_graphql_types(map_owl_file(owl_file_path), generated_types=generated_types)
 
-def generate_graphql_types_from_owl(source: str) -> str:
-    additional_parameters_spec = f"""
-@strawberry.type
-class AdditionalParameters:
-    \"""
-    A set of additional parameters that can be assigned to any ROAD class.
-    \"""
-    key: str
-    value: str\n
-    
-@strawberry.input
-class AdditionalParameterInput:
-    key: str = None
-    value: str = None\n
 
-@strawberry.interface
-class Thing:
-    id: strawberry.ID
-    name: str
-    additionalParameters: Optional[List[AdditionalParameters]]
+def get_affected_graphql_types(graphql_types: List[Dict], emitted_classes: Dict[str, Dict]) -> set:
+    dependents = {}
+    for graphql_type in graphql_types:
+        for dependency in get_type_dependencies(graphql_type):
+            dependents.setdefault(dependency, []).append(graphql_type["name"])
 
-@strawberry.type
-class Dataset(Thing):
-    id: strawberry.ID
-    name: str\n
+    affected_types = [graphql_type["name"] for graphql_type in graphql_types
+                      if emitted_classes.get(graphql_type["name"], {}).get("hash")
+                      != get_specification_hash(graphql_type)]
+    visited_types = set()
+    while affected_types:
+        name = affected_types.pop()
+        if name not in visited_types:
+            visited_types.add(name)
+            affected_types.extend(dependents.get(name, []))
+    return visited_types
 
-@strawberry.input
-class DatasetInput:
-    name: str = None\n"""
-    if os.path.exists(GENERATED_TYPES_FILE_PATH):
-        os.remove(GENERATED_TYPES_FILE_PATH)
-    with open(GENERATED_TYPES_FILE_PATH, 'a') as file:
-        file.write("from typing import List, Optional\n\nimport strawberry\n\n")
-        file.write(additional_parameters_spec + '\n')
-    print("Initializing complete")
 
+def set_ontology_path(owl_directories: List[str]):
+    for owl_directory in owl_directories:
+        if owl_directory not in onto_path:
+            onto_path.append(owl_directory)
+
+
+# The ontology world of a mapping process, opened once by initialize_mapping_worker.
+worker_world = None
+
+
+def initialize_mapping_worker(owl_directories: List[str], quadstore_path: str):
+    global worker_world
+    set_ontology_path(owl_directories)
+    worker_world = open_ontology_world(quadstore_path, read_only=True)
+
+
+def map_owl_file_in_worker(owl_file_path: str) -> List[Dict]:
+    return map_owl_file(owl_file_path, world=worker_world)
+
+
+def map_owl_files(owl_files: Dict[str, str], world: World, quadstore_path: str, workers: int) -> Dict[str, List[Dict]]:
+    """
+    Maps the given OWL files, by the path of their local copy or their IRI in the quadstore, to class specifications,
+    in a pool of processes when more than one worker is requested. Every file is mapped on its own, so the result
+    does not depend on the number of workers.
+    """
+    if workers <= 1 or len(owl_files) <= 1:
+        return {owl_file: map_owl_file(owl_file_path=local_owl_file, world=world)
+                for owl_file, local_owl_file in owl_files.items()}
+    with ProcessPoolExecutor(max_workers=min(workers, len(owl_files)), initializer=initialize_mapping_worker,
+                             initargs=(list(onto_path), quadstore_path)) as executor:
+        return dict(zip(owl_files, executor.map(map_owl_file_in_worker, owl_files.values())))
+
+
+def generate_graphql_types_from_owl(source: str, workers: int = MAPPING_WORKERS) -> List[Dict]:
+    revisions = {}
     if source == "github":
-        owl_files = get_owl_files_from_github(branch="lniedzwiadek/add-additional-annotations")
+        owl_files = get_owl_files_from_github(branch=GITHUB_BRANCH)
+        revisions = get_owl_file_revisions_from_github(branch=GITHUB_BRANCH)
     elif source == "local":
         owl_files = get_owl_files_from_local_directory()
     elif source == "road.affectivese.org":
@@ -254,11 +447,50 @@ class DatasetInput:
     else:
         raise Exception("Invalid source. Please choose 'github' or 'road.affectivese.org'")
 
+    local_owl_files = fetch_owl_files(owl_files=owl_files, revisions=revisions)
+    set_ontology_path([os.path.dirname(os.path.abspath(local_owl_file)) for local_owl_file in local_owl_files])
     print(f"OWL files fetched: {owl_files}")
-    for owl_file in owl_files:
-        print(f"Processing OWL file: {owl_file}")
-        graphql_types_from_owl = process_owl_file(owl_file_path=owl_file)
-        save_types_into_file(graphql_types=graphql_types_from_owl)
-        print(f"OWL file {owl_file} translated and saved")
-    print(f"GraphQL types generated and saved in {GENERATED_TYPES_FILE_PATH}")
-    return GENERATED_TYPES_FILE_PATH
+
+    manifest = load_generation_manifest()
+    owl_file_hashes = [get_file_hash(local_owl_file) for local_owl_file in local_owl_files]
+    changed_owl_files = {}
+    for owl_file, local_owl_file, owl_file_hash in zip(owl_files, local_owl_files, owl_file_hashes):
+        cached_ontology = manifest["ontologies"].get(owl_file)
+        if cached_ontology is not None and cached_ontology["hash"] == owl_file_hash:
+            print(f"OWL file {owl_file} unchanged, reusing mapped classes")
+        else:
+            print(f"Processing OWL file: {owl_file}")
+            changed_owl_files[owl_file] = local_owl_file
+
+    quadstore_path = get_quadstore_path(source)
+    world = open_ontology_world(quadstore_path)
+    try:
+        if quadstore_path is not None and changed_owl_files:
+            # Every file is kept current, as the changed ones may import any of them. Ontologies are then opened
+            # by their IRI, which, unlike a file path, needs no write to a read only quadstore.
+            ontology_iris = load_owl_files_into_world(world, quadstore_path, dict(zip(owl_files, local_owl_files)),
+                                                      {owl_file: revisions.get(owl_file) or owl_file_hash
+                                                       for owl_file, owl_file_hash in zip(owl_files, owl_file_hashes)})
+            changed_owl_files = {owl_file: ontology_iris[owl_file] for owl_file in changed_owl_files}
+        mapped_owl_files = map_owl_files(changed_owl_files, world=world, quadstore_path=quadstore_path,
+                                         workers=workers)
+    finally:
+        close_ontology_world(world)
+
+    mapped_ontologies = {}
+    generated_types = {}
+    for owl_file, owl_file_hash in zip(owl_files, owl_file_hashes):
+        if owl_file in mapped_owl_files:
+            graphql_types_from_owl = mapped_owl_files[owl_file]
+        else:
+            graphql_types_from_owl = manifest["ontologies"][owl_file]["classes"]
+        mapped_ontologies[owl_file] = {"hash": owl_file_hash, "classes": graphql_types_from_owl}
+
+        for graphql_type in select_new_graphql_types(graphql_types_from_owl, generated_types=generated_types):
+            generated_types[graphql_type["name"]] = dict(graphql_type, module=get_ontology_module_name(owl_file))
+        print(f"OWL file {owl_file} translated")
+
+    manifest["ontologies"] = mapped_ontologies
+    save_generation_manifest(manifest)
+    print(f"GraphQL types generated from {len(owl_files)} OWL files")
+    return list(generated_types.values())
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from owlready2 import default_world, World
+from requests.adapters import HTTPAdapter
+
+OWL_CACHE_DIRECTORY = ".owl_cache"
+OWL_CACHE_INDEX_FILE_NAME = "index.json"
+# Parsed ontologies are kept in an owlready2 SQLite quadstore per source, so unchanged files are not parsed again.
+PERSISTENT_QUADSTORE = os.environ.get("GRISERA_PERSISTENT_QUADSTORE", "1") == "1"
+MAX_DOWNLOAD_WORKERS = 8
+REQUEST_TIMEOUT = 30
+
+
+def is_remote_file(owl_file: str) -> bool:
+    return owl_file.startswith("http://") or owl_file.startswith("https://")
+
+
+def get_cached_file_path(url: str) -> str:
+    # The file name is kept so owlready2 can still resolve owl:imports by name from the cache directory.
+    url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return os.path.join(OWL_CACHE_DIRECTORY, url_hash, url.rsplit("/", 1)[-1].split("?")[0])
+
+
+def load_cache_index() -> Dict[str, Dict]:
+    index_path = os.path.join(OWL_CACHE_DIRECTORY, OWL_CACHE_INDEX_FILE_NAME)
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, 'r') as index_file:
+        return json.load(index_file)
+
+
+def save_cache_index(cache_index: Dict[str, Dict]):
+    os.makedirs(OWL_CACHE_DIRECTORY, exist_ok=True)
+    index_path = os.path.join(OWL_CACHE_DIRECTORY, OWL_CACHE_INDEX_FILE_NAME)
+    with open(f"{index_path}.tmp", 'w') as index_file:
+        json.dump(cache_index, index_file, indent=2, sort_keys=True)
+    os.replace(f"{index_path}.tmp", index_path)
+
+
+def create_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_DOWNLOAD_WORKERS, pool_maxsize=MAX_DOWNLOAD_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_into_cache(session: requests.Session, url: str, cache_entry: Optional[Dict],
+                        revision: Optional[str] = None) -> Dict:
+    is_cached = cache_entry is not None and os.path.exists(cache_entry["path"])
+    if is_cached and revision is not None and cache_entry.get("revision") == revision:
+        return cache_entry
+
+    headers = {}
+    if is_cached and cache_entry.get("etag"):
+        headers["If-None-Match"] = cache_entry["etag"]
+    try:
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as error:
+        if is_cached:
+            print(f"Unable to reach {url} ({error}), using cached copy")
+            return cache_entry
+        raise
+
+    if response.status_code == 304 and is_cached:
+        return {**cache_entry, "revision": revision or cache_entry.get("revision")}
+    response.raise_for_status()
+
+    file_path = get_cached_file_path(url)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(f"{file_path}.tmp", 'wb') as cached_file:
+        cached_file.write(response.content)
+    os.replace(f"{file_path}.tmp", file_path)
+    return {"path": file_path, "etag": response.headers.get("ETag"), "revision": revision}
+
+
+def fetch_json(url: str) -> Dict:
+    cache_index = load_cache_index()
+    with create_session() as session:
+        cache_entry = download_into_cache(session=session, url=url, cache_entry=cache_index.get(url))
+    cache_index[url] = cache_entry
+    save_cache_index(cache_index)
+    with open(cache_entry["path"], 'r') as cached_file:
+        return json.load(cached_file)
+
+
+def fetch_owl_files(owl_files: List[str], revisions: Optional[Dict[str, str]] = None) -> List[str]:
+    # Files whose revision (GitHub blob SHA) matches the cached one are not requested at all,
+    # the remaining ones are revalidated with their ETag.
+    revisions = revisions or {}
+    cache_index = load_cache_index()
+    remote_files = [owl_file for owl_file in owl_files if is_remote_file(owl_file)]
+
+    with create_session() as session, ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+        cache_entries = executor.map(
+            lambda url: download_into_cache(session=session, url=url, cache_entry=cache_index.get(url),
+                                            revision=revisions.get(url)),
+            remote_files)
+        for url, cache_entry in zip(remote_files, cache_entries):
+            cache_index[url] = cache_entry
+    save_cache_index(cache_index)
+
+    return [cache_index[owl_file]["path"] if is_remote_file(owl_file) else owl_file for owl_file in owl_files]
+
+
+def get_quadstore_path(source: str) -> Optional[str]:
+    if not PERSISTENT_QUADSTORE:
+        return None
+    return os.path.join(OWL_CACHE_DIRECTORY, f"quadstore-{re.sub(r'[^0-9a-zA-Z]+', '_', source).lower()}.sqlite3")
+
+
+def load_quadstore_revisions(quadstore_path: str) -> Dict[str, Dict]:
+    # Revisions only describe the quadstore they were saved with, a missing quadstore starts empty.
+    if not os.path.exists(quadstore_path) or not os.path.exists(f"{quadstore_path}.json"):
+        return {}
+    with open(f"{quadstore_path}.json", 'r') as revisions_file:
+        return json.load(revisions_file)
+
+
+def save_quadstore_revisions(quadstore_path: str, revisions: Dict[str, Dict]):
+    with open(f"{quadstore_path}.json.tmp", 'w') as revisions_file:
+        json.dump(revisions, revisions_file, indent=2, sort_keys=True)
+    os.replace(f"{quadstore_path}.json.tmp", f"{quadstore_path}.json")
+
+
+def open_ontology_world(quadstore_path: Optional[str], read_only: bool = False) -> World:
+    if quadstore_path is None:
+        return default_world
+    os.makedirs(os.path.dirname(quadstore_path), exist_ok=True)
+    # owlready2 keeps a write transaction open, so mapping processes open the quadstore read only next to the
+    # process that filled it.
+    return World(filename=quadstore_path, exclusive=False, read_only=read_only)
+
+
+def close_ontology_world(world: World):
+    if world is not default_world:
+        if not world.graph.read_only:
+            world.save()
+        world.close()
+
+
+def load_owl_files_into_world(world: World, quadstore_path: str, local_owl_files: Dict[str, str],
+                              revisions: Dict[str, str]) -> Dict[str, str]:
+    """
+    Imports into the quadstore every OWL file whose revision differs from the one imported before, replacing the
+    triples of its previous revision. Files imported by a previous run are only opened from the quadstore. Returns
+    the IRI of the ontology of every file.
+    """
+    loaded_ontologies = load_quadstore_revisions(quadstore_path)
+    for owl_file, local_owl_file in local_owl_files.items():
+        loaded_ontology = loaded_ontologies.get(owl_file)
+        if loaded_ontology is not None and loaded_ontology["revision"] == revisions[owl_file]:
+            continue
+        print(f"Importing {owl_file} into the quadstore")
+        onto = world.get_ontology(local_owl_file).load(reload=loaded_ontology is not None)
+        loaded_ontologies[owl_file] = {"revision": revisions[owl_file], "iri": onto.base_iri}
+    # Committed before any mapping process opens the quadstore.
+    world.save()
+    save_quadstore_revisions(quadstore_path, loaded_ontologies)
+    return {owl_file: loaded_ontologies[owl_file]["iri"] for owl_file in local_owl_files}
@@ -0,0 +1,80 @@
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+from typing import List, Sequence
+
+import strawberry
+
+from common import write_file_if_changed
+
+GENERATED_SCHEMA_SNAPSHOT_FILE_PATH = "generated_graphql_schema.graphql"
+# Verifying the schema at startup costs every worker an SDL print and a hash, so it is left to CI and deploy checks,
+# which run python schema_snapshot.py --verify, unless enabled here.
+VERIFY_SCHEMA_SNAPSHOT = os.environ.get("GRISERA_VERIFY_SCHEMA_SNAPSHOT", "0") == "1"
+OPERATION_MODULES = {"query": ("generated_graphql_queries", "GriseraQuery"),
+                     "mutation": ("generated_graphql_mutations", "GriseraMutation"),
+                     "subscription": ("generated_graphql_subscriptions", "GriseraSubscription")}
+# Workers serving only some operation types, e.g. read replicas without mutations or subscriptions, never import
+# the modules of the others.
+ENABLED_OPERATIONS = os.environ.get("GRISERA_ENABLED_OPERATIONS", ",".join(OPERATION_MODULES)).split(",")
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def add_generated_code_paths():
+    # Generated modules are imported from the working directory and use the resolvers of the repository.
+    for path in (REPOSITORY_DIRECTORY, os.getcwd()):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def build_generated_schema(operations: List[str] = None, extensions: Sequence = ()) -> strawberry.Schema:
+    add_generated_code_paths()
+    operation_types = {}
+    for operation in operations or ENABLED_OPERATIONS:
+        module_name, class_name = OPERATION_MODULES[operation]
+        operation_types[operation] = getattr(importlib.import_module(module_name), class_name)
+    return strawberry.Schema(**operation_types, extensions=list(extensions))
+
+
+def get_schema_hash(schema_sdl: str) -> str:
+    return hashlib.sha256(schema_sdl.encode()).hexdigest()
+
+
+def save_schema_snapshot(schema: strawberry.Schema):
+    if write_file_if_changed(GENERATED_SCHEMA_SNAPSHOT_FILE_PATH, schema.as_str() + "\n"):
+        print(f"Schema snapshot saved in {GENERATED_SCHEMA_SNAPSHOT_FILE_PATH}")
+    else:
+        print(f"{GENERATED_SCHEMA_SNAPSHOT_FILE_PATH} is up to date")
+
+
+def check_schema_snapshot(schema: strawberry.Schema):
+    if not os.path.exists(GENERATED_SCHEMA_SNAPSHOT_FILE_PATH):
+        raise Exception(f"Schema snapshot {GENERATED_SCHEMA_SNAPSHOT_FILE_PATH} not found, regenerate the schema")
+    with open(GENERATED_SCHEMA_SNAPSHOT_FILE_PATH, 'r') as snapshot_file:
+        snapshot_hash = get_schema_hash(snapshot_file.read())
+    if snapshot_hash != get_schema_hash(schema.as_str() + "\n"):
+        raise Exception(f"Generated schema does not match the snapshot {GENERATED_SCHEMA_SNAPSHOT_FILE_PATH}, "
+                        f"regenerate the schema")
+
+
+def verify_schema_snapshot(schema: strawberry.Schema):
+    """
+    When enabled, fails the startup of a worker whose generated code no longer matches the schema snapshot, e.g.
+    after a partial deploy. The check is skipped for workers serving only some operation types, as their schema is a
+    subset.
+    """
+    if not VERIFY_SCHEMA_SNAPSHOT or set(ENABLED_OPERATIONS) != set(OPERATION_MODULES):
+        return
+    check_schema_snapshot(schema)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saves the snapshot of the generated schema, or checks the "
+                                                 "generated code still matches it.")
+    parser.add_argument("--verify", action="store_true")
+    if parser.parse_args().verify:
+        check_schema_snapshot(build_generated_schema(list(OPERATION_MODULES)))
+    else:
+        save_schema_snapshot(build_generated_schema(list(OPERATION_MODULES)))
@@ -1,14 +1,54 @@
-import strawberry
+from contextlib import asynccontextmanager
+from typing import Union
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.websockets import WebSocket
 from strawberry.asgi import GraphQL
 
-from generated_graphql_queries import GriseraQuery
-from generated_graphql_mutations import GriseraMutation
+from schema_snapshot import add_generated_code_paths, build_generated_schema, verify_schema_snapshot
+
+add_generated_code_paths()
+
+from extensions.datasets import DatasetRouter
+from extensions.metrics import get_metrics_extensions, get_prometheus_metrics, instrument_table_repositories, \
+    is_metrics_request_allowed, METRICS_ENABLED
+from generated_storage_tables import GENERATED_TABLES
+from storage.partitions import PartitionedStore
+
+schema = build_generated_schema(extensions=[DatasetRouter] + get_metrics_extensions())
+verify_schema_snapshot(schema)
+
+
+class GeneratedGraphQL(GraphQL):
 
-schema = strawberry.Schema(query=GriseraQuery, mutation=GriseraMutation)
+    async def get_context(self, request: Union[Request, WebSocket], response: Response):
+        # The repositories of the dataset the operation accesses are set by the DatasetRouter.
+        return {"request": request, "response": response, "tables": GENERATED_TABLES,
+                "partitions": request.app.state.partitions, "loaders": {}}
 
-graphql_app = GraphQL(schema)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    partitions = PartitionedStore(tables=list(GENERATED_TABLES.values()),
+                                  wrap_repositories=instrument_table_repositories if METRICS_ENABLED else None)
+    await partitions.open()
+    app.state.partitions = partitions
+    yield
+    await partitions.close()
+
+
+graphql_app = GeneratedGraphQL(schema)
+
+app = FastAPI(lifespan=lifespan)
 app.add_route("/graphql", graphql_app)
 app.add_websocket_route("/graphql", graphql_app)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    if not is_metrics_request_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return get_prometheus_metrics()
@@ -1,6 +1,9 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import strawberry
+from strawberry.types import Info
+
+from resolvers.projection import get_projection
 
 
 @strawberry.type
@@ -13,66 +16,119 @@ class AdditionalParameters:
 
 
 @strawberry.type
-class Activity:
+class PageInfo:
+    hasNextPage: bool
+    hasPreviousPage: bool
+    startCursor: Optional[str]
+    endCursor: Optional[str]
+
+
+@strawberry.type
+class BatchItemResult:
     """
-    A pattern of an activity done within an experiment.
+    The outcome of a single item of a batch mutation, holding either the ID of the affected object or an error.
     """
+    id: Optional[strawberry.ID] = None
+    error: Optional[str] = None
+
+
+# Additional parameters are kept as one tuple of (key, value) pairs per object and turned into GraphQL objects only
+# when the field is selected.
+AdditionalParameterPairs = Tuple[Tuple[str, str], ...]
+
+
+@strawberry.type
+class RoadObject:
     id: strawberry.ID
     name: str
-    additionalParameters: Optional[List[AdditionalParameters]]
+    additional_parameters: strawberry.Private[AdditionalParameterPairs]
+
+    @strawberry.field
+    def additionalParameters(self, keys: Optional[List[str]] = None) -> Optional[List[AdditionalParameters]]:
+        selected_keys = set(keys) if keys is not None else None
+        return [AdditionalParameters(key=key, value=value) for key, value in self.additional_parameters
+                if selected_keys is None or key in selected_keys]
+
+
+@strawberry.type
+class Activity(RoadObject):
+    """
+    A pattern of an activity done within an experiment.
+    """
+
 
 @strawberry.type
-class ActivityExecution:
+class ActivityExecution(RoadObject):
     """
     An execution of a specific activity described by an activity pattern. An activity execution takes place in a
     certain period of time.
     """
-    id: strawberry.ID
-    name: str
-    hasActivity: Activity
-    additionalParameters: Optional[List[AdditionalParameters]]
+    activity_id: strawberry.Private[str]
+
+    @strawberry.field
+    async def hasActivity(self, info: Info) -> Activity:
+        return await info.context["loaders"].activity.load((self.activity_id, get_projection(info)))
 
 
 @strawberry.type
-class Experiment:
+class Experiment(RoadObject):
     """
     A list of activities done by participants in order to gather various biosignals and emotional states for the
     emotion recognition purpose.
     """
-    id: strawberry.ID
-    name: str
-    scenario: ActivityExecution
-    additionalParameters: Optional[List[AdditionalParameters]]
+    scenario_id: strawberry.Private[str]
+
+    @strawberry.field
+    async def scenario(self, info: Info) -> ActivityExecution:
+        return await info.context["loaders"].activity_execution.load((self.scenario_id, get_projection(info)))
 
 
 @strawberry.type
-class Participant:
+class Participant(RoadObject):
     """
     A person taking part in an experiment.
     """
-    id: strawberry.ID
-    name: str
-    additionalParameters: Optional[List[AdditionalParameters]]
 
 
 @strawberry.type
-class ParticipantState:
+class ParticipantState(RoadObject):
     """
     A state of a participant at a specific period of time.
     """
-    id: strawberry.ID
-    name: str
-    hasParticipant: Participant
-    additionalParameters: Optional[List[AdditionalParameters]]
+    participant_id: strawberry.Private[str]
+
+    @strawberry.field
+    async def hasParticipant(self, info: Info) -> Participant:
+        return await info.context["loaders"].participant.load((self.participant_id, get_projection(info)))
 
 
 @strawberry.type
-class Participation:
+class Participation(RoadObject):
     """
     A participation of a participant within a specific activity execution.
     """
-    id: strawberry.ID
-    name: str
-    hasActivityExecution: ActivityExecution
-    hasParticipantState: ParticipantState
-    additionalParameters: Optional[List[AdditionalParameters]]
+    activity_execution_id: strawberry.Private[str]
+    participant_state_id: strawberry.Private[str]
+
+    @strawberry.field
+    async def hasActivityExecution(self, info: Info) -> ActivityExecution:
+        return await info.context["loaders"].activity_execution.load((self.activity_execution_id, get_projection(info)))
+
+    @strawberry.field
+    async def hasParticipantState(self, info: Info) -> ParticipantState:
+        return await info.context["loaders"].participant_state.load((self.participant_state_id, get_projection(info)))
+
+
+@strawberry.type
+class ParticipantStateEdge:
+    cursor: str
+    node: ParticipantState
+
+
+@strawberry.type
+class ParticipantStateConnection:
+    """
+    A page of participant states walked with keyset cursors.
+    """
+    edges: List[ParticipantStateEdge]
+    pageInfo: PageInfo
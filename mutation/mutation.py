@@ -1,11 +1,13 @@
 from typing import List, Optional
 
 import strawberry
+from strawberry.types import Info
 
-from models.data_types import Activity, \
-    AdditionalParameters
+from models.data_types import Activity, AdditionalParameterPairs, BatchItemResult
 from resolvers.resolvers import create_activity, update_activity, \
-    delete_activity
+    delete_activity, create_activities, update_activities, delete_activities
+
+MAX_BATCH_SIZE = 1000
 
 
 @strawberry.input
@@ -14,34 +16,79 @@ class AdditionalParameterInput:
     value: str
 
 
+@strawberry.input
+class ActivityInput:
+    id: Optional[str] = None
+    name: Optional[str] = None
+    additional_parameters: Optional[List[AdditionalParameterInput]] = None
+
+
+def get_additional_parameters(additional_parameters: Optional[List[AdditionalParameterInput]]) \
+        -> AdditionalParameterPairs:
+    if additional_parameters is None:
+        return ()
+    return tuple((param.key, param.value) for param in additional_parameters)
+
+
+def check_batch_size(items: List):
+    if len(items) > MAX_BATCH_SIZE:
+        raise Exception(f"Batch cannot exceed {MAX_BATCH_SIZE} items")
+
+
 @strawberry.type
 class GriseraMutation:
 
     @strawberry.mutation
-    def create_activity(self, name: str,
-                        additional_parameters: Optional[List[AdditionalParameterInput]] = None) -> str:
-        if additional_parameters is not None:
-            additional_params = [AdditionalParameters(key=param["key"], value=param["value"]) for param in
-                                 additional_parameters]
-        else:
-            additional_params = []
-
-        create_activity(Activity(id=1, name=name, additionalParameters=additional_params))
-        return "Activity created"
+    async def create_activity(self, info: Info, name: str,
+                              additional_parameters: Optional[List[AdditionalParameterInput]] = None) -> str:
+        return await create_activity(info.context["repositories"],
+                                     Activity(id=None, name=name,
+                                              additional_parameters=get_additional_parameters(additional_parameters)))
 
     @strawberry.mutation
-    def update_activity(self, _id: str, name: str,
-                        additional_parameters: Optional[List[AdditionalParameterInput]] = None) -> str:
-        if additional_parameters is not None:
-            additional_params = [AdditionalParameters(key=param["key"], value=param["value"]) for param in
-                                 additional_parameters]
-        else:
-            additional_params = []
-
-        update_activity(Activity(id=_id, name=name, additionalParameters=additional_params))
+    async def update_activity(self, info: Info, _id: str, name: str,
+                              additional_parameters: Optional[List[AdditionalParameterInput]] = None) -> str:
+        if not await update_activity(info.context["repositories"],
+                                     Activity(id=_id, name=name,
+                                              additional_parameters=get_additional_parameters(additional_parameters))):
+            raise Exception(f"Activity {_id} not found")
         return "Activity updated"
 
     @strawberry.mutation
-    def delete_activity(self, _id: str) -> str:
-        delete_activity(_id=_id)
+    async def delete_activity(self, info: Info, _id: str) -> str:
+        if not await delete_activity(info.context["repositories"], _id=_id):
+            raise Exception(f"Activity {_id} not found")
         return "Activity deleted"
+
+    @strawberry.mutation
+    async def create_activity_batch(self, info: Info, items: List[ActivityInput]) -> List[BatchItemResult]:
+        check_batch_size(items)
+        results = [BatchItemResult(error="name is required") if item.name is None else None for item in items]
+        activities = [Activity(id=None, name=item.name,
+                               additional_parameters=get_additional_parameters(item.additional_parameters))
+                      for item in items if item.name is not None]
+        ids = iter(await create_activities(info.context["repositories"], activities))
+        return [result or BatchItemResult(id=next(ids)) for result in results]
+
+    @strawberry.mutation
+    async def update_activity_batch(self, info: Info, items: List[ActivityInput]) -> List[BatchItemResult]:
+        check_batch_size(items)
+        results = [BatchItemResult(id=item.id, error="id and name are required")
+                   if item.id is None or item.name is None else None for item in items]
+        activities = [Activity(id=item.id, name=item.name,
+                               additional_parameters=get_additional_parameters(item.additional_parameters))
+                      for item, result in zip(items, results) if result is None]
+        updated = iter(zip(activities, await update_activities(info.context["repositories"], activities)))
+        for index, result in enumerate(results):
+            if result is None:
+                activity, is_updated = next(updated)
+                results[index] = BatchItemResult(id=activity.id,
+                                                 error=None if is_updated else f"Activity {activity.id} not found")
+        return results
+
+    @strawberry.mutation
+    async def delete_activity_batch(self, info: Info, ids: List[str]) -> List[BatchItemResult]:
+        check_batch_size(ids)
+        deleted = await delete_activities(info.context["repositories"], ids)
+        return [BatchItemResult(id=_id, error=None if is_deleted else f"Activity {_id} not found")
+                for _id, is_deleted in zip(ids, deleted)]
@@ -1,38 +1,50 @@
+from typing import Optional
+
 import strawberry
+from strawberry.types import Info
 
-from models.data_types import ActivityExecution, Experiment, Participant, ParticipantState, Participation, Activity
-from resolvers.resolvers import get_participant_by_id, get_participant_state_by_id, get_participation_by_id, \
-    get_activity_by_id, \
-    get_activity_execution_by_id, get_experiment_by_id, get_activity_by_name
+from extensions.response_cache import CachedQuery
+from models.data_types import ActivityExecution, Experiment, Participant, ParticipantState, Participation, Activity, \
+    ParticipantStateConnection, ParticipantStateEdge
+from resolvers.pagination import get_connection, DEFAULT_PAGE_SIZE
+from resolvers.projection import get_projection, CONNECTION_NODE_PATH
+from resolvers.resolvers import get_activity_by_name
 
 
 @strawberry.type
 class GriseraQuery:
 
-    @strawberry.field
-    def activity_by_id(self, _id: str) -> Activity:
-        return get_activity_by_id(_id=_id)
+    @strawberry.field(extensions=[CachedQuery("Activity", id_argument="_id")])
+    async def activity_by_id(self, info: Info, _id: str) -> Optional[Activity]:
+        return await info.context["loaders"].activity.load((_id, get_projection(info)))
+
+    @strawberry.field(extensions=[CachedQuery("Activity")])
+    async def activity_by_name(self, info: Info, name: str) -> Optional[Activity]:
+        return await get_activity_by_name(info.context["repositories"], name=name, columns=get_projection(info))
 
-    @strawberry.field
-    def activity_by_name(self, name: str) -> Activity:
-        return get_activity_by_name(name=name)
+    @strawberry.field(extensions=[CachedQuery("ActivityExecution", id_argument="_id")])
+    async def activity_execution(self, info: Info, _id: str) -> Optional[ActivityExecution]:
+        return await info.context["loaders"].activity_execution.load((_id, get_projection(info)))
 
-    @strawberry.field
-    def activity_execution(self) -> ActivityExecution:
-        return get_activity_execution_by_id()
+    @strawberry.field(extensions=[CachedQuery("Experiment", id_argument="_id")])
+    async def experiment(self, info: Info, _id: str) -> Optional[Experiment]:
+        return await info.context["loaders"].experiment.load((_id, get_projection(info)))
 
-    @strawberry.field
-    def experiment(self) -> Experiment:
-        return get_experiment_by_id()
+    @strawberry.field(extensions=[CachedQuery("Participant", id_argument="_id")])
+    async def participant(self, info: Info, _id: str) -> Optional[Participant]:
+        return await info.context["loaders"].participant.load((_id, get_projection(info)))
 
-    @strawberry.field
-    def participant(self) -> Participant:
-        return get_participant_by_id()
+    @strawberry.field(extensions=[CachedQuery("ParticipantState", id_argument="_id")])
+    async def participant_state(self, info: Info, _id: str) -> Optional[ParticipantState]:
+        return await info.context["loaders"].participant_state.load((_id, get_projection(info)))
 
-    @strawberry.field
-    def participant_state(self) -> ParticipantState:
-        return get_participant_state_by_id()
+    @strawberry.field(extensions=[CachedQuery("ParticipantState")])
+    async def participant_states(self, info: Info, first: int = DEFAULT_PAGE_SIZE,
+                                 after: Optional[str] = None) -> ParticipantStateConnection:
+        return await get_connection(info.context["repositories"].participant_state, ParticipantState,
+                                    ParticipantStateEdge, ParticipantStateConnection, first=first, after=after,
+                                    columns=get_projection(info, path=CONNECTION_NODE_PATH))
 
-    @strawberry.field
-    def participation(self) -> Participation:
-        return get_participation_by_id()
+    @strawberry.field(extensions=[CachedQuery("Participation", id_argument="_id")])
+    async def participation(self, info: Info, _id: str) -> Optional[Participation]:
+        return await info.context["loaders"].participation.load((_id, get_projection(info)))
@@ -0,0 +1,480 @@
+import asyncio
+import dataclasses
+import heapq
+import sys
+from functools import lru_cache, partial
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Optional, Tuple, Type, TypeVar
+
+from strawberry.dataloader import DataLoader
+from strawberry.types import Info
+from strawberry.utils.str_converters import to_camel_case
+
+from extensions.response_cache import get_context_dataset, invalidate_cached_dataset, invalidate_cached_types
+from resolvers.loaders import MAX_BATCH_SIZE
+from resolvers.pagination import check_page_size, create_connection, decode_cursor
+from resolvers.projection import get_field_projection, get_projection, get_selected_field_names, \
+    CONNECTION_NODE_PATH
+from resolvers.resolvers import get_entities_by_keys
+from storage.partitions import DEFAULT_PARTITION
+from storage.repository import ReferenceFilter, Repository
+from storage.tables import TableDefinition
+
+# Objects of the Dataset type are the datasets themselves, kept in the catalog and each given a partition.
+DATASET_TYPE = "Dataset"
+Model = TypeVar("Model")
+Connection = TypeVar("Connection")
+# Generated types are loaded by ID along with the names of the fields the selection reads, which the tables of the
+# types implementing an interface read from different columns.
+FieldNamesKey = Tuple[str, Optional[FrozenSet[str]]]
+
+
+def create_generated_model(model_class: Type[Model], table: TableDefinition, entity: Dict) -> Model:
+    # Reference columns fill the private ID fields the reference fields are loaded with. Columns left out of the
+    # projection are only read by fields the client did not select.
+    return model_class(id=entity["id"], name=entity.get("name"),
+                       additional_parameters=entity.get("additional_parameters", ()),
+                       **{column: entity.get(column) for column in table.data_columns})
+
+
+@lru_cache(maxsize=None)
+def get_field_columns(table: TableDefinition) -> Dict[str, str]:
+    # Generated fields are named after their columns, reference fields after the column without the _id suffix.
+    field_columns = {"id": "id", "name": "name", "additionalParameters": "additional_parameters"}
+    field_columns.update((to_camel_case(column[:-len("_id")]), column) for column in table.reference_columns)
+    field_columns.update((to_camel_case(column), column) for column in table.scalar_columns)
+    return field_columns
+
+
+def get_table_repository(info: Info, type_name: str) -> Tuple[TableDefinition, Repository]:
+    table = info.context["tables"][type_name]
+    return table, info.context["repositories"][table.name]
+
+
+def get_implementing_types(tables: Dict[str, TableDefinition], type_name: str) -> Dict[str, str]:
+    """
+    Returns the name of every concrete type implementing the interface, directly or not, keyed by its table.
+    """
+    interface_table = tables[type_name].name
+    return {table.name: name for name, table in tables.items()
+            if interface_table in table.interfaces and not table.is_interface}
+
+
+def get_reference_tables(tables: Dict[str, TableDefinition], type_name: str) -> Tuple[str, ...]:
+    # Objects referenced as an interface are stored in the tables of the types implementing it.
+    if tables[type_name].is_interface:
+        return tuple(get_implementing_types(tables, type_name))
+    return (tables[type_name].name,)
+
+
+def get_filters(tables: Dict[str, TableDefinition], type_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translates the arguments of a generated query, or the fields of an input object, into filters on the columns of
+    the table of the type. A reference given by anything but its ID filters on the table of the referenced type.
+    """
+    table = tables[type_name]
+    filters = {}
+    for argument, value in arguments.items():
+        if value is None:
+            continue
+        if argument in ("_id", "id"):
+            filters["id"] = value
+        elif argument == "name" or argument in table.scalar_columns:
+            filters[argument] = value
+        elif f"{argument}_id" in table.reference_columns:
+            reference_type = type(value).__name__[:-len("Input")]
+            reference_filters = get_filters(tables, reference_type, {field.name: getattr(value, field.name)
+                                                                     for field in dataclasses.fields(value)})
+            if list(reference_filters) == ["id"]:
+                filters[f"{argument}_id"] = reference_filters["id"]
+            elif reference_filters:
+                filters[f"{argument}_id"] = ReferenceFilter(tables=get_reference_tables(tables, reference_type),
+                                                            filters=reference_filters)
+        else:
+            raise Exception(f"Unknown argument {argument} of {type_name}")
+    return filters
+
+
+def get_additional_parameter_pairs(additional_parameters) -> List[Tuple[str, str]]:
+    return [(parameter.key, parameter.value) for parameter in additional_parameters or []]
+
+
+def get_implementing_type(interface_class: Type, type_name: str) -> Type:
+    # Generated types are modules of one package resolving any of its type names.
+    return getattr(sys.modules[interface_class.__module__.rpartition(".")[0]], type_name)
+
+
+async def find_models(repositories: Dict[str, Repository], tables: Dict[str, TableDefinition], model_class: Type,
+                      filters: Dict[str, Any], additional_parameters: List[Tuple[str, str]], after_id: Optional[str],
+                      limit: int, field_names: Optional[FrozenSet[str]]) -> List[Any]:
+    """
+    Returns at most limit objects of the type matching the filters, ordered by ID and starting right after the given
+    one. The objects of an interface are those of the types implementing it: an object looked up by ID is found in
+    the table the type index lists it under, other filters are applied to the table of every implementing type.
+    """
+    table = tables[model_class.__name__]
+    if not table.is_interface:
+        entities = await repositories[table.name].find(filters, additional_parameters, after_id, limit,
+                                                       get_field_projection(field_names, get_field_columns(table)))
+        return [create_generated_model(model_class, table, entity) for entity in entities]
+
+    implementing_types = get_implementing_types(tables, model_class.__name__)
+    if "id" in filters:
+        [implementation_table] = await repositories[table.name].get_implementation_tables([filters["id"]])
+        implementing_types = {implementation_table: implementing_types[implementation_table]} \
+            if implementation_table in implementing_types else {}
+    pages = await asyncio.gather(*[find_models(repositories, tables, get_implementing_type(model_class, type_name),
+                                               filters, additional_parameters, after_id, limit, field_names)
+                                   for type_name in implementing_types.values()])
+    return heapq.nsmallest(limit, (model for page in pages for model in page), key=lambda model: model.id)
+
+
+async def find_generated_object(info: Info, model_class: Type[Model], arguments: Dict[str, Any],
+                                additional_parameters) -> Optional[Model]:
+    models = await find_models(info.context["repositories"], info.context["tables"], model_class,
+                               get_filters(info.context["tables"], model_class.__name__, arguments),
+                               get_additional_parameter_pairs(additional_parameters), after_id=None, limit=1,
+                               field_names=get_selected_field_names(info))
+    return models[0] if models else None
+
+
+async def find_generated_connection(info: Info, model_class: Type, edge_class: Type,
+                                    connection_class: Type[Connection], arguments: Dict[str, Any],
+                                    additional_parameters, first: int, after: Optional[str]) -> Connection:
+    check_page_size(first)
+    table, repository = get_table_repository(info, model_class.__name__)
+    entities = await repository.find(get_filters(info.context["tables"], model_class.__name__, arguments),
+                                     get_additional_parameter_pairs(additional_parameters),
+                                     after_id=decode_cursor(after) if after is not None else None, limit=first + 1,
+                                     columns=get_projection(info, get_field_columns(table), CONNECTION_NODE_PATH))
+    return create_connection(entities, partial(create_generated_model, model_class, table), edge_class,
+                             connection_class, first, after)
+
+
+async def find_implementation_connection(info: Info, interface_class: Type, edge_class: Type,
+                                         connection_class: Type[Connection], first: int,
+                                         after: Optional[str]) -> Connection:
+    """
+    Lists the objects of every type implementing the interface in ID order. Their IDs and types are read from one
+    range of the type index, then the objects of each type in a single lookup.
+    """
+    check_page_size(first)
+    tables = info.context["tables"]
+    _, repository = get_table_repository(info, interface_class.__name__)
+    implementations = await repository.find_implementations(
+        after_id=decode_cursor(after) if after is not None else None, limit=first + 1)
+    ids_by_table = {}
+    for _id, table_name in implementations:
+        ids_by_table.setdefault(table_name, []).append(_id)
+    type_names = {table.name: type_name for type_name, table in tables.items()}
+
+    async def get_models(table_name: str, ids: List[str]) -> List[Any]:
+        table, table_repository = get_table_repository(info, type_names[table_name])
+        model_class = get_implementing_type(interface_class, type_names[table_name])
+        entities = await table_repository.get_by_ids(ids, get_projection(info, get_field_columns(table),
+                                                                         CONNECTION_NODE_PATH))
+        return [create_generated_model(model_class, table, entity) for entity in entities if entity is not None]
+
+    pages = await asyncio.gather(*[get_models(table_name, ids) for table_name, ids in ids_by_table.items()])
+    models = {model.id: model for page in pages for model in page}
+    # Objects deleted since the type index was read are left out of the page.
+    return create_connection([{"id": _id} for _id, _ in implementations if _id in models],
+                             lambda entity: models[entity["id"]], edge_class, connection_class, first, after)
+
+
+async def stream_generated_models(info: Info, model_class: Type[Model], dataset_context, arguments: Dict[str, Any],
+                                  additional_parameters, chunk_size: int) -> AsyncGenerator[List[Model], None]:
+    """
+    Yields every object of the type matching the arguments in chunks, one keyset page each, reading the next page
+    only once the previous chunk has been consumed. Subscriptions are not executed through DatasetRouter, so the
+    repositories of their dataset are looked up here and its partition is kept open until the stream ends. Each
+    chunk gets loaders of its own, so the objects it references are not kept for the rest of the stream.
+    """
+    if model_class.__name__ == DATASET_TYPE or dataset_context is None:
+        dataset_name = DEFAULT_PARTITION
+    elif not dataset_context.name:
+        raise Exception(f"{info.field_name} must name the dataset in its datasetContext")
+    else:
+        dataset_name = dataset_context.name
+    async with info.context["partitions"].use_repositories(dataset_name) as repositories:
+        info.context["repositories"] = repositories
+        filters = get_filters(info.context["tables"], model_class.__name__, arguments)
+        additional_parameter_pairs = get_additional_parameter_pairs(additional_parameters)
+        field_names = get_selected_field_names(info)
+        after_id = None
+        while True:
+            info.context["loaders"] = {}
+            models = await find_models(repositories, info.context["tables"], model_class, filters,
+                                       additional_parameter_pairs, after_id, chunk_size, field_names)
+            if models:
+                yield models
+            if len(models) < chunk_size:
+                break
+            after_id = models[-1].id
+
+
+async def get_generated_models_by_ids(repository: Repository, model_class: Type[Model], table: TableDefinition,
+                                      keys: List[FieldNamesKey]) -> List[Optional[Model]]:
+    field_columns = get_field_columns(table)
+    entities = await get_entities_by_keys(repository, [(_id, get_field_projection(field_names, field_columns))
+                                                       for _id, field_names in keys])
+    return [create_generated_model(model_class, table, entity) if entity is not None else None
+            for entity in entities]
+
+
+async def get_implementation_models_by_ids(repositories: Dict[str, Repository], tables: Dict[str, TableDefinition],
+                                           interface_class: Type, keys: List[FieldNamesKey]) -> List[Optional[Any]]:
+    """
+    Loads objects referenced as an interface, reading the tables of their types from the type index in one lookup
+    and then the objects of each type in one lookup.
+    """
+    ids = list(dict.fromkeys(_id for _id, _ in keys))
+    implementation_tables = dict(zip(ids, await repositories[tables[interface_class.__name__].name]
+                                     .get_implementation_tables(ids)))
+    implementing_types = get_implementing_types(tables, interface_class.__name__)
+    keys_by_table = {}
+    for key in keys:
+        if implementation_tables[key[0]] in implementing_types:
+            keys_by_table.setdefault(implementation_tables[key[0]], []).append(key)
+
+    async def get_models(table_name: str, table_keys: List[FieldNamesKey]) -> Dict[FieldNamesKey, Any]:
+        type_name = implementing_types[table_name]
+        models = await get_generated_models_by_ids(repositories[table_name],
+                                                   get_implementing_type(interface_class, type_name),
+                                                   tables[type_name], table_keys)
+        return dict(zip(table_keys, models))
+
+    pages = await asyncio.gather(*[get_models(table_name, table_keys)
+                                   for table_name, table_keys in keys_by_table.items()])
+    models = {key: model for page in pages for key, model in page.items()}
+    return [models.get(key) for key in keys]
+
+
+async def load_reference(info: Info, model_class: Type[Model], _id: Optional[str]) -> Optional[Model]:
+    """
+    Loads a referenced object through a DataLoader of its type created on first use within the request. Objects
+    referenced as an interface are loaded as their concrete type.
+    """
+    if _id is None:
+        return None
+    loaders = info.context["loaders"]
+    type_name = model_class.__name__
+    if type_name not in loaders:
+        table, repository = get_table_repository(info, type_name)
+        if table.is_interface:
+            load_fn = partial(get_implementation_models_by_ids, info.context["repositories"], info.context["tables"],
+                              model_class)
+        else:
+            load_fn = partial(get_generated_models_by_ids, repository, model_class, table)
+        loaders[type_name] = DataLoader(load_fn=load_fn, max_batch_size=MAX_BATCH_SIZE)
+    return await loaders[type_name].load((_id, get_selected_field_names(info)))
+
+
+# The ID, or the error, of every item of a generated mutation.
+ItemResult = Tuple[Optional[str], Optional[str]]
+
+
+def get_input_fields(input_object) -> Dict[str, Any]:
+    return {field.name: getattr(input_object, field.name) for field in dataclasses.fields(input_object)}
+
+
+def get_entity_columns(table: TableDefinition, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translates the given fields of an input object, or the arguments of a mutation, into the columns of the table of
+    the type. References are stored by the ID of the referenced object.
+    """
+    columns = {}
+    for field, value in fields.items():
+        if value is None or field in ("id", "_id"):
+            continue
+        if field == "additional_parameters":
+            columns[field] = tuple(get_additional_parameter_pairs(value))
+        elif f"{field}_id" in table.reference_columns:
+            columns[f"{field}_id"] = value.id
+        elif field == "name" or field in table.scalar_columns:
+            columns[field] = value
+        else:
+            raise Exception(f"Unknown field {field} of {table.name}")
+    return columns
+
+
+def get_required_error(table: TableDefinition, fields: Dict[str, Any]) -> Optional[str]:
+    # Scalar fields are not nullable in the generated types.
+    missing_fields = [field for field, value in fields.items()
+                      if value is None and (field == "name" or field in table.scalar_columns)]
+    return f"{to_camel_case(missing_fields[0])} is required" if missing_fields else None
+
+
+def get_reference_error(table: TableDefinition, fields: Dict[str, Any]) -> Optional[str]:
+    references = [to_camel_case(field) for field, value in fields.items()
+                  if value is not None and f"{field}_id" in table.reference_columns and value.id is None]
+    return f"{', '.join(references)} must be given by ID" if references else None
+
+
+async def get_object_tables(info: Info, type_name: str, ids: List[str]) -> List[Optional[TableDefinition]]:
+    # Objects of an interface are changed in the tables of their concrete types, read from the type index.
+    tables = info.context["tables"]
+    if not tables[type_name].is_interface:
+        return [tables[type_name]] * len(ids)
+    implementing_types = get_implementing_types(tables, type_name)
+    implementation_tables = await info.context["repositories"][tables[type_name].name].get_implementation_tables(ids)
+    return [tables[implementing_types[table_name]] if table_name in implementing_types else None
+            for table_name in implementation_tables]
+
+
+def group_by_table(positions: List[int],
+                   tables: List[Optional[TableDefinition]]) -> Dict[TableDefinition, List[int]]:
+    positions_by_table = {}
+    for position, table in zip(positions, tables):
+        if table is not None:
+            positions_by_table.setdefault(table, []).append(position)
+    return positions_by_table
+
+
+def get_cached_type_names(tables: Dict[str, TableDefinition], model_class: Type) -> List[str]:
+    # Objects are cached as their own type and as every interface they implement. Objects changed through an
+    # interface may be of any type implementing it.
+    model_classes = [model_class] + [get_implementing_type(model_class, type_name)
+                                     for type_name in get_implementing_types(tables, model_class.__name__).values()]
+    return sorted({cls.__name__ for model_class in model_classes for cls in model_class.__mro__
+                   if hasattr(cls, "__strawberry_definition__")})
+
+
+async def invalidate_generated_objects(info: Info, model_class: Type, results: List[ItemResult]) -> List[ItemResult]:
+    await invalidate_cached_types(get_cached_type_names(info.context["tables"], model_class),
+                                  [_id for _id, error in results if error is None], get_context_dataset(info))
+    return results
+
+
+async def get_dataset_name_errors(repository: Repository, items: List[Dict[str, Any]],
+                                  errors: List[Optional[str]]) -> List[Optional[str]]:
+    # The partition of a dataset is named after it, so every dataset needs a name of its own.
+    names = set()
+    for position, item in enumerate(items):
+        if errors[position] is not None:
+            continue
+        if not item["name"]:
+            errors[position] = "name of a dataset cannot be empty"
+        elif item["name"] in names or await repository.get_by_name(item["name"], frozenset(["name"])) is not None:
+            errors[position] = f"Dataset {item['name']} already exists"
+        names.add(item["name"])
+    return errors
+
+
+async def create_entities(info: Info, model_class: Type, items: List[Dict[str, Any]]) -> List[ItemResult]:
+    """
+    Creates the valid items, given as their fields, in a single transaction.
+    """
+    table, repository = get_table_repository(info, model_class.__name__)
+    if table.is_interface:
+        raise Exception(f"{model_class.__name__} is an interface, objects are created as a type implementing it")
+    errors = [get_required_error(table, item) or get_reference_error(table, item) for item in items]
+    create_many = repository.create_many
+    if model_class.__name__ == DATASET_TYPE:
+        errors = await get_dataset_name_errors(repository, items, errors)
+        create_many = info.context["partitions"].create_datasets
+    ids = iter(await create_many([{"additional_parameters": (), **get_entity_columns(table, item)}
+                                  for item, error in zip(items, errors) if error is None]))
+    return await invalidate_generated_objects(info, model_class, [(None, error) if error is not None
+                                                                  else (next(ids), None) for error in errors])
+
+
+async def update_entities(info: Info, model_class: Type, items: List[Dict[str, Any]]) -> List[ItemResult]:
+    """
+    Updates the given fields of the valid items, given as their fields, keeping their other fields. The objects of
+    each type are read in one lookup and updated in a single transaction.
+    """
+    type_name = model_class.__name__
+    results = [(item.get("id"), "id is required" if item.get("id") is None
+                else "Datasets cannot be renamed" if type_name == DATASET_TYPE and item.get("name") is not None
+                else get_reference_error(info.context["tables"][type_name], item)) for item in items]
+    positions = [position for position, (_, error) in enumerate(results) if error is None]
+    positions_by_table = group_by_table(positions, await get_object_tables(info, type_name, [items[position]["id"]
+                                                                                           for position in positions]))
+    updated = {}
+
+    async def update_table(table: TableDefinition, table_positions: List[int]):
+        repository = info.context["repositories"][table.name]
+        entities = await repository.get_by_ids([items[position]["id"] for position in table_positions])
+        updates = [(position, {**entity, **get_entity_columns(table, items[position])})
+                   for position, entity in zip(table_positions, entities) if entity is not None]
+        updated.update(zip([position for position, _ in updates],
+                           await repository.update_many([(items[position]["id"], entity)
+                                                         for position, entity in updates])))
+
+    await asyncio.gather(*[update_table(table, table_positions)
+                           for table, table_positions in positions_by_table.items()])
+    return await invalidate_generated_objects(info, model_class, [
+        (_id, error) if error is not None or updated.get(position) else (_id, f"{type_name} {_id} not found")
+        for position, (_id, error) in enumerate(results)])
+
+
+async def delete_entities(info: Info, model_class: Type, ids: List[str]) -> List[ItemResult]:
+    """
+    Deletes the objects of each type in a single transaction.
+    """
+    type_name = model_class.__name__
+    positions_by_table = group_by_table(list(range(len(ids))), await get_object_tables(info, type_name, ids))
+    deleted = {}
+
+    async def delete_from_table(table: TableDefinition, table_positions: List[int]):
+        table_ids = [ids[position] for position in table_positions]
+        if type_name != DATASET_TYPE:
+            deleted.update(zip(table_positions, await info.context["repositories"][table.name].delete_many(table_ids)))
+            return
+        # The partition of every dataset deleted is removed along with the results cached from it.
+        names = await info.context["partitions"].delete_datasets(table_ids)
+        deleted.update(zip(table_positions, [name is not None for name in names]))
+        for name in filter(None, names):
+            await invalidate_cached_dataset(name)
+
+    await asyncio.gather(*[delete_from_table(table, table_positions)
+                           for table, table_positions in positions_by_table.items()])
+    return await invalidate_generated_objects(info, model_class, [
+        (_id, None if deleted.get(position) else f"{type_name} {_id} not found") for position, _id in enumerate(ids)])
+
+
+async def create_generated_object(info: Info, model_class: Type, arguments: Dict[str, Any]) -> str:
+    [(_id, error)] = await create_entities(info, model_class, [arguments])
+    if error is not None:
+        raise Exception(error)
+    return _id
+
+
+async def update_generated_object(info: Info, model_class: Type, arguments: Dict[str, Any]) -> str:
+    [(_, error)] = await update_entities(info, model_class, [arguments])
+    if error is not None:
+        raise Exception(error)
+    return f"{model_class.__name__} updated"
+
+
+async def delete_generated_object(info: Info, model_class: Type, arguments: Dict[str, Any]) -> str:
+    """
+    Deletes the object with the given ID, or the first object matching the other arguments.
+    """
+    _id = arguments.get("_id")
+    if _id is None:
+        models = await find_models(info.context["repositories"], info.context["tables"], model_class,
+                                   get_filters(info.context["tables"], model_class.__name__, arguments), [],
+                                   after_id=None, limit=1, field_names=frozenset(["id"]))
+        if not models:
+            raise Exception(f"{model_class.__name__} {', '.join(map(str, arguments.values()))} not found")
+        _id = models[0].id
+    [(_, error)] = await delete_entities(info, model_class, [_id])
+    if error is not None:
+        raise Exception(error)
+    return f"{model_class.__name__} deleted"
+
+
+async def create_generated_objects(info: Info, model_class: Type, items: List, result_class: Type) -> List:
+    results = await create_entities(info, model_class, [get_input_fields(item) for item in items])
+    return [result_class(id=_id, error=error) for _id, error in results]
+
+
+async def update_generated_objects(info: Info, model_class: Type, items: List, result_class: Type) -> List:
+    results = await update_entities(info, model_class, [get_input_fields(item) for item in items])
+    return [result_class(id=_id, error=error) for _id, error in results]
+
+
+async def delete_generated_objects(info: Info, model_class: Type, ids: List[str], result_class: Type) -> List:
+    results = await delete_entities(info, model_class, ids)
+    return [result_class(id=_id, error=error) for _id, error in results]
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Tuple
+
+from strawberry.dataloader import DataLoader
+
+from models.data_types import Activity, ActivityExecution, Experiment, Participant, ParticipantState, Participation
+from resolvers.projection import Projection
+from resolvers.resolvers import get_models_by_ids
+from storage.repository import GriseraRepositories
+
+MAX_BATCH_SIZE = 500
+# Objects are loaded by ID along with the columns the selection reads from them.
+LoaderKey = Tuple[str, Projection]
+
+
+@dataclass
+class GriseraLoaders:
+    """
+    DataLoaders batching and deduplicating ID lookups of every ROAD type within a single request, keyed by the ID
+    and the projection of the selection.
+    """
+    activity: DataLoader[LoaderKey, Activity]
+    activity_execution: DataLoader[LoaderKey, ActivityExecution]
+    experiment: DataLoader[LoaderKey, Experiment]
+    participant: DataLoader[LoaderKey, Participant]
+    participant_state: DataLoader[LoaderKey, ParticipantState]
+    participation: DataLoader[LoaderKey, Participation]
+
+
+def create_loader(repository, model_class) -> DataLoader:
+    return DataLoader(load_fn=partial(get_models_by_ids, repository, model_class), max_batch_size=MAX_BATCH_SIZE)
+
+
+def create_loaders(repositories: GriseraRepositories) -> GriseraLoaders:
+    return GriseraLoaders(activity=create_loader(repositories.activity, Activity),
+                          activity_execution=create_loader(repositories.activity_execution, ActivityExecution),
+                          experiment=create_loader(repositories.experiment, Experiment),
+                          participant=create_loader(repositories.participant, Participant),
+                          participant_state=create_loader(repositories.participant_state, ParticipantState),
+                          participation=create_loader(repositories.participation, Participation))
@@ -0,0 +1,55 @@
+import base64
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
+
+from models.data_types import PageInfo
+from resolvers.projection import Projection
+from resolvers.resolvers import create_model
+from storage.repository import Repository
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+Connection = TypeVar("Connection")
+
+
+def encode_cursor(_id: str) -> str:
+    return base64.urlsafe_b64encode(f"cursor:{_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        decoded_cursor = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except ValueError:
+        raise Exception(f"Invalid cursor: {cursor}")
+    if not decoded_cursor.startswith("cursor:"):
+        raise Exception(f"Invalid cursor: {cursor}")
+    return decoded_cursor[len("cursor:"):]
+
+
+def check_page_size(first: int):
+    if first < 0 or first > MAX_PAGE_SIZE:
+        raise Exception(f"first must be between 0 and {MAX_PAGE_SIZE}")
+
+
+def create_connection(entities: List[Dict], create_node: Callable[[Dict], Any], edge_class: Type,
+                      connection_class: Type[Connection], first: int, after: Optional[str]) -> Connection:
+    """
+    Builds a connection from at most first + 1 entities read after the cursor, the extra one telling whether a next
+    page exists.
+    """
+    edges = [edge_class(cursor=encode_cursor(entity["id"]), node=create_node(entity)) for entity in entities[:first]]
+    page_info = PageInfo(hasNextPage=len(entities) > first, hasPreviousPage=after is not None,
+                         startCursor=edges[0].cursor if edges else None,
+                         endCursor=edges[-1].cursor if edges else None)
+    return connection_class(edges=edges, pageInfo=page_info)
+
+
+async def get_connection(repository: Repository, model_class: Type, edge_class: Type,
+                         connection_class: Type[Connection], first: int, after: Optional[str],
+                         columns: Projection = None) -> Connection:
+    check_page_size(first)
+    # One extra row tells whether a next page exists without counting the whole table.
+    entities = await repository.get_page(after_id=decode_cursor(after) if after is not None else None,
+                                         limit=first + 1, columns=columns)
+    return create_connection(entities, partial(create_model, model_class), edge_class, connection_class, first, after)
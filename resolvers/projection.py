@@ -0,0 +1,69 @@
+import os
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+PROJECTION_PUSHDOWN = os.environ.get("GRISERA_PROJECTION_PUSHDOWN", "1") == "1"
+# Fields of the ROAD types and the columns they are read from, the relations from the ID of the related object.
+ROAD_FIELD_COLUMNS = {"id": "id", "name": "name", "additionalParameters": "additional_parameters",
+                      "hasActivity": "activity_id", "scenario": "scenario_id", "hasParticipant": "participant_id",
+                      "hasActivityExecution": "activity_execution_id",
+                      "hasParticipantState": "participant_state_id"}
+CONNECTION_NODE_PATH = ("edges", "node")
+
+# The columns to read, or None to read every column.
+Projection = Optional[FrozenSet[str]]
+
+
+def get_selected_fields(selections: List[Selection]) -> Iterator[SelectedField]:
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        else:
+            yield from get_selected_fields(selection.selections)
+
+
+def get_selected_field_names(info: Info, path: Tuple[str, ...] = ()) -> Optional[FrozenSet[str]]:
+    """
+    Returns the names of the fields the client selected on the object resolved by the field, or on the objects
+    found at the path within it, e.g. the nodes of a connection. None stands for every field.
+    """
+    if not PROJECTION_PUSHDOWN:
+        return None
+    selections = [selection for field in info.selected_fields for selection in field.selections]
+    for field_name in path:
+        selections = [selection for field in get_selected_fields(selections) if field.name == field_name
+                      for selection in field.selections]
+    return frozenset(field.name for field in get_selected_fields(selections))
+
+
+def get_field_projection(field_names: Optional[FrozenSet[str]], field_columns: Dict[str, str]) -> Projection:
+    if field_names is None:
+        return None
+    return frozenset(["id"] + [field_columns[field_name] for field_name in field_names if field_name in field_columns])
+
+
+def get_projection(info: Info, field_columns: Dict[str, str] = ROAD_FIELD_COLUMNS,
+                   path: Tuple[str, ...] = ()) -> Projection:
+    """
+    Returns the columns read by the fields the client selected on the object resolved by the field, or on the
+    objects found at the path within it.
+    """
+    return get_field_projection(get_selected_field_names(info, path), field_columns)
+
+
+def get_selection_signature(selections: List[Selection]) -> str:
+    fields = sorted(set(f"{field.name}{{{get_selection_signature(field.selections)}}}" if field.selections
+                        else field.name for field in get_selected_fields(selections)))
+    return " ".join(fields)
+
+
+def get_projection_key(info: Info) -> str:
+    """
+    Returns a key telling apart the selections of the field that may read different columns, so cached results
+    built from one projection are not served to a selection needing more.
+    """
+    if not PROJECTION_PUSHDOWN:
+        return ""
+    return get_selection_signature([selection for field in info.selected_fields for selection in field.selections])
@@ -1,69 +1,89 @@
-from models.data_types import Activity, AdditionalParameters, ActivityExecution, Participant, Experiment, \
-    ParticipantState, \
-    Participation
+import dataclasses
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type, TypeVar
 
+from extensions.response_cache import invalidate_cached_type
+from models.data_types import Activity
+from resolvers.projection import Projection
+from storage.repository import GriseraRepositories, Repository
 
-def get_activity_by_id(_id: str) -> Activity:
-    # Search for activity with given ID in database
-    return Activity(id=1, name="example_activity",
-                    additionalParameters=[AdditionalParameters(key="example_key",
-                                                               value="example_value")])
+Model = TypeVar("Model")
 
 
-def get_activity_by_name(name: str) -> Activity:
-    # Search for activity with given name in database
-    return Activity(id=2, name=name,
-                    additionalParameters=[AdditionalParameters(key="example_key",
-                                                               value="example_value")])
+@lru_cache(maxsize=None)
+def get_reference_fields(model_class: Type) -> Tuple[str, ...]:
+    return tuple(field.name for field in dataclasses.fields(model_class)
+                 if field.init and field.name not in ("id", "name", "additional_parameters"))
 
 
-def create_activity(activity: Activity) -> Activity:
-    # Create activity in database
-    ...
+def create_model(model_class: Type[Model], entity: Dict) -> Model:
+    # Columns left out of the projection are only read by fields the client did not select.
+    return model_class(id=entity["id"], name=entity.get("name"),
+                       additional_parameters=entity.get("additional_parameters", ()),
+                       **{field: entity.get(field) for field in get_reference_fields(model_class)})
 
 
-def update_activity(activity: Activity) -> Activity:
-    # Update activity in database
-    ...
+def create_entity(model) -> Dict:
+    return {"name": model.name, "additional_parameters": model.additional_parameters}
 
 
-def delete_activity(_id: str):
-    # Delete activity in database
-    ...
+async def get_entities_by_keys(repository: Repository, keys: List[Tuple[str, Projection]]) -> List[Optional[Dict]]:
+    """
+    Reads a DataLoader batch of (ID, projection) keys in a single call fetching the union of the projections.
+    """
+    projections = {columns for _, columns in keys}
+    columns = None if None in projections else frozenset().union(*projections)
+    ids = list(dict.fromkeys(_id for _id, _ in keys))
+    entities = dict(zip(ids, await repository.get_by_ids(ids, columns)))
+    return [entities[_id] for _id, _ in keys]
 
 
-##################################################
-def get_activity_execution_by_id():
-    example_activity = get_activity_by_id()
+async def get_models_by_ids(repository: Repository, model_class: Type[Model],
+                            keys: List[Tuple[str, Projection]]) -> List[Optional[Model]]:
+    entities = await get_entities_by_keys(repository, keys)
+    return [create_model(model_class, entity) if entity is not None else None for entity in entities]
 
-    return ActivityExecution(id=2, name="example_activity_execution", hasActivity=example_activity,
-                             additionalParameters=[AdditionalParameters(key="example_key",
-                                                                        value="example_value")])
 
+async def get_activity_by_name(repositories: GriseraRepositories, name: str,
+                               columns: Projection = None) -> Optional[Activity]:
+    entity = await repositories.activity.get_by_name(name, columns)
+    return create_model(Activity, entity) if entity is not None else None
 
-def get_experiment_by_id():
-    example_activity_execution = get_activity_execution_by_id()
-    return Experiment(id=3, name="example_experiment", scenario=example_activity_execution,
-                      additionalParameters=[AdditionalParameters(key="example_key",
-                                                                 value="example_value")])
 
+async def create_activity(repositories: GriseraRepositories, activity: Activity) -> str:
+    _id = await repositories.activity.create(create_entity(activity))
+    await invalidate_cached_type("Activity")
+    return _id
 
-def get_participant_by_id():
-    return Participant(id=4, name="example_participant", additionalParameters=[AdditionalParameters(key="example_key",
-                                                                                                    value="example_value")])
 
+async def update_activity(repositories: GriseraRepositories, activity: Activity) -> bool:
+    updated = await repositories.activity.update(activity.id, create_entity(activity))
+    await invalidate_cached_type("Activity", activity.id)
+    return updated
 
-def get_participant_state_by_id():
-    example_participant = get_participant_by_id()
-    return ParticipantState(id=5, name="example_participant_state", hasParticipant=example_participant,
-                            additionalParameters=[AdditionalParameters(key="example_key",
-                                                                       value="example_value")])
 
+async def delete_activity(repositories: GriseraRepositories, _id: str) -> bool:
+    deleted = await repositories.activity.delete(_id)
+    await invalidate_cached_type("Activity", _id)
+    return deleted
 
-def get_participation_by_id():
-    example_participant_state = get_participant_state_by_id()
-    example_activity_execution = get_activity_execution_by_id()
-    return Participation(id=6, name="example_participation", hasActivityExecution=example_activity_execution,
-                         hasParticipantState=example_participant_state,
-                         additionalParameters=[AdditionalParameters(key="example_key",
-                                                                    value="example_value")])
+
+async def create_activities(repositories: GriseraRepositories, activities: List[Activity]) -> List[str]:
+    ids = await repositories.activity.create_many([create_entity(activity) for activity in activities])
+    await invalidate_cached_type("Activity")
+    return ids
+
+
+async def update_activities(repositories: GriseraRepositories, activities: List[Activity]) -> List[bool]:
+    updated = await repositories.activity.update_many([(activity.id, create_entity(activity))
+                                                       for activity in activities])
+    for activity in activities:
+        await invalidate_cached_type("Activity", activity.id)
+    return updated
+
+
+async def delete_activities(repositories: GriseraRepositories, ids: List[str]) -> List[bool]:
+    deleted = await repositories.activity.delete_many(ids)
+    for _id in ids:
+        await invalidate_cached_type("Activity", _id)
+    return deleted
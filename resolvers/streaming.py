@@ -0,0 +1,41 @@
+from typing import AsyncGenerator, Dict, List, Optional, Tuple, Type, TypeVar
+
+from resolvers.resolvers import create_model
+from storage.repository import Repository
+
+DEFAULT_CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 1000
+
+Model = TypeVar("Model")
+
+
+def matches_filters(entity: Dict, name: Optional[str], additional_parameters: Optional[List[Tuple[str, str]]]) -> bool:
+    if name is not None and entity["name"] != name:
+        return False
+    return all(parameter in entity["additional_parameters"] for parameter in additional_parameters or [])
+
+
+async def stream_models(repository: Repository, model_class: Type[Model], chunk_size: int, name: Optional[str] = None,
+                        additional_parameters: Optional[List[Tuple[str, str]]] = None) \
+        -> AsyncGenerator[List[Model], None]:
+    """
+    Yields every matching object in chunks, reading the next page only once the previous chunk has been consumed,
+    so a slow client holds back the export instead of buffering the whole dataset.
+    """
+    if chunk_size < 1 or chunk_size > MAX_CHUNK_SIZE:
+        raise Exception(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+    chunk = []
+    after_id = None
+    while True:
+        entities = await repository.get_page(after_id=after_id, limit=chunk_size)
+        for entity in entities:
+            if matches_filters(entity, name, additional_parameters):
+                chunk.append(create_model(model_class, entity))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if len(entities) < chunk_size:
+            break
+        after_id = entities[-1]["id"]
+    if chunk:
+        yield chunk
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from storage.repository import Repository
+from storage.sqlite_store import SQLiteStore, POOL_SIZE
+from storage.tables import TableDefinition
+
+DATA_DIRECTORY = os.environ.get("GRISERA_DATA_DIRECTORY", "grisera_data")
+# Partitions kept open by a worker besides the catalog. Opening a partition again after it was closed costs opening
+# its connections, every open partition holds its pool of connections and their file descriptors.
+MAX_OPEN_PARTITIONS = int(os.environ.get("GRISERA_MAX_OPEN_PARTITIONS", "64"))
+# The catalog of datasets, holding the Dataset objects and any other object outside of a dataset. It always exists.
+DEFAULT_PARTITION = ""
+DATASET_TABLE = "dataset"
+
+
+def get_partition_path(data_directory: str, dataset_name: str) -> str:
+    # Dataset names come from requests, so the file name keeps a readable slug and is told apart by a hash of the name.
+    slug = re.sub(r"[^0-9a-zA-Z]+", "_", dataset_name).lower()[:40] or "default"
+    return os.path.join(data_directory, f"{slug}-{hashlib.sha256(dataset_name.encode()).hexdigest()[:16]}.sqlite3")
+
+
+class PartitionedStore:
+    """
+    Keeps the objects of every dataset in a SQLite database of its own, created with the dataset in the catalog and
+    removed with it. A worker opens the partition of a dataset listed in the catalog on the first request for it and
+    closes the least recently used partitions beyond MAX_OPEN_PARTITIONS once no request uses them. Writes to
+    different datasets never wait for each other, and any number of worker processes can serve every dataset, as
+    SQLite coordinates the connections of all processes to the same file.
+    """
+
+    def __init__(self, data_directory: str = DATA_DIRECTORY, pool_size: int = POOL_SIZE,
+                 tables: List[TableDefinition] = None,
+                 wrap_repositories: Optional[Callable[[Dict[str, Repository]], Dict[str, Repository]]] = None,
+                 max_open_partitions: int = MAX_OPEN_PARTITIONS):
+        self.data_directory = data_directory
+        self.pool_size = pool_size
+        self.tables = tables
+        # Applied to the repositories of every dataset opened, e.g. to record the duration of their calls.
+        self.wrap_repositories = wrap_repositories
+        self.max_open_partitions = max_open_partitions
+        # Open partitions by dataset name, from the least to the most recently used.
+        self.stores: OrderedDict[str, SQLiteStore] = OrderedDict()
+        self.repositories: Dict[str, Dict[str, Repository]] = {}
+        # Requests using each open store, and the stores closed once their last request ends.
+        self.store_users: Dict[SQLiteStore, int] = {}
+        self.retired_stores = set()
+        self.lock = asyncio.Lock()
+
+    async def open(self):
+        os.makedirs(self.data_directory, exist_ok=True)
+        async with self.lock:
+            await self.open_partition(DEFAULT_PARTITION)
+
+    async def close(self):
+        for store in list(self.stores.values()) + list(self.retired_stores):
+            await store.close()
+        self.stores = OrderedDict()
+        self.repositories = {}
+        self.store_users = {}
+        self.retired_stores = set()
+
+    async def open_partition(self, dataset_name: str):
+        # Called with the lock held. Opening the store creates its database if needed.
+        store = SQLiteStore(database_path=get_partition_path(self.data_directory, dataset_name),
+                            pool_size=self.pool_size, tables=self.tables)
+        await store.open()
+        self.stores[dataset_name] = store
+        repositories = store.create_table_repositories()
+        self.repositories[dataset_name] = self.wrap_repositories(repositories) \
+            if self.wrap_repositories is not None else repositories
+        least_recently_used = [name for name in self.stores if name != DEFAULT_PARTITION]
+        for name in least_recently_used[:max(len(least_recently_used) - self.max_open_partitions, 0)]:
+            await self.close_partition(name)
+
+    async def close_partition(self, dataset_name: str):
+        # Called with the lock held. A store still used by a request is closed when the request ends.
+        store = self.stores.pop(dataset_name)
+        del self.repositories[dataset_name]
+        if self.store_users.get(store):
+            self.retired_stores.add(store)
+        else:
+            await store.close()
+
+    def is_partition_current(self, dataset_name: str) -> bool:
+        # The partition of a dataset deleted through another worker is removed from under its open store.
+        return dataset_name == DEFAULT_PARTITION or os.path.exists(self.stores[dataset_name].pool.database_path)
+
+    async def has_dataset(self, dataset_name: str) -> bool:
+        return await self.repositories[DEFAULT_PARTITION][DATASET_TABLE].get_by_name(
+            dataset_name, columns=frozenset(["name"])) is not None
+
+    async def get_repositories(self, dataset_name: str) -> Dict[str, Repository]:
+        """
+        Returns the repositories of every table of the dataset keyed by the table name, opening its partition if
+        needed. Datasets not listed in the catalog are reported as not found.
+        """
+        if dataset_name not in self.stores or not self.is_partition_current(dataset_name):
+            async with self.lock:
+                if dataset_name in self.stores and not self.is_partition_current(dataset_name):
+                    await self.close_partition(dataset_name)
+                if dataset_name not in self.stores:
+                    if not await self.has_dataset(dataset_name):
+                        raise Exception(f"Dataset {dataset_name} not found")
+                    await self.open_partition(dataset_name)
+        self.stores.move_to_end(dataset_name)
+        return self.repositories[dataset_name]
+
+    @asynccontextmanager
+    async def use_repositories(self, dataset_name: str) -> AsyncIterator[Dict[str, Repository]]:
+        """
+        Provides the repositories of the dataset to a request, keeping its partition open until the request ends.
+        """
+        repositories = await self.get_repositories(dataset_name)
+        store = self.stores[dataset_name]
+        self.store_users[store] = self.store_users.get(store, 0) + 1
+        try:
+            yield repositories
+        finally:
+            self.store_users[store] -= 1
+            if not self.store_users[store]:
+                del self.store_users[store]
+                if store in self.retired_stores:
+                    self.retired_stores.discard(store)
+                    await store.close()
+
+    async def create_datasets(self, datasets: List[Dict]) -> List[str]:
+        """
+        Adds the datasets, given as the columns of their objects, to the catalog and creates the partition of each.
+        """
+        ids = await self.repositories[DEFAULT_PARTITION][DATASET_TABLE].create_many(datasets)
+        async with self.lock:
+            for dataset in datasets:
+                if dataset["name"] not in self.stores:
+                    await self.open_partition(dataset["name"])
+        return ids
+
+    async def delete_datasets(self, ids: List[str]) -> List[Optional[str]]:
+        """
+        Removes the datasets with the given IDs from the catalog and deletes their partitions. Returns the name of
+        each dataset deleted, or None for an ID of no dataset.
+        """
+        catalog = self.repositories[DEFAULT_PARTITION][DATASET_TABLE]
+        datasets = await catalog.get_by_ids(ids, columns=frozenset(["name"]))
+        deleted = await catalog.delete_many(ids)
+        names = [dataset["name"] if dataset is not None and is_deleted else None
+                 for dataset, is_deleted in zip(datasets, deleted)]
+        async with self.lock:
+            for name in filter(None, names):
+                if name in self.stores:
+                    await self.close_partition(name)
+                database_path = get_partition_path(self.data_directory, name)
+                for path in (database_path, f"{database_path}-wal", f"{database_path}-shm"):
+                    if os.path.exists(path):
+                        os.remove(path)
+        return names
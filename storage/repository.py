@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ReferenceFilter:
+    """
+    Matches a reference column against the IDs of the objects of other tables matching all the filters, the table of
+    the referenced type or the tables of every type implementing the referenced interface.
+    """
+    tables: Tuple[str, ...]
+    filters: Dict[str, Any]
+
+
+class Repository(ABC):
+    """
+    Asynchronous access to the stored objects of a single ROAD type. Objects are exchanged as plain dictionaries
+    with the id, name, additional_parameters, reference and scalar columns of the type. Reads given a set of columns
+    return only the id and those columns, any other read returns every column.
+    """
+
+    @abstractmethod
+    async def get_by_ids(self, ids: List[str], columns: Optional[AbstractSet[str]] = None) -> List[Optional[Dict]]:
+        ...
+
+    @abstractmethod
+    async def get_by_name(self, name: str, columns: Optional[AbstractSet[str]] = None) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    async def get_page(self, after_id: Optional[str], limit: int,
+                       columns: Optional[AbstractSet[str]] = None) -> List[Dict]:
+        """
+        Returns at most limit objects ordered by id, starting right after the given one.
+        """
+        ...
+
+    @abstractmethod
+    async def find(self, filters: Dict[str, Any], additional_parameters: List[Tuple[str, str]],
+                   after_id: Optional[str], limit: int, columns: Optional[AbstractSet[str]] = None) -> List[Dict]:
+        """
+        Returns at most limit objects ordered by id, starting right after the given one, whose columns equal the
+        filter values and which have all the additional parameters.
+        """
+        ...
+
+    @abstractmethod
+    async def find_implementations(self, after_id: Optional[str], limit: int) -> List[Tuple[str, str]]:
+        """
+        Returns at most limit (id, table) pairs of the objects of the types implementing the interface stored in this
+        table, ordered by id and starting right after the given one.
+        """
+        ...
+
+    @abstractmethod
+    async def get_implementation_tables(self, ids: List[str]) -> List[Optional[str]]:
+        """
+        Returns the table of each of the objects of the types implementing the interface stored in this table, or None
+        for an ID of no such object.
+        """
+        ...
+
+    @abstractmethod
+    async def create(self, entity: Dict) -> str:
+        ...
+
+    @abstractmethod
+    async def update(self, _id: str, entity: Dict) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, _id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def create_many(self, entities: List[Dict]) -> List[str]:
+        """
+        Creates all objects in a single transaction, returning their ids in order.
+        """
+        ...
+
+    @abstractmethod
+    async def update_many(self, entities: List[Tuple[str, Dict]]) -> List[bool]:
+        """
+        Updates all (id, object) pairs in a single transaction, returning whether each object was found.
+        """
+        ...
+
+    @abstractmethod
+    async def delete_many(self, ids: List[str]) -> List[bool]:
+        """
+        Deletes all objects in a single transaction, returning whether each object was found.
+        """
+        ...
+
+
+@dataclass
+class GriseraRepositories:
+    activity: Repository
+    activity_execution: Repository
+    experiment: Repository
+    participant: Repository
+    participant_state: Repository
+    participation: Repository
+
+
+class Store(ABC):
+    """
+    A storage backend opened once per worker, providing the repositories of every ROAD type.
+    """
+
+    @abstractmethod
+    async def open(self):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+    @abstractmethod
+    def create_repositories(self) -> GriseraRepositories:
+        ...
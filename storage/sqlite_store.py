@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from typing import AbstractSet, Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from storage.repository import GriseraRepositories, ReferenceFilter, Repository, Store
+from storage.tables import TableDefinition, ACTIVITY_TABLE, ACTIVITY_EXECUTION_TABLE, EXPERIMENT_TABLE, \
+    PARTICIPANT_TABLE, PARTICIPANT_STATE_TABLE, PARTICIPATION_TABLE, ROAD_TABLES
+
+DATABASE_PATH = os.environ.get("GRISERA_DATABASE_PATH", "grisera.sqlite3")
+POOL_SIZE = int(os.environ.get("GRISERA_POOL_SIZE", "4"))
+# Table names generated from ontology classes never start with an underscore, so none can clash with the type index.
+TYPE_INDEX_TABLE = "_type_index"
+
+
+class SQLiteConnectionPool:
+
+    def __init__(self, database_path: str, size: int):
+        self.database_path = database_path
+        self.size = size
+        self.connections: asyncio.Queue = asyncio.Queue()
+        self.opened_connections: List[aiosqlite.Connection] = []
+
+    async def open(self):
+        for _ in range(self.size):
+            connection = await aiosqlite.connect(self.database_path)
+            connection.row_factory = aiosqlite.Row
+            await connection.execute("PRAGMA journal_mode=WAL")
+            await connection.execute("PRAGMA synchronous=NORMAL")
+            self.opened_connections.append(connection)
+            self.connections.put_nowait(connection)
+
+    async def close(self):
+        for connection in self.opened_connections:
+            await connection.close()
+        self.opened_connections = []
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        connection = await self.connections.get()
+        try:
+            yield connection
+        finally:
+            self.connections.put_nowait(connection)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with self.connection() as connection:
+            try:
+                yield connection
+            except BaseException:
+                await connection.rollback()
+                raise
+            await connection.commit()
+
+
+def row_to_entity(row: aiosqlite.Row) -> Dict:
+    entity = dict(row)
+    # Keys repeat across nearly every object, so a single interned copy of each is shared.
+    if "additional_parameters" in entity:
+        entity["additional_parameters"] = tuple((sys.intern(key), value)
+                                                for key, value in json.loads(entity["additional_parameters"]))
+    return entity
+
+
+def entity_to_parameters(table: TableDefinition, entity: Dict) -> List:
+    additional_parameters = json.dumps([list(pair) for pair in entity.get("additional_parameters") or []])
+    return [entity["name"], additional_parameters] + [entity.get(column) for column in table.data_columns]
+
+
+def quote_identifier(identifier: str) -> str:
+    # Generated tables and columns are named after ontology classes and properties, which may be SQL keywords.
+    return f'"{identifier}"'
+
+
+def get_filter_clause(filters: Dict[str, Any], additional_parameters: List[Tuple[str, str]]) -> Tuple[str, List]:
+    conditions = []
+    parameters = []
+    for column, value in filters.items():
+        if isinstance(value, ReferenceFilter):
+            # Resolved within the same statement, so a filter on a referenced object is an index lookup on each side.
+            reference_clause, reference_parameters = get_filter_clause(value.filters, [])
+            reference_queries = " UNION ALL ".join(f"SELECT id FROM {quote_identifier(table)} WHERE {reference_clause}"
+                                                   for table in value.tables)
+            conditions.append(f"{quote_identifier(column)} IN ({reference_queries or 'SELECT NULL'})")
+            parameters += reference_parameters * len(value.tables)
+        else:
+            conditions.append(f"{quote_identifier(column)} = ?")
+            parameters.append(value)
+    for key, value in additional_parameters:
+        conditions.append("EXISTS (SELECT 1 FROM json_each(additional_parameters) "
+                          "WHERE json_extract(value, '$[0]') = ? AND json_extract(value, '$[1]') = ?)")
+        parameters += [key, value]
+    return " AND ".join(conditions) or "1", parameters
+
+
+class SQLiteRepository(Repository):
+
+    def __init__(self, pool: SQLiteConnectionPool, table: TableDefinition):
+        self.pool = pool
+        self.table = table
+        self.columns = ["name", "additional_parameters"] + list(table.data_columns)
+        self.table_name = quote_identifier(table.name)
+        self.type_index_table = quote_identifier(TYPE_INDEX_TABLE)
+
+    def get_select_list(self, columns: Optional[AbstractSet[str]]) -> str:
+        if columns is None:
+            return "*"
+        return ", ".join(["id"] + [quote_identifier(column) for column in self.columns if column in columns])
+
+    async def get_by_ids(self, ids: List[str], columns: Optional[AbstractSet[str]] = None) -> List[Optional[Dict]]:
+        placeholders = ", ".join("?" for _ in ids)
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"SELECT {self.get_select_list(columns)} FROM {self.table_name} "
+                                          f"WHERE id IN ({placeholders})", ids) as cursor:
+                entities = {row["id"]: row_to_entity(row) for row in await cursor.fetchall()}
+        return [entities.get(_id) for _id in ids]
+
+    async def get_by_name(self, name: str, columns: Optional[AbstractSet[str]] = None) -> Optional[Dict]:
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"SELECT {self.get_select_list(columns)} FROM {self.table_name} "
+                                          f"WHERE name = ? LIMIT 1", [name]) as cursor:
+                row = await cursor.fetchone()
+        return row_to_entity(row) if row is not None else None
+
+    async def get_page(self, after_id: Optional[str], limit: int,
+                       columns: Optional[AbstractSet[str]] = None) -> List[Dict]:
+        query = f"SELECT {self.get_select_list(columns)} FROM {self.table_name}"
+        parameters = []
+        if after_id is not None:
+            query += " WHERE id > ?"
+            parameters.append(after_id)
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"{query} ORDER BY id LIMIT ?", parameters + [limit]) as cursor:
+                return [row_to_entity(row) for row in await cursor.fetchall()]
+
+    async def find(self, filters: Dict[str, Any], additional_parameters: List[Tuple[str, str]],
+                   after_id: Optional[str], limit: int, columns: Optional[AbstractSet[str]] = None) -> List[Dict]:
+        clause, parameters = get_filter_clause(filters, additional_parameters)
+        if after_id is not None:
+            clause += " AND id > ?"
+            parameters.append(after_id)
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"SELECT {self.get_select_list(columns)} FROM {self.table_name} "
+                                          f"WHERE {clause} ORDER BY id LIMIT ?", parameters + [limit]) as cursor:
+                return [row_to_entity(row) for row in await cursor.fetchall()]
+
+    async def find_implementations(self, after_id: Optional[str], limit: int) -> List[Tuple[str, str]]:
+        query = f"SELECT id, type FROM {self.type_index_table} WHERE interface = ?"
+        parameters = [self.table.name]
+        if after_id is not None:
+            query += " AND id > ?"
+            parameters.append(after_id)
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"{query} ORDER BY id LIMIT ?", parameters + [limit]) as cursor:
+                return [(row["id"], row["type"]) for row in await cursor.fetchall()]
+
+    async def get_implementation_tables(self, ids: List[str]) -> List[Optional[str]]:
+        placeholders = ", ".join("?" for _ in ids)
+        async with self.pool.connection() as connection:
+            async with connection.execute(f"SELECT id, type FROM {self.type_index_table} "
+                                          f"WHERE interface = ? AND id IN ({placeholders})",
+                                          [self.table.name] + ids) as cursor:
+                tables = {row["id"]: row["type"] for row in await cursor.fetchall()}
+        return [tables.get(_id) for _id in ids]
+
+    async def create(self, entity: Dict) -> str:
+        return (await self.create_many([entity]))[0]
+
+    async def update(self, _id: str, entity: Dict) -> bool:
+        return (await self.update_many([(_id, entity)]))[0]
+
+    async def delete(self, _id: str) -> bool:
+        return (await self.delete_many([_id]))[0]
+
+    async def create_many(self, entities: List[Dict]) -> List[str]:
+        ids = [uuid.uuid4().hex for _ in entities]
+        placeholders = ", ".join("?" for _ in self.columns)
+        async with self.pool.transaction() as connection:
+            await connection.executemany(f"INSERT INTO {self.table_name} "
+                                         f"(id, {', '.join(quote_identifier(column) for column in self.columns)}) "
+                                         f"VALUES (?, {placeholders})",
+                                         [[_id] + entity_to_parameters(self.table, entity)
+                                          for _id, entity in zip(ids, entities)])
+            await connection.executemany(f"INSERT INTO {self.type_index_table} (interface, id, type) VALUES (?, ?, ?)",
+                                         [(interface, _id, self.table.name)
+                                          for _id in ids for interface in self.table.interfaces])
+        return ids
+
+    async def update_many(self, entities: List[Tuple[str, Dict]]) -> List[bool]:
+        assignments = ", ".join(f"{quote_identifier(column)} = ?" for column in self.columns)
+        updated = []
+        async with self.pool.transaction() as connection:
+            for _id, entity in entities:
+                cursor = await connection.execute(f"UPDATE {self.table_name} SET {assignments} WHERE id = ?",
+                                                  entity_to_parameters(self.table, entity) + [_id])
+                updated.append(cursor.rowcount > 0)
+        return updated
+
+    async def delete_many(self, ids: List[str]) -> List[bool]:
+        deleted = []
+        async with self.pool.transaction() as connection:
+            for _id in ids:
+                cursor = await connection.execute(f"DELETE FROM {self.table_name} WHERE id = ?", [_id])
+                deleted.append(cursor.rowcount > 0)
+                await connection.executemany(f"DELETE FROM {self.type_index_table} WHERE interface = ? AND id = ?",
+                                             [(interface, _id) for interface in self.table.interfaces])
+        return deleted
+
+
+class SQLiteStore(Store):
+    """
+    The bundled storage backend, keeping every ROAD type in its own table of a local SQLite database accessed
+    through a pool of connections.
+    """
+
+    def __init__(self, database_path: str = DATABASE_PATH, pool_size: int = POOL_SIZE,
+                 tables: List[TableDefinition] = None):
+        self.pool = SQLiteConnectionPool(database_path=database_path, size=pool_size)
+        self.tables = tables if tables is not None else ROAD_TABLES
+
+    async def open(self):
+        await self.pool.open()
+        async with self.pool.connection() as connection:
+            # Maps every interface to the objects implementing it and their tables, so listing the objects of an
+            # interface is a single range scan of the primary key in keyset order.
+            await connection.execute(f"CREATE TABLE IF NOT EXISTS {quote_identifier(TYPE_INDEX_TABLE)} "
+                                     f"(interface TEXT NOT NULL, id TEXT NOT NULL, type TEXT NOT NULL, "
+                                     f"PRIMARY KEY (interface, id)) WITHOUT ROWID")
+            for table in self.tables:
+                table_name = quote_identifier(table.name)
+                # Scalar columns are left untyped, so values keep the type they were given for comparisons.
+                column_definitions = ([f"{quote_identifier(column)} TEXT" for column in table.reference_columns]
+                                      + [quote_identifier(column) for column in table.scalar_columns])
+                data_columns = "".join(f", {column_definition}" for column_definition in column_definitions)
+                await connection.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (id TEXT PRIMARY KEY, "
+                                         f"name TEXT NOT NULL, additional_parameters TEXT NOT NULL{data_columns})")
+                await connection.execute(f"CREATE INDEX IF NOT EXISTS {quote_identifier(f'{table.name}_name')} "
+                                         f"ON {table_name} (name)")
+                # The id follows the column, so the rows matching a filter are read in keyset order without sorting.
+                for column in table.indexed_columns:
+                    index_name = quote_identifier(f"{table.name}_{column}")
+                    await connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} "
+                                             f"({quote_identifier(column)}, id)")
+            await connection.commit()
+
+    async def close(self):
+        await self.pool.close()
+
+    def create_repositories(self) -> GriseraRepositories:
+        return GriseraRepositories(activity=SQLiteRepository(self.pool, ACTIVITY_TABLE),
+                                   activity_execution=SQLiteRepository(self.pool, ACTIVITY_EXECUTION_TABLE),
+                                   experiment=SQLiteRepository(self.pool, EXPERIMENT_TABLE),
+                                   participant=SQLiteRepository(self.pool, PARTICIPANT_TABLE),
+                                   participant_state=SQLiteRepository(self.pool, PARTICIPANT_STATE_TABLE),
+                                   participation=SQLiteRepository(self.pool, PARTICIPATION_TABLE))
+
+    def create_table_repositories(self) -> Dict[str, Repository]:
+        """
+        Returns a repository of every table of the store keyed by the table name, for stores of generated tables.
+        """
+        return {table.name: SQLiteRepository(self.pool, table) for table in self.tables}
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class TableDefinition:
+    """
+    Storage layout of a single ROAD type. Every table has the id, name and additional_parameters columns,
+    references to other ROAD objects are stored in the listed reference columns and scalar properties in the scalar
+    columns. The name and every indexed column get a secondary index. The objects of the type are also listed in
+    the type index under the tables of every interface the type implements, directly or not. The tables of
+    interfaces hold no objects, as every object is stored in the table of its concrete type.
+    """
+    name: str
+    reference_columns: Tuple[str, ...] = ()
+    scalar_columns: Tuple[str, ...] = ()
+    indexed_columns: Tuple[str, ...] = ()
+    interfaces: Tuple[str, ...] = ()
+    is_interface: bool = False
+
+    @property
+    def data_columns(self) -> Tuple[str, ...]:
+        return self.reference_columns + self.scalar_columns
+
+
+ACTIVITY_TABLE = TableDefinition(name="activity")
+ACTIVITY_EXECUTION_TABLE = TableDefinition(name="activity_execution", reference_columns=("activity_id",))
+EXPERIMENT_TABLE = TableDefinition(name="experiment", reference_columns=("scenario_id",))
+PARTICIPANT_TABLE = TableDefinition(name="participant")
+PARTICIPANT_STATE_TABLE = TableDefinition(name="participant_state", reference_columns=("participant_id",))
+PARTICIPATION_TABLE = TableDefinition(name="participation",
+                                      reference_columns=("activity_execution_id", "participant_state_id"))
+ROAD_TABLES = [ACTIVITY_TABLE, ACTIVITY_EXECUTION_TABLE, EXPERIMENT_TABLE, PARTICIPANT_TABLE, PARTICIPANT_STATE_TABLE,
+               PARTICIPATION_TABLE]
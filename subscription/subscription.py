@@ -0,0 +1,71 @@
+from typing import AsyncGenerator, List, Optional
+
+import strawberry
+from strawberry.types import Info
+
+from models.data_types import ActivityExecution, Experiment, Participant, ParticipantState, Participation, Activity
+from mutation.mutation import AdditionalParameterInput
+from resolvers.streaming import stream_models, DEFAULT_CHUNK_SIZE
+
+
+def get_parameter_filters(additional_parameters: Optional[List[AdditionalParameterInput]]):
+    if additional_parameters is None:
+        return None
+    return [(parameter.key, parameter.value) for parameter in additional_parameters]
+
+
+@strawberry.type
+class GriseraSubscription:
+
+    @strawberry.subscription
+    async def stream_activity(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE, name: Optional[str] = None,
+                              additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[Activity], None]:
+        async for chunk in stream_models(info.context["repositories"].activity, Activity, chunk_size, name=name,
+                                         additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
+
+    @strawberry.subscription
+    async def stream_activity_execution(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                        name: Optional[str] = None,
+                                        additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[ActivityExecution], None]:
+        async for chunk in stream_models(info.context["repositories"].activity_execution, ActivityExecution,
+                                         chunk_size, name=name,
+                                         additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
+
+    @strawberry.subscription
+    async def stream_experiment(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE, name: Optional[str] = None,
+                                additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[Experiment], None]:
+        async for chunk in stream_models(info.context["repositories"].experiment, Experiment, chunk_size, name=name,
+                                         additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
+
+    @strawberry.subscription
+    async def stream_participant(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE, name: Optional[str] = None,
+                                 additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[Participant], None]:
+        async for chunk in stream_models(info.context["repositories"].participant, Participant, chunk_size,
+                                         name=name, additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
+
+    @strawberry.subscription
+    async def stream_participant_state(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                       name: Optional[str] = None,
+                                       additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[ParticipantState], None]:
+        async for chunk in stream_models(info.context["repositories"].participant_state, ParticipantState,
+                                         chunk_size, name=name,
+                                         additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
+
+    @strawberry.subscription
+    async def stream_participation(self, info: Info, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                   name: Optional[str] = None,
+                                   additional_parameters: Optional[List[AdditionalParameterInput]] = None) \
+            -> AsyncGenerator[List[Participation], None]:
+        async for chunk in stream_models(info.context["repositories"].participation, Participation, chunk_size,
+                                         name=name, additional_parameters=get_parameter_filters(additional_parameters)):
+            yield chunk
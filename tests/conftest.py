@@ -0,0 +1,168 @@
+import asyncio
+import dataclasses
+import importlib
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import pytest
+import strawberry
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_DIRECTORY)
+# The mapping scripts import each other as top level modules, as they do when run from their directory. Their main
+# module comes after the one of the server.
+sys.path.append(os.path.join(REPOSITORY_DIRECTORY, "mapping"))
+
+from extensions import response_cache
+from extensions.datasets import DatasetRouter
+from extensions.metrics import InstrumentedRepository
+from extensions.response_cache import InMemoryCacheBackend
+from storage.partitions import PartitionedStore
+from storage.repository import GriseraRepositories, Repository
+from storage.tables import TableDefinition
+
+
+@pytest.fixture
+def database_path(tmp_path) -> str:
+    return str(tmp_path / "grisera.sqlite3")
+
+
+@pytest.fixture(autouse=True)
+def response_cache_backend(monkeypatch):
+    # Every test starts with an empty response cache, so results cached by an earlier test are never served.
+    backend = InMemoryCacheBackend()
+    monkeypatch.setattr(response_cache, "cache_backend", backend)
+    return backend
+
+
+class RecordingRepository(InstrumentedRepository):
+    """
+    Records the method and arguments of every call made to the wrapped repository.
+    """
+
+    def __init__(self, name: str, repository: Repository, calls: List[Tuple[str, str, tuple]]):
+        super().__init__(name, repository)
+        self.calls = calls
+
+    async def call(self, method: str, *arguments) -> Any:
+        self.calls.append((self.name, method, arguments))
+        return await super().call(method, *arguments)
+
+
+@pytest.fixture
+def repository_calls() -> List[Tuple[str, str, tuple]]:
+    return []
+
+
+@pytest.fixture
+def record_calls(repository_calls) -> Callable[[GriseraRepositories], GriseraRepositories]:
+    """
+    Wraps the repositories of every ROAD type, recording the calls made to them in repository_calls.
+    """
+    def wrap_repositories(repositories: GriseraRepositories) -> GriseraRepositories:
+        return GriseraRepositories(**{field.name: RecordingRepository(field.name, getattr(repositories, field.name),
+                                                                      repository_calls)
+                                      for field in dataclasses.fields(repositories)})
+    return wrap_repositories
+
+
+@pytest.fixture
+def record_table_calls(repository_calls) -> Callable[[Dict[str, Repository]], Dict[str, Repository]]:
+    """
+    Wraps the repositories of every generated table, recording the calls made to them in repository_calls.
+    """
+    def wrap_repositories(repositories: Dict[str, Repository]) -> Dict[str, Repository]:
+        return {name: RecordingRepository(name, repository, repository_calls)
+                for name, repository in repositories.items()}
+    return wrap_repositories
+
+
+# A small ROAD-like ontology: an interface implemented by several types, an interface with a property of its own,
+# scalar properties, a high quantity type and references to a concrete type and to an interface.
+GENERATED_TYPE_SPECIFICATIONS = [
+    {"name": "Entity", "description": "An abstract ROAD entity.", "fields": {}, "interfaces": ["Thing"],
+     "labels": ["AbstractClass"], "module": "road"},
+    {"name": "Activity", "description": "A pattern of an activity.", "fields": {"duration": "float"},
+     "interfaces": ["Entity"], "labels": [], "module": "road"},
+    {"name": "Participant", "description": "A person taking part in an experiment.", "fields": {"age": "int"},
+     "interfaces": ["Entity"], "labels": [], "module": "road"},
+    {"name": "ActivityExecution", "description": "An execution of an activity.", "fields": {"hasActivity": "Activity"},
+     "interfaces": ["Entity"], "labels": [], "module": "road"},
+    {"name": "ParticipantState", "description": "A state of a participant.",
+     "fields": {"hasParticipant": "Participant"}, "interfaces": ["Thing"], "labels": ["HighQuantity"],
+     "module": "road"},
+    {"name": "Observation", "description": "An observation of any entity.", "fields": {"hasEntity": "Entity"},
+     "interfaces": ["Thing"], "labels": [], "module": "stimulus"},
+    {"name": "Measure", "description": "An abstract measure.", "fields": {"value": "float"}, "interfaces": ["Thing"],
+     "labels": ["AbstractClass"], "module": "road"},
+    {"name": "HeartRate", "description": "A heart rate measure.", "fields": {"unit": "str"},
+     "interfaces": ["Measure"], "labels": [], "module": "road"},
+]
+
+
+@pytest.fixture(scope="session")
+def generated_tables(tmp_path_factory) -> Dict[str, TableDefinition]:
+    """
+    Generates the schema of the test ontology into a directory of its own, importable for the rest of the session.
+    """
+    import generate_schema
+    directory = str(tmp_path_factory.mktemp("generated"))
+    working_directory = os.getcwd()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(generate_schema, "GENERATE_SCHEMA_SNAPSHOT", False)
+        os.chdir(directory)
+        try:
+            generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+        finally:
+            os.chdir(working_directory)
+    sys.path.insert(0, directory)
+    return importlib.import_module("generated_storage_tables").GENERATED_TABLES
+
+
+@pytest.fixture(scope="session")
+def generated_schema(generated_tables) -> strawberry.Schema:
+    from schema_snapshot import build_generated_schema, OPERATION_MODULES
+    return build_generated_schema(list(OPERATION_MODULES), extensions=[DatasetRouter])
+
+
+class GeneratedServer:
+    """
+    Executes operations of the generated schema against dataset partitions in a directory of their own, the way the
+    generated server does.
+    """
+
+    def __init__(self, schema: strawberry.Schema, tables: Dict[str, TableDefinition], data_directory: str):
+        self.schema = schema
+        self.tables = tables
+        self.partitions = PartitionedStore(data_directory=data_directory, tables=list(tables.values()))
+
+    def get_context(self) -> Dict:
+        return {"tables": self.tables, "partitions": self.partitions, "loaders": {}}
+
+    async def execute(self, query: str, **variables) -> Dict:
+        result = await self.schema.execute(query, variable_values=variables, context_value=self.get_context())
+        assert result.errors is None, result.errors
+        return result.data
+
+    async def subscribe(self, query: str, **variables) -> List[Dict]:
+        results = await self.schema.subscribe(query, variable_values=variables, context_value=self.get_context())
+        return [result async for result in results]
+
+    async def create_dataset(self, name: str) -> Dict[str, Repository]:
+        await self.partitions.create_datasets([{"name": name, "additional_parameters": ()}])
+        return await self.partitions.get_repositories(name)
+
+    def run(self, check: Callable[[], Awaitable[None]]):
+        async def run_check():
+            await self.partitions.open()
+            try:
+                await check()
+            finally:
+                await self.partitions.close()
+        asyncio.run(run_check())
+
+
+@pytest.fixture
+def generated_server(generated_schema, generated_tables, tmp_path) -> GeneratedServer:
+    return GeneratedServer(generated_schema, generated_tables, str(tmp_path / "data"))
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import generate_schema
+from common import camel_to_snake_case, get_specification_hash, load_generation_manifest, save_generation_manifest
+from conftest import GENERATED_TYPE_SPECIFICATIONS, REPOSITORY_DIRECTORY
+from generate_types import get_affected_graphql_types
+
+
+@pytest.fixture
+def generation_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_schema, "GENERATE_SCHEMA_SNAPSHOT", False)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def get_file_stats(directory) -> dict:
+    return {str(path.relative_to(directory)): path.stat().st_mtime_ns for path in directory.rglob("*.py")}
+
+
+def test_changed_class_and_the_classes_depending_on_it_are_affected():
+    emitted_classes = {specification["name"]: {"hash": get_specification_hash(specification)}
+                       for specification in GENERATED_TYPE_SPECIFICATIONS}
+    changed_specifications = [dict(specification, fields={"duration": "int"})
+                              if specification["name"] == "Activity" else specification
+                              for specification in GENERATED_TYPE_SPECIFICATIONS]
+    assert get_affected_graphql_types(changed_specifications, emitted_classes) == {"Activity", "ActivityExecution"}
+
+
+def test_unchanged_schema_is_not_rewritten(generation_directory):
+    generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+    file_stats = get_file_stats(generation_directory)
+    generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+    assert get_file_stats(generation_directory) == file_stats
+
+
+def test_code_of_unaffected_classes_is_reused_from_the_manifest(generation_directory):
+    generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+    manifest = load_generation_manifest()
+    manifest["classes"]["Participant"]["code"] += "\n# Participant code from the manifest\n"
+    manifest["classes"]["Activity"]["code"] += "\n# Activity code from the manifest\n"
+    save_generation_manifest(manifest)
+
+    changed_specifications = [dict(specification, description="A changed activity.")
+                              if specification["name"] == "Activity" else specification
+                              for specification in GENERATED_TYPE_SPECIFICATIONS]
+    generate_schema.generate_graphql_schema(changed_specifications)
+    with open(os.path.join("generated_graphql_types", "road.py")) as types_module:
+        types_code = types_module.read()
+    assert "# Participant code from the manifest" in types_code
+    assert "# Activity code from the manifest" not in types_code
+    assert "A changed activity." in types_code
+
+
+def test_operations_of_every_class_are_emitted_with_their_types_annotated(generation_directory):
+    generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+    with open("generated_graphql_queries.py") as queries_file, \
+            open("generated_graphql_mutations.py") as mutations_file:
+        queries_code, mutations_code = queries_file.read(), mutations_file.read()
+    for code in (queries_code, mutations_code):
+        compile(code, "generated", "exec")
+    for specification in GENERATED_TYPE_SPECIFICATIONS:
+        snake_case_name = camel_to_snake_case(specification["name"])
+        assert f"async def get_{snake_case_name}(" in queries_code
+        for operation in ("create", "update", "delete"):
+            assert f"async def {operation}_{snake_case_name}(" in mutations_code
+        # Queries return the type, mutations take its input.
+        for code, type_name in ((queries_code, specification["name"]),
+                                (mutations_code, f"{specification['name']}Input")):
+            assert (f"{type_name} = Annotated[\"{type_name}\", "
+                    f"strawberry.lazy(\"generated_graphql_types.{specification['module']}\")]") in code
+
+
+def test_operations_load_the_ontology_modules_only_when_the_schema_is_built(generation_directory):
+    generate_schema.generate_graphql_schema(GENERATED_TYPE_SPECIFICATIONS)
+    # Run in a fresh interpreter, as the session has imported the generated types already.
+    script = ("import sys\n"
+              f"sys.path[:0] = [{REPOSITORY_DIRECTORY!r}, '']\n"
+              "import strawberry\n"
+              "import generated_graphql_queries, generated_graphql_subscriptions\n"
+              "print(sorted(name for name in sys.modules if name.startswith('generated_graphql_types')))\n"
+              "strawberry.Schema(query=generated_graphql_queries.GriseraQuery)\n"
+              "print(sorted(name for name in sys.modules if name.startswith('generated_graphql_types')))\n")
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert output.splitlines() == [
+        "[]", "['generated_graphql_types', 'generated_graphql_types.base', 'generated_graphql_types.road', "
+              "'generated_graphql_types.stimulus']"]
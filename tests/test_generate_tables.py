@@ -0,0 +1,27 @@
+from typing import Dict
+
+from generate_tables import create_tables_file
+from storage.tables import TableDefinition
+
+
+def get_specification(name: str, interfaces=("Thing",), labels=(), **fields) -> dict:
+    return {"name": name, "description": "", "fields": fields, "interfaces": list(interfaces), "labels": list(labels)}
+
+
+def load_tables(specifications) -> Dict[str, TableDefinition]:
+    namespace = {}
+    exec(create_tables_file(specifications), namespace)
+    return namespace["GENERATED_TABLES"]
+
+
+def test_inherited_properties_are_indexed_in_the_tables_of_the_implementing_types():
+    tables = load_tables([get_specification("Thing", interfaces=(), labels=["AbstractClass"]),
+                          get_specification("Participant"),
+                          get_specification("Entity", labels=["AbstractClass"], hasOwner="Participant"),
+                          get_specification("Measure", interfaces=["Entity"], labels=["AbstractClass"], value="float"),
+                          get_specification("HeartRate", interfaces=["Measure"], unit="str")])
+    assert tables["HeartRate"] == TableDefinition(name="heart_rate", reference_columns=("has_owner_id",),
+                                                  scalar_columns=("value", "unit"),
+                                                  indexed_columns=("has_owner_id", "value", "unit"),
+                                                  interfaces=("measure", "entity", "thing"))
+    assert tables["Measure"].indexed_columns == ("has_owner_id", "value")
@@ -0,0 +1,13 @@
+from generate_types import select_new_graphql_types
+
+
+def create_type(name: str, interfaces=("Thing",), **fields) -> dict:
+    return {"name": name, "description": "", "fields": fields, "interfaces": list(interfaces), "labels": []}
+
+
+def test_types_generated_from_earlier_ontologies_are_skipped_by_exact_name():
+    generated_types = {"Activity": create_type("Activity")}
+    graphql_types = [create_type("Thing", ()), create_type("Activity"),
+                     create_type("ActivityExecution", hasActivity="Activity")]
+    assert [graphql_type["name"] for graphql_type in select_new_graphql_types(graphql_types, generated_types)] == [
+        "ActivityExecution"]
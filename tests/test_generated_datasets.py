@@ -0,0 +1,114 @@
+import os
+
+from storage.partitions import get_partition_path
+
+ACTIVITY_QUERY = """
+query($dataset: String!, $name: String) {
+  getActivity(datasetContext: {name: $dataset}, name: $name) { id name duration additionalParameters { key value } }
+}
+"""
+
+
+def test_mutations_create_and_populate_a_dataset(generated_server):
+    async def check():
+        await generated_server.execute('mutation { createDataset(name: "dataset-b") }')
+        created = await generated_server.execute("""mutation {
+          createActivity(datasetContext: {name: "dataset-b"}, name: "walk", duration: 2.5,
+                         additionalParameters: [{key: "pace", value: "slow"}])
+        }""")
+        activity_id = created["createActivity"]
+        assert await generated_server.execute(ACTIVITY_QUERY, dataset="dataset-b", name="walk") == {"getActivity": {
+            "id": activity_id, "name": "walk", "duration": 2.5,
+            "additionalParameters": [{"key": "pace", "value": "slow"}]}}
+
+        assert await generated_server.execute(
+            'mutation($id: String!) { updateActivity(datasetContext: {name: "dataset-b"}, Id: $id, duration: 3.0) }',
+            id=activity_id) == {"updateActivity": "Activity updated"}
+        assert (await generated_server.execute(ACTIVITY_QUERY, dataset="dataset-b", name="walk"))["getActivity"][
+            "duration"] == 3.0
+
+        assert await generated_server.execute(
+            'mutation($id: String!) { deleteActivity(datasetContext: {name: "dataset-b"}, Id: $id) }',
+            id=activity_id) == {"deleteActivity": "Activity deleted"}
+        assert await generated_server.execute(ACTIVITY_QUERY, dataset="dataset-b", name="walk") == {
+            "getActivity": None}
+
+    generated_server.run(check)
+
+
+def test_query_of_a_dataset_never_created_fails(generated_server):
+    async def check():
+        result = await generated_server.schema.execute(ACTIVITY_QUERY, variable_values={"dataset": "dataset-c"},
+                                                       context_value=generated_server.get_context())
+        assert [error.message for error in result.errors] == ["Dataset dataset-c not found"]
+
+    generated_server.run(check)
+
+
+def test_datasets_are_found_in_the_catalog_whatever_their_dataset_context(generated_server):
+    async def check():
+        dataset_id = (await generated_server.execute('mutation { createDataset(name: "dataset-b") }'))["createDataset"]
+        assert await generated_server.execute(
+            'query { getDataset(datasetContext: {name: "dataset-b"}, name: "dataset-b") { id name } }') == {
+            "getDataset": {"id": dataset_id, "name": "dataset-b"}}
+
+        result = await generated_server.schema.execute('mutation { createDataset(name: "dataset-b") }',
+                                                       context_value=generated_server.get_context())
+        assert [error.message for error in result.errors] == ["Dataset dataset-b already exists"]
+
+    generated_server.run(check)
+
+
+def test_mutation_of_an_unknown_dataset_fails_without_creating_its_partition(generated_server):
+    async def check():
+        result = await generated_server.schema.execute(
+            'mutation { createActivity(datasetContext: {name: "dataset-c"}, name: "walk", duration: 1.0) }',
+            context_value=generated_server.get_context())
+        assert [error.message for error in result.errors] == ["Dataset dataset-c not found"]
+        assert not os.path.exists(get_partition_path(generated_server.partitions.data_directory, "dataset-c"))
+
+    generated_server.run(check)
+
+
+def test_partition_is_created_and_removed_with_its_dataset(generated_server):
+    async def check():
+        partition_path = get_partition_path(generated_server.partitions.data_directory, "dataset-b")
+        await generated_server.execute('mutation { createDataset(name: "dataset-b") }')
+        assert os.path.exists(partition_path)
+        await generated_server.execute(
+            'mutation { createActivity(datasetContext: {name: "dataset-b"}, name: "walk", duration: 1.0) }')
+
+        assert await generated_server.execute('mutation { deleteDataset(name: "dataset-b") }') == {
+            "deleteDataset": "Dataset deleted"}
+        assert not os.path.exists(partition_path)
+        result = await generated_server.schema.execute(ACTIVITY_QUERY, variable_values={"dataset": "dataset-b"},
+                                                       context_value=generated_server.get_context())
+        assert [error.message for error in result.errors] == ["Dataset dataset-b not found"]
+
+    generated_server.run(check)
+
+
+def test_least_recently_used_partitions_are_closed_once_unused(generated_server):
+    partitions = generated_server.partitions
+    partitions.max_open_partitions = 1
+
+    async def check():
+        await partitions.create_datasets([{"name": name, "additional_parameters": ()}
+                                          for name in ("dataset-a", "dataset-b")])
+        assert list(partitions.stores) == ["", "dataset-b"]
+
+        async with partitions.use_repositories("dataset-b"):
+            store = partitions.stores["dataset-b"]
+            await partitions.get_repositories("dataset-a")
+            # The partition still used by a request is only closed once the request ends.
+            assert list(partitions.stores) == ["", "dataset-a"]
+            assert partitions.retired_stores == {store}
+            assert store.pool.opened_connections
+        assert partitions.retired_stores == set()
+        assert not store.pool.opened_connections
+
+        assert await generated_server.execute(ACTIVITY_QUERY, dataset="dataset-b", name="walk") == {
+            "getActivity": None}
+        assert list(partitions.stores) == ["", "dataset-b"]
+
+    generated_server.run(check)
@@ -0,0 +1,67 @@
+ACTIVITY_QUERY = 'query($id: String) { getActivity(datasetContext: {name: "dataset-a"}, Id: $id) { name duration } }'
+
+
+def test_batch_mutations_report_a_result_per_item(generated_server):
+    async def check():
+        await generated_server.create_dataset("dataset-a")
+        created = await generated_server.execute("""mutation {
+          createActivityBatch(datasetContext: {name: "dataset-a"}, items: [
+            {name: "first", duration: 1.5}, {duration: 2.0}, {name: "second", duration: 0.5}, {name: "third"}
+          ]) { id error }
+        }""")
+        [first, unnamed, second, third] = created["createActivityBatch"]
+        assert first["error"] is None and second["error"] is None
+        assert unnamed == {"id": None, "error": "name is required"}
+        assert third == {"id": None, "error": "duration is required"}
+        assert await generated_server.execute(ACTIVITY_QUERY, id=first["id"]) == {
+            "getActivity": {"name": "first", "duration": 1.5}}
+
+        updated = await generated_server.execute("""mutation($items: [ActivityInput!]!) {
+          updateActivityBatch(datasetContext: {name: "dataset-a"}, items: $items) { id error }
+        }""", items=[{"id": first["id"], "duration": 3.0}, {"id": "missing", "name": "x"}, {"name": "no id"}])
+        assert updated["updateActivityBatch"] == [{"id": first["id"], "error": None},
+                                                  {"id": "missing", "error": "Activity missing not found"},
+                                                  {"id": None, "error": "id is required"}]
+        # Fields left out of an update keep their values.
+        assert await generated_server.execute(ACTIVITY_QUERY, id=first["id"]) == {
+            "getActivity": {"name": "first", "duration": 3.0}}
+
+        deleted = await generated_server.execute("""mutation($ids: [String!]!) {
+          deleteActivityBatch(datasetContext: {name: "dataset-a"}, ids: $ids) { id error }
+        }""", ids=[second["id"], "missing"])
+        assert deleted["deleteActivityBatch"] == [{"id": second["id"], "error": None},
+                                                  {"id": "missing", "error": "Activity missing not found"}]
+        assert await generated_server.execute(ACTIVITY_QUERY, id=second["id"]) == {"getActivity": None}
+
+    generated_server.run(check)
+
+
+def test_batch_mutations_store_references_and_change_interface_objects_in_their_own_tables(generated_server):
+    async def check():
+        await generated_server.create_dataset("dataset-a")
+        [activity] = (await generated_server.execute("""mutation {
+          createActivityBatch(datasetContext: {name: "dataset-a"}, items: [{name: "activity", duration: 1.0}]) { id }
+        }"""))["createActivityBatch"]
+        executions = await generated_server.execute("""mutation($activity: ID) {
+          createActivityExecutionBatch(datasetContext: {name: "dataset-a"}, items: [
+            {name: "execution", hasActivity: {id: $activity}}, {name: "unset", hasActivity: {name: "activity"}}
+          ]) { id error }
+        }""", activity=activity["id"])
+        assert executions["createActivityExecutionBatch"][1] == {"id": None, "error": "hasActivity must be given by ID"}
+        assert await generated_server.execute("""{
+          getActivityExecution(datasetContext: {name: "dataset-a"}, name: "execution") { hasActivity { name } }
+        }""") == {"getActivityExecution": {"hasActivity": {"name": "activity"}}}
+
+        updated = await generated_server.execute("""mutation($id: ID) {
+          updateEntityBatch(datasetContext: {name: "dataset-a"}, items: [{id: $id, name: "renamed"}]) { error }
+        }""", id=activity["id"])
+        assert updated == {"updateEntityBatch": [{"error": None}]}
+        assert await generated_server.execute(ACTIVITY_QUERY, id=activity["id"]) == {
+            "getActivity": {"name": "renamed", "duration": 1.0}}
+        deleted = await generated_server.execute("""mutation($id: String!) {
+          deleteEntityBatch(datasetContext: {name: "dataset-a"}, ids: [$id]) { error }
+        }""", id=activity["id"])
+        assert deleted == {"deleteEntityBatch": [{"error": None}]}
+        assert await generated_server.execute(ACTIVITY_QUERY, id=activity["id"]) == {"getActivity": None}
+
+    generated_server.run(check)
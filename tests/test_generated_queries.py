@@ -0,0 +1,118 @@
+import sqlite3
+
+from storage.partitions import get_partition_path
+
+DATASET = "dataset-a"
+
+ACTIVITY_EXECUTION_QUERY = """
+query($name: String) {
+  getActivityExecution(datasetContext: {name: "dataset-a"}, name: $name) { name hasActivity { name duration } }
+}
+"""
+
+
+def test_unset_reference_resolves_to_null(generated_server):
+    async def check():
+        repositories = await generated_server.create_dataset(DATASET)
+        [activity_id] = await repositories["activity"].create_many(
+            [{"name": "activity", "additional_parameters": (), "duration": 1.5}])
+        await repositories["activity_execution"].create_many(
+            [{"name": "unset", "additional_parameters": ()},
+             {"name": "set", "additional_parameters": (), "has_activity_id": activity_id}])
+
+        assert await generated_server.execute(ACTIVITY_EXECUTION_QUERY, name="unset") == {
+            "getActivityExecution": {"name": "unset", "hasActivity": None}}
+        assert await generated_server.execute(ACTIVITY_EXECUTION_QUERY, name="set") == {
+            "getActivityExecution": {"name": "set", "hasActivity": {"name": "activity", "duration": 1.5}}}
+
+    generated_server.run(check)
+
+
+async def seed_entities(generated_server) -> dict:
+    repositories = await generated_server.create_dataset(DATASET)
+    [activity_id] = await repositories["activity"].create_many(
+        [{"name": "activity", "additional_parameters": (), "duration": 1.5}])
+    [participant_id] = await repositories["participant"].create_many(
+        [{"name": "participant", "additional_parameters": (), "age": 30}])
+    observation_ids = await repositories["observation"].create_many(
+        [{"name": "activity-observation", "additional_parameters": (), "has_entity_id": activity_id},
+         {"name": "participant-observation", "additional_parameters": (), "has_entity_id": participant_id}])
+    return {"activity": activity_id, "participant": participant_id, "observations": observation_ids}
+
+
+def test_interface_is_looked_up_in_the_tables_of_its_implementing_types(generated_server):
+    async def check():
+        ids = await seed_entities(generated_server)
+        thing_query = """query($name: String, $id: String) {
+          getThing(datasetContext: {name: "dataset-a"}, name: $name, Id: $id) {
+            __typename id name ... on Participant { age }
+          }
+        }"""
+        assert await generated_server.execute(thing_query, name="participant") == {"getThing": {
+            "__typename": "Participant", "id": ids["participant"], "name": "participant", "age": 30}}
+        assert await generated_server.execute(thing_query, id=ids["activity"]) == {"getThing": {
+            "__typename": "Activity", "id": ids["activity"], "name": "activity"}}
+        assert await generated_server.execute(thing_query, name="missing") == {"getThing": None}
+        assert await generated_server.execute(
+            'query($id: String) { getEntity(datasetContext: {name: "dataset-a"}, Id: $id) { name } }',
+            id=ids["observations"][0]) == {"getEntity": None}
+
+    generated_server.run(check)
+
+
+def test_reference_to_interface_is_loaded_as_its_concrete_type(generated_server):
+    async def check():
+        await seed_entities(generated_server)
+        observations = await generated_server.execute("""{
+          listThing(datasetContext: {name: "dataset-a"}) { edges { node { ... on Observation {
+            name hasEntity { __typename name ... on Activity { duration } ... on Participant { age } }
+          } } } }
+        }""")
+        assert sorted((edge["node"]["name"], edge["node"]["hasEntity"]) for edge
+                      in observations["listThing"]["edges"] if edge["node"]) == [
+            ("activity-observation", {"__typename": "Activity", "name": "activity", "duration": 1.5}),
+            ("participant-observation", {"__typename": "Participant", "name": "participant", "age": 30})]
+
+        assert await generated_server.execute("""{
+          getObservation(datasetContext: {name: "dataset-a"}, hasEntity: {name: "participant"}) { name }
+        }""") == {"getObservation": {"name": "participant-observation"}}
+
+    generated_server.run(check)
+
+
+def test_additional_parameters_are_filtered_by_key(generated_server):
+    async def check():
+        repositories = await generated_server.create_dataset(DATASET)
+        await repositories["participant"].create_many(
+            [{"name": "participant", "additional_parameters": (("hand", "left"), ("eyes", "blue")), "age": 30}])
+        assert await generated_server.execute("""{
+          getThing(datasetContext: {name: "dataset-a"}, name: "participant") {
+            all: additionalParameters { key value } eyes: additionalParameters(keys: ["eyes"]) { value }
+          }
+        }""") == {"getThing": {"all": [{"key": "hand", "value": "left"}, {"key": "eyes", "value": "blue"}],
+                               "eyes": [{"value": "blue"}]}}
+
+    generated_server.run(check)
+
+
+def test_interface_filtered_on_its_property_is_searched_by_index(generated_server):
+    async def check():
+        repositories = await generated_server.create_dataset(DATASET)
+        await repositories["heart_rate"].create_many(
+            [{"name": f"heart-rate-{value}", "additional_parameters": (), "value": value, "unit": "bpm"}
+             for value in (60.0, 72.5, 90.0)])
+        statements = []
+        for connection in generated_server.partitions.stores[DATASET].pool.opened_connections:
+            await connection.set_trace_callback(statements.append)
+
+        assert await generated_server.execute(
+            'query { getMeasure(datasetContext: {name: "dataset-a"}, value: 72.5) { __typename name } }') == {
+            "getMeasure": {"__typename": "HeartRate", "name": "heart-rate-72.5"}}
+        # The property of the interface is read from the table of the implementing type.
+        [statement] = [statement for statement in statements if statement.startswith("SELECT")]
+        assert 'FROM "heart_rate" WHERE "value" = 72.5' in statement
+        with sqlite3.connect(get_partition_path(generated_server.partitions.data_directory, DATASET)) as database:
+            query_plan = [row[3] for row in database.execute(f"EXPLAIN QUERY PLAN {statement}")]
+        assert query_plan == ["SEARCH heart_rate USING INDEX heart_rate_value (value=?)"]
+
+    generated_server.run(check)
@@ -0,0 +1,56 @@
+import pytest
+
+STREAM_ACTIVITY = """
+subscription($chunkSize: Int!) {
+  streamActivity(datasetContext: {name: "dataset-a"}, chunkSize: $chunkSize, duration: 1.5) { name }
+}
+"""
+
+
+def test_stream_yields_matching_objects_in_chunks(generated_server):
+    async def check():
+        repositories = await generated_server.create_dataset("dataset-a")
+        await repositories["activity"].create_many([{"name": f"activity-{index}", "additional_parameters": (),
+                                                     "duration": 1.5 if index % 2 == 0 else 2.5}
+                                                    for index in range(5)])
+
+        results = await generated_server.subscribe(STREAM_ACTIVITY, chunkSize=2)
+        assert [result.errors for result in results] == [None, None]
+        chunks = [result.data["streamActivity"] for result in results]
+        # Chunks follow the order of the IDs, not the order the objects were created in.
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert sorted(activity["name"] for chunk in chunks for activity in chunk) == [
+            "activity-0", "activity-2", "activity-4"]
+
+    generated_server.run(check)
+
+
+def test_stream_of_a_dataset_never_created_fails(generated_server):
+    async def check():
+        with pytest.raises(Exception, match="Dataset dataset-c not found"):
+            await generated_server.subscribe(STREAM_ACTIVITY.replace("dataset-a", "dataset-c"), chunkSize=2)
+
+    generated_server.run(check)
+
+
+def test_references_are_loaded_again_for_every_chunk(generated_server, record_table_calls, repository_calls):
+    async def check():
+        repositories = await generated_server.create_dataset("dataset-a")
+        [activity_id] = await repositories["activity"].create_many(
+            [{"name": "activity", "additional_parameters": (), "duration": 1.5}])
+        await repositories["activity_execution"].create_many(
+            [{"name": f"execution-{index}", "additional_parameters": (), "has_activity_id": activity_id}
+             for index in range(2)])
+        repository_calls.clear()
+
+        results = await generated_server.subscribe("""subscription {
+          streamActivityExecution(datasetContext: {name: "dataset-a"}, chunkSize: 1) { hasActivity { name } }
+        }""")
+        assert [result.data for result in results] == [
+            {"streamActivityExecution": [{"hasActivity": {"name": "activity"}}]}] * 2
+        # The loaders of the first chunk, which cached the activity, are dropped with it.
+        assert [(repository, method) for repository, method, _ in repository_calls
+                if repository == "activity"] == [("activity", "get_by_ids")] * 2
+
+    generated_server.partitions.wrap_repositories = record_table_calls
+    generated_server.run(check)
@@ -0,0 +1,39 @@
+import asyncio
+
+from main import schema
+from resolvers.loaders import create_loaders
+from storage.sqlite_store import SQLiteStore
+
+PARTICIPANT_STATES_QUERY = "{ participantStates(first: 30) { edges { node { name hasParticipant { name } } } } }"
+
+
+async def seed_participant_states(repositories, participants: int, participant_states: int):
+    participant_ids = await repositories.participant.create_many(
+        [{"name": f"participant-{index}", "additional_parameters": ()} for index in range(participants)])
+    await repositories.participant_state.create_many(
+        [{"name": f"state-{index}", "additional_parameters": (),
+          "participant_id": participant_ids[index % participants]} for index in range(participant_states)])
+
+
+def test_sibling_relations_are_loaded_in_a_single_backend_call(database_path, record_calls, repository_calls):
+    async def execute_query():
+        store = SQLiteStore(database_path=database_path)
+        await store.open()
+        try:
+            await seed_participant_states(store.create_repositories(), participants=7, participant_states=30)
+            repositories = record_calls(store.create_repositories())
+            return await schema.execute(PARTICIPANT_STATES_QUERY, context_value={
+                "repositories": repositories, "loaders": create_loaders(repositories)})
+        finally:
+            await store.close()
+
+    result = asyncio.run(execute_query())
+    assert result.errors is None
+    edges = result.data["participantStates"]["edges"]
+    assert len(edges) == 30
+    assert all(edge["node"]["hasParticipant"]["name"].startswith("participant-") for edge in edges)
+    assert [(repository, method) for repository, method, _ in repository_calls] == [
+        ("participant_state", "get_page"), ("participant", "get_by_ids")]
+    # The 30 relations point to 7 participants, each read once.
+    _, _, (participant_ids, _) = repository_calls[1]
+    assert len(participant_ids) == 7
@@ -0,0 +1,63 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from extensions import metrics
+from extensions.metrics import instrument_table_repositories, is_metrics_request_allowed, OperationTimer, \
+    ResolverTimer
+from main import app
+from storage.partitions import PartitionedStore
+
+
+def test_resolvers_are_only_timed_on_request(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    monkeypatch.setattr(metrics, "RESOLVER_METRICS_ENABLED", False)
+    assert metrics.get_metrics_extensions() == [OperationTimer]
+    monkeypatch.setattr(metrics, "RESOLVER_METRICS_ENABLED", True)
+    assert metrics.get_metrics_extensions() == [ResolverTimer]
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    assert metrics.get_metrics_extensions() == []
+
+
+def test_calls_to_dataset_repositories_are_recorded(generated_tables, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "server_metrics", metrics.RequestMetrics())
+    partitions = PartitionedStore(data_directory=str(tmp_path / "data"), tables=list(generated_tables.values()),
+                                  wrap_repositories=instrument_table_repositories)
+
+    async def check():
+        await partitions.open()
+        try:
+            await partitions.create_datasets([{"name": "dataset-a", "additional_parameters": ()}])
+            repositories = await partitions.get_repositories("dataset-a")
+            await repositories["activity"].create_many([{"name": "activity", "additional_parameters": (),
+                                                         "duration": 1.5}])
+        finally:
+            await partitions.close()
+
+    asyncio.run(check())
+    assert metrics.server_metrics.backend.calls == {("dataset", "create_many"): 1, ("activity", "create_many"): 1}
+
+
+def get_metrics_status(headers: dict = None) -> int:
+    # The lifespan of the server, which opens its database, is only run when the client is used as a context manager.
+    return TestClient(app).get("/metrics", headers=headers).status_code
+
+
+def create_request(host: str, headers: dict = None) -> Request:
+    return Request({"type": "http", "client": (host, 50000),
+                    "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]})
+
+
+def test_metrics_are_only_served_to_local_clients_without_a_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert get_metrics_status() == 403
+    assert is_metrics_request_allowed(create_request("127.0.0.1"))
+    assert not is_metrics_request_allowed(create_request("203.0.113.7"))
+
+
+def test_metrics_are_only_served_to_requests_bearing_the_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "secret")
+    assert get_metrics_status(headers={"Authorization": "Bearer wrong"}) == 403
+    assert get_metrics_status(headers={"Authorization": "Bearer secret"}) == 200
+    assert not is_metrics_request_allowed(create_request("127.0.0.1"))
@@ -0,0 +1,39 @@
+import pytest
+
+from common import build_name_mapping, camel_to_snake_case
+
+
+@pytest.mark.parametrize("name, snake_case_name", [
+    ("ActivityExecution", "activity_execution"),
+    ("hasPADs", "has_pads"),
+    ("hasPADValue", "has_pad_value"),
+    ("PADState", "pad_state"),
+    # Acronyms within other words are not split out of them.
+    ("SPADE", "spade"),
+    ("hasSPADE", "has_spade"),
+])
+def test_names_are_converted_to_snake_case(name, snake_case_name):
+    assert camel_to_snake_case(name) == snake_case_name
+
+
+def get_specification(name: str, fields: dict) -> dict:
+    return {"name": name, "description": "", "fields": fields, "interfaces": ["Thing"], "labels": [], "module": "road"}
+
+
+def test_name_mapping_maps_argument_names_back_to_the_ontology_properties():
+    assert build_name_mapping([get_specification("PADState", {"hasPADs": "str", "hasParticipant": "Participant"})]) \
+           == {"PADState": {"name": "pad_state", "properties": {"has_pads": "hasPADs",
+                                                                "has_participant": "hasParticipant"}}}
+
+
+@pytest.mark.parametrize("specifications, error", [
+    ([get_specification("PADState", {}), get_specification("PadState", {})],
+     "Classes PADState and PadState both map to pad_state"),
+    ([get_specification("Activity", {"hasPAD": "str", "hasPad": "str"})],
+     "Property hasPad of Activity maps to has_pad, which is already used by hasPAD"),
+    ([get_specification("Activity", {"Name": "str"})],
+     "Property Name of Activity maps to name, which is already used by a generated argument"),
+])
+def test_names_converted_to_the_same_name_are_rejected(specifications, error):
+    with pytest.raises(Exception, match=error):
+        build_name_mapping(specifications)
@@ -0,0 +1,42 @@
+import pytest
+
+from generate_types import order_graphql_types
+
+
+def create_type(name: str, interfaces=("Thing",), **fields) -> dict:
+    return {"name": name, "description": "", "fields": fields, "interfaces": list(interfaces), "labels": []}
+
+
+def test_types_come_after_their_interfaces_and_field_types():
+    graphql_types = [create_type("ActivityExecution", ("Entity",), hasActivity="Activity"),
+                     create_type("Activity", ("Entity",), duration="float"),
+                     create_type("Entity")]
+    assert [graphql_type["name"] for graphql_type in order_graphql_types(graphql_types)] == [
+        "Entity", "Activity", "ActivityExecution"]
+
+
+def test_order_does_not_depend_on_the_order_of_the_classes():
+    graphql_types = [create_type("Participant", age="int"), create_type("Activity"), create_type("Scenario")]
+    assert [graphql_type["name"] for graphql_type in order_graphql_types(graphql_types)] == \
+           [graphql_type["name"] for graphql_type in order_graphql_types(list(reversed(graphql_types)))] == [
+               "Activity", "Scenario", "Participant"]
+
+
+def test_types_already_generated_are_not_waited_for():
+    graphql_types = [create_type("Observation", hasEntity="Entity")]
+    assert order_graphql_types(graphql_types, generated_types={"Entity": create_type("Entity")}) == graphql_types
+
+
+@pytest.mark.parametrize("graphql_types", [
+    [create_type("Observation", hasEntity="Entity")],
+    [create_type("Observation", hasEntity="Entity"), create_type("Activity")],
+])
+def test_missing_dependency_is_reported(graphql_types):
+    with pytest.raises(Exception, match=r"missing types: \['Entity'\]"):
+        order_graphql_types(graphql_types)
+
+
+def test_cyclic_dependency_is_reported():
+    with pytest.raises(Exception, match="unresolved"):
+        order_graphql_types([create_type("Activity", hasScenario="Scenario"),
+                             create_type("Scenario", hasActivity="Activity")])
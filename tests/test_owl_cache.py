@@ -0,0 +1,73 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import owl_cache
+
+OWL_FILE_CONTENT = b"<rdf:RDF/>"
+ETAG = '"road-v1"'
+
+
+class OwlFileHandler(BaseHTTPRequestHandler):
+    """
+    Serves a single OWL file with an ETag, answering requests revalidating that ETag with 304 Not Modified.
+    """
+    requests = []
+
+    def do_GET(self):
+        self.requests.append({"path": self.path, "if_none_match": self.headers.get("If-None-Match")})
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(OWL_FILE_CONTENT)))
+        self.end_headers()
+        self.wfile.write(OWL_FILE_CONTENT)
+
+    def log_message(self, *arguments):
+        pass
+
+
+@pytest.fixture
+def owl_server():
+    OwlFileHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OwlFileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(owl_cache, "OWL_CACHE_DIRECTORY", str(tmp_path / "owl_cache"))
+    return tmp_path / "owl_cache"
+
+
+def test_second_fetch_revalidates_with_etag_and_reuses_cached_file(owl_server, cache_directory):
+    url = f"{owl_server}/owlAC.owl"
+    [cached_file] = owl_cache.fetch_owl_files([url])
+    assert OwlFileHandler.requests == [{"path": "/owlAC.owl", "if_none_match": None}]
+    with open(cached_file, 'rb') as owl_file:
+        assert owl_file.read() == OWL_FILE_CONTENT
+    # A rewrite replaces the file, giving it another inode.
+    cached_file_stat = os.stat(cached_file)
+
+    assert owl_cache.fetch_owl_files([url]) == [cached_file]
+    assert OwlFileHandler.requests[1] == {"path": "/owlAC.owl", "if_none_match": ETAG}
+    assert (os.stat(cached_file).st_ino, os.stat(cached_file).st_mtime_ns) == (cached_file_stat.st_ino,
+                                                                               cached_file_stat.st_mtime_ns)
+    assert not os.path.exists(f"{cached_file}.tmp")
+    assert owl_cache.load_cache_index()[url]["etag"] == ETAG
+
+
+def test_unchanged_revision_is_not_requested(owl_server, cache_directory):
+    url = f"{owl_server}/owlAC.owl"
+    owl_cache.fetch_owl_files([url], revisions={url: "sha-1"})
+    owl_cache.fetch_owl_files([url], revisions={url: "sha-1"})
+    assert len(OwlFileHandler.requests) == 1
@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import pytest
+from owlready2 import DataProperty, ObjectProperty, onto_path, Thing, World
+
+import generate_types
+
+ROAD_IRI = "http://example.org/owlAC.owl"
+STIMULUS_IRI = "http://example.org/Stimulus.owl"
+
+
+@pytest.fixture(autouse=True)
+def ontology_path():
+    # Imported ontologies are looked up in the directories of every earlier run, which would find the files of
+    # another test.
+    saved_ontology_path = list(onto_path)
+    yield
+    onto_path[:] = saved_ontology_path
+
+
+@pytest.fixture
+def owl_directory(tmp_path) -> str:
+    """
+    Saves a small ROAD ontology and a stimulus ontology importing it, built in a world of their own.
+    """
+    directory = tmp_path / "road"
+    directory.mkdir()
+    world = World()
+    road = world.get_ontology(ROAD_IRI)
+    with road:
+        class Entity(Thing):
+            label = ["AbstractClass"]
+            comment = ["An abstract ROAD entity."]
+
+        class duration(DataProperty):
+            pass
+
+        class hasActivity(ObjectProperty):
+            pass
+
+        class Activity(Entity):
+            is_a = [Entity, duration.some(float)]
+
+        class ActivityExecution(Entity):
+            is_a = [Entity, hasActivity.some(Activity)]
+    road.save(file=str(directory / "owlAC.owl"), format="rdfxml")
+
+    stimulus = world.get_ontology(STIMULUS_IRI)
+    stimulus.imported_ontologies.append(road)
+    with stimulus:
+        class hasEntity(ObjectProperty):
+            pass
+
+        class Observation(Thing):
+            is_a = [Thing, hasEntity.some(Entity)]
+    stimulus.save(file=str(directory / "Stimulus.owl"), format="rdfxml")
+    world.close()
+    return str(directory)
+
+
+def generate_types_from_owl(owl_directory: str, working_directory: str, workers: int = 1) -> List[Dict]:
+    # The manifest and the quadstore are kept in the working directory of the run.
+    os.makedirs(working_directory, exist_ok=True)
+    current_directory = os.getcwd()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(generate_types, "get_owl_files_from_road_website",
+                            lambda: [os.path.join(owl_directory, "owlAC.owl"),
+                                     os.path.join(owl_directory, "Stimulus.owl")])
+        os.chdir(working_directory)
+        try:
+            return generate_types.generate_graphql_types_from_owl("road.affectivese.org", workers=workers)
+        finally:
+            os.chdir(current_directory)
+
+
+def read_manifest(working_directory: str) -> str:
+    with open(os.path.join(working_directory, ".generation_manifest.json")) as manifest_file:
+        return manifest_file.read()
+
+
+def test_ontologies_are_mapped_to_ordered_class_specifications(owl_directory, tmp_path):
+    graphql_types = generate_types_from_owl(owl_directory, str(tmp_path / "serial"))
+    assert [(graphql_type["name"], graphql_type["fields"], graphql_type["interfaces"], graphql_type["module"])
+            for graphql_type in graphql_types] == [
+        ("Entity", {}, ["Thing"], "owlac"),
+        ("Activity", {"duration": "float"}, ["Entity"], "owlac"),
+        ("ActivityExecution", {"hasActivity": "Activity"}, ["Entity"], "owlac"),
+        ("Observation", {"hasEntity": "Entity"}, ["Thing"], "stimulus")]
+    assert graphql_types[0]["labels"] == ["AbstractClass"]
+
+
+def test_ontologies_mapped_in_a_process_pool_match_the_serial_mapping(owl_directory, tmp_path, monkeypatch):
+    pools = []
+
+    class RecordingProcessPoolExecutor(ProcessPoolExecutor):
+        def __init__(self, max_workers: int, **arguments):
+            pools.append(max_workers)
+            super().__init__(max_workers, **arguments)
+
+    monkeypatch.setattr(generate_types, "ProcessPoolExecutor", RecordingProcessPoolExecutor)
+    serial_types = generate_types_from_owl(owl_directory, str(tmp_path / "serial"), workers=1)
+    assert pools == []
+    parallel_types = generate_types_from_owl(owl_directory, str(tmp_path / "parallel"), workers=2)
+    assert pools == [2]
+    assert parallel_types == serial_types
+    assert read_manifest(str(tmp_path / "parallel")) == read_manifest(str(tmp_path / "serial"))
+
+
+def get_imported_files(output: str) -> List[str]:
+    return [os.path.basename(line.split(" ")[1]) for line in output.splitlines()
+            if line.startswith("Importing ")]
+
+
+def test_ontologies_are_parsed_once_and_reused_from_the_quadstore(owl_directory, tmp_path, capsys):
+    working_directory = str(tmp_path / "generation")
+    graphql_types = generate_types_from_owl(owl_directory, working_directory)
+    assert get_imported_files(capsys.readouterr().out) == ["owlAC.owl", "Stimulus.owl"]
+
+    # Unchanged files reuse the classes mapped by the previous run.
+    assert generate_types_from_owl(owl_directory, working_directory) == graphql_types
+    output = capsys.readouterr().out
+    assert get_imported_files(output) == []
+    assert output.count("unchanged, reusing mapped classes") == 2
+
+    # Without the manifest the files are mapped again, from the ontologies already in the quadstore.
+    os.remove(os.path.join(working_directory, ".generation_manifest.json"))
+    assert generate_types_from_owl(owl_directory, working_directory) == graphql_types
+    assert get_imported_files(capsys.readouterr().out) == []
+
+
+def test_only_changed_ontologies_are_imported_again(owl_directory, tmp_path, capsys):
+    working_directory = str(tmp_path / "generation")
+    generate_types_from_owl(owl_directory, working_directory)
+    capsys.readouterr()
+
+    stimulus_file_path = os.path.join(owl_directory, "Stimulus.owl")
+    with open(stimulus_file_path) as stimulus_file:
+        stimulus = stimulus_file.read()
+    with open(stimulus_file_path, 'w') as stimulus_file:
+        stimulus_file.write(stimulus.replace("</rdf:RDF>", "<owl:Class rdf:about=\"#Stimulus\"/>\n</rdf:RDF>"))
+
+    graphql_types = generate_types_from_owl(owl_directory, working_directory)
+    output = capsys.readouterr().out
+    assert get_imported_files(output) == ["Stimulus.owl"]
+    assert "Processing OWL file: " + os.path.join(owl_directory, "owlAC.owl") not in output
+    assert [graphql_type["name"] for graphql_type in graphql_types if graphql_type["module"] == "stimulus"] == [
+        "Stimulus", "Observation"]
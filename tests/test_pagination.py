@@ -0,0 +1,60 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from strawberry.types import ExecutionResult
+
+from main import schema
+from resolvers.loaders import create_loaders
+from resolvers.pagination import MAX_PAGE_SIZE
+from storage.sqlite_store import SQLiteStore
+from test_loaders import seed_participant_states
+
+PARTICIPANT_STATES_PAGE = """
+query($first: Int!, $after: String) {
+  participantStates(first: $first, after: $after) { edges { node { name } } pageInfo { hasNextPage endCursor } }
+}
+"""
+
+
+def read_pages(database_path: str, record_calls, first: int, pages: int) -> List[ExecutionResult]:
+    """
+    Reads the given number of pages of five participant states, each page starting after the end of the previous.
+    """
+    async def execute_queries() -> List[ExecutionResult]:
+        store = SQLiteStore(database_path=database_path)
+        await store.open()
+        try:
+            await seed_participant_states(store.create_repositories(), participants=1, participant_states=5)
+            repositories = record_calls(store.create_repositories())
+            results = []
+            after: Optional[str] = None
+            for _ in range(pages):
+                results.append(await schema.execute(PARTICIPANT_STATES_PAGE,
+                                                    variable_values={"first": first, "after": after},
+                                                    context_value={"repositories": repositories,
+                                                                   "loaders": create_loaders(repositories)}))
+                after = results[-1].data["participantStates"]["pageInfo"]["endCursor"] if results[-1].data else None
+            return results
+        finally:
+            await store.close()
+    return asyncio.run(execute_queries())
+
+
+def get_connection(result: ExecutionResult) -> Dict:
+    assert result.errors is None, result.errors
+    return result.data["participantStates"]
+
+
+def test_pages_are_read_with_keyset_queries(database_path, record_calls, repository_calls):
+    connections = [get_connection(result) for result in read_pages(database_path, record_calls, first=2, pages=3)]
+    names = [edge["node"]["name"] for connection in connections for edge in connection["edges"]]
+    assert sorted(names) == [f"state-{index}" for index in range(5)]
+    assert [connection["pageInfo"]["hasNextPage"] for connection in connections] == [True, True, False]
+    # Every page reads one row more than it returns, never the whole table.
+    assert [arguments[1] for _, method, arguments in repository_calls if method == "get_page"] == [3, 3, 3]
+
+
+def test_page_size_above_the_maximum_is_rejected(database_path, record_calls, repository_calls):
+    [result] = read_pages(database_path, record_calls, first=MAX_PAGE_SIZE + 1, pages=1)
+    assert [error.message for error in result.errors] == [f"first must be between 0 and {MAX_PAGE_SIZE}"]
+    assert repository_calls == []
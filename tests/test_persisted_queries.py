@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from extensions import document_cache, persisted_queries
+from extensions.document_cache import get_query_hash
+from extensions.lru_cache import LRUCache
+from extensions.persisted_queries import PersistedQueryError, resolve_persisted_query
+from main import schema
+from resolvers.loaders import create_loaders
+from storage.sqlite_store import SQLiteStore
+
+QUERY = "{ participantStates(first: 1) { edges { node { name } } } }"
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    monkeypatch.setattr(persisted_queries, "persisted_queries", LRUCache(maxsize=10))
+    monkeypatch.setattr(document_cache, "document_cache", LRUCache(maxsize=10))
+
+
+def get_persisted_query_request(query_hash: str, query: str = None) -> dict:
+    request = {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": query_hash}}}
+    return {**request, "query": query} if query is not None else request
+
+
+def test_query_registered_with_its_hash_is_resolved_from_the_hash_alone():
+    with pytest.raises(PersistedQueryError, match="PersistedQueryNotFound"):
+        resolve_persisted_query(get_persisted_query_request(get_query_hash(QUERY)))
+    resolve_persisted_query(get_persisted_query_request(get_query_hash(QUERY), QUERY))
+    assert resolve_persisted_query(get_persisted_query_request(get_query_hash(QUERY)))["query"] == QUERY
+
+
+def test_query_not_matching_its_hash_is_not_registered():
+    with pytest.raises(PersistedQueryError, match="provided sha does not match query"):
+        resolve_persisted_query(get_persisted_query_request(get_query_hash("{ other }"), QUERY))
+    assert persisted_queries.persisted_queries.entries == {}
+
+
+def test_valid_documents_are_parsed_once(database_path):
+    async def execute_queries():
+        store = SQLiteStore(database_path=database_path)
+        await store.open()
+        try:
+            repositories = store.create_repositories()
+            return [await schema.execute(query, context_value={"repositories": repositories,
+                                                               "loaders": create_loaders(repositories)})
+                    for query in (QUERY, QUERY, "{ unknownField }", "{ unknownField }")]
+        finally:
+            await store.close()
+
+    results = asyncio.run(execute_queries())
+    assert [result.errors is None for result in results] == [True, True, False, False]
+    # Invalid documents are never cached, so they are validated again.
+    assert list(document_cache.document_cache.entries) == [get_query_hash(QUERY)]
+    assert document_cache.document_cache.hits == 1
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Dict, List, Tuple
+
+import pytest
+
+from main import schema
+from resolvers import projection
+from resolvers.loaders import create_loaders
+from storage.sqlite_store import SQLiteStore
+from test_loaders import seed_participant_states
+
+PARTICIPANT_STATES_QUERY = "{ participantStates(first: 4) { edges { node { name hasParticipant { name } } } } }"
+
+
+@pytest.fixture(autouse=True)
+def projection_pushdown(monkeypatch):
+    monkeypatch.setattr(projection, "PROJECTION_PUSHDOWN", True)
+
+
+def get_read_columns(repository_calls: List[Tuple[str, str, tuple]]) -> Dict[str, set]:
+    # Every read takes the columns to read as its last argument, None standing for every column.
+    read_columns = {}
+    for repository, _, arguments in repository_calls:
+        read_columns.setdefault(repository, set()).update(arguments[-1] if arguments[-1] is not None else {"*"})
+    return read_columns
+
+
+def test_repository_reads_only_the_columns_of_the_selected_fields(database_path, record_calls, repository_calls):
+    async def execute_query(query: str):
+        store = SQLiteStore(database_path=database_path)
+        await store.open()
+        try:
+            await seed_participant_states(store.create_repositories(), participants=2, participant_states=4)
+            repositories = record_calls(store.create_repositories())
+            return await schema.execute(query, context_value={"repositories": repositories,
+                                                              "loaders": create_loaders(repositories)})
+        finally:
+            await store.close()
+
+    result = asyncio.run(execute_query(PARTICIPANT_STATES_QUERY))
+    assert result.errors is None
+    assert get_read_columns(repository_calls) == {"participant_state": {"id", "name", "participant_id"},
+                                                  "participant": {"id", "name"}}
+
+
+def test_generated_repository_reads_only_the_columns_of_the_selected_fields(generated_server, record_table_calls,
+                                                                            repository_calls):
+    async def check():
+        repositories = await generated_server.create_dataset("dataset-a")
+        await repositories["activity"].create_many([{"name": "activity", "additional_parameters": (("key", "value"),),
+                                                     "duration": 1.5}])
+        repository_calls.clear()
+        assert await generated_server.execute(
+            '{ getActivity(datasetContext: {name: "dataset-a"}, name: "activity") { name duration } }') == {
+            "getActivity": {"name": "activity", "duration": 1.5}}
+        assert get_read_columns(repository_calls) == {"activity": {"id", "name", "duration"}}
+
+    generated_server.partitions.wrap_repositories = record_table_calls
+    generated_server.run(check)
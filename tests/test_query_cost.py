@@ -0,0 +1,67 @@
+import asyncio
+import re
+from typing import Dict
+
+from strawberry.types import ExecutionResult
+
+from extensions.query_cost import MAX_QUERY_COST
+from main import schema
+from resolvers.loaders import create_loaders
+from resolvers.pagination import MAX_PAGE_SIZE
+from storage.sqlite_store import SQLiteStore
+
+# Costs 10 for the connection and 3 for every node it may return.
+NAMES_PAGE = "{ edges { node { name } } }"
+WIDE_PAGE = ("{ edges { node { name additionalParameters { key value } "
+             "hasParticipant { name additionalParameters { key value } } } } }")
+
+
+def execute(database_path: str, query: str, variables: Dict = None) -> ExecutionResult:
+    async def execute_query() -> ExecutionResult:
+        store = SQLiteStore(database_path=database_path)
+        await store.open()
+        try:
+            repositories = store.create_repositories()
+            return await schema.execute(query, variable_values=variables, context_value={
+                "repositories": repositories, "loaders": create_loaders(repositories)})
+        finally:
+            await store.close()
+    return asyncio.run(execute_query())
+
+
+def get_requested_cost(result: ExecutionResult) -> int:
+    return result.extensions["cost"]["requestedQueryCost"]
+
+
+def assert_rejected(result: ExecutionResult):
+    # Rejected operations are not executed, so none of their fields run.
+    assert result.data is None
+    [error] = result.errors
+    match = re.fullmatch(rf"Query cost (\d+) exceeds the maximum allowed cost {MAX_QUERY_COST}", error.message)
+    assert match is not None and int(match.group(1)) > MAX_QUERY_COST
+
+
+def test_operation_above_the_cost_budget_is_rejected(database_path):
+    pages = " ".join(f"page{index}: participantStates(first: {MAX_PAGE_SIZE}) {WIDE_PAGE}" for index in range(3))
+    assert_rejected(execute(database_path, f"{{ {pages} }}"))
+
+
+def test_negative_page_size_does_not_lower_the_cost(database_path):
+    pages = " ".join(f"page{index}: participantStates(first: {MAX_PAGE_SIZE}) {WIDE_PAGE}" for index in range(3))
+    assert_rejected(execute(database_path, f"{{ {pages} negative: participantStates(first: -1000) {WIDE_PAGE} }}"))
+
+    result = execute(database_path, f"{{ participantStates(first: -1000) {NAMES_PAGE} }}")
+    assert get_requested_cost(result) == 10
+
+
+def test_non_integer_page_size_is_counted_as_the_largest_page(database_path):
+    result = execute(database_path, f"query($first: Int) {{ participantStates(first: $first) {NAMES_PAGE} }}",
+                     {"first": "x"})
+    assert get_requested_cost(result) == 10 + 3 * MAX_PAGE_SIZE
+    assert [error.message for error in result.errors] == [
+        "Variable '$first' got invalid value 'x'; Int cannot represent non-integer value: 'x'"]
+
+
+def test_missing_page_size_variable_is_counted_as_the_largest_page(database_path):
+    result = execute(database_path, f"query($first: Int) {{ participantStates(first: $first) {NAMES_PAGE} }}")
+    assert get_requested_cost(result) == 10 + 3 * MAX_PAGE_SIZE
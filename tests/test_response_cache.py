@@ -0,0 +1,97 @@
+from extensions import response_cache
+
+THING_QUERY = """
+query($dataset: String!, $id: String) {
+  getThing(datasetContext: {name: $dataset}, Id: $id) { name }
+}
+"""
+UPDATE_ENTITY = """
+mutation($dataset: String!, $id: ID!) {
+  updateEntityBatch(datasetContext: {name: $dataset}, items: [{id: $id, name: "renamed"}]) { id error }
+}
+"""
+
+
+async def create_activity(generated_server, dataset: str) -> str:
+    await generated_server.create_dataset(dataset)
+    created = await generated_server.execute(
+        'mutation($dataset: String!) { createActivity(datasetContext: {name: $dataset}, name: "walk", duration: 1.0) }',
+        dataset=dataset)
+    return created["createActivity"]
+
+
+def test_change_through_an_interface_invalidates_the_cached_results_of_its_dataset(generated_server,
+                                                                                    response_cache_backend):
+    async def check():
+        activity_a = await create_activity(generated_server, "dataset-a")
+        activity_b = await create_activity(generated_server, "dataset-b")
+        for dataset, activity_id in (("dataset-a", activity_a), ("dataset-b", activity_b)):
+            assert await generated_server.execute(THING_QUERY, dataset=dataset, id=activity_id) == {
+                "getThing": {"name": "walk"}}
+        assert await generated_server.execute(THING_QUERY, dataset="dataset-a", id=activity_a) == {
+            "getThing": {"name": "walk"}}
+        assert response_cache_backend.hits == 1
+
+        assert await generated_server.execute(UPDATE_ENTITY, dataset="dataset-a", id=activity_a) == {
+            "updateEntityBatch": [{"id": activity_a, "error": None}]}
+        assert response_cache_backend.invalidations == 1
+        assert await generated_server.execute(THING_QUERY, dataset="dataset-a", id=activity_a) == {
+            "getThing": {"name": "renamed"}}
+        # The result cached for the other dataset is still served.
+        assert await generated_server.execute(THING_QUERY, dataset="dataset-b", id=activity_b) == {
+            "getThing": {"name": "walk"}}
+        assert response_cache_backend.hits == 2
+
+    generated_server.run(check)
+
+
+def test_change_of_a_referenced_object_invalidates_the_results_it_filtered_or_was_selected_in(generated_server):
+    async def check():
+        activity = await create_activity(generated_server, "dataset-a")
+        await generated_server.execute("""mutation($activity: ID!) {
+          createActivityExecution(datasetContext: {name: "dataset-a"}, name: "execution",
+                                  hasActivity: {id: $activity})
+        }""", activity=activity)
+        by_reference = """{
+          getActivityExecution(datasetContext: {name: "dataset-a"}, hasActivity: {name: "walk"}) { name }
+        }"""
+        nested = """{
+          getActivityExecution(datasetContext: {name: "dataset-a"}, name: "execution") { hasActivity { name } }
+        }"""
+        assert await generated_server.execute(by_reference) == {"getActivityExecution": {"name": "execution"}}
+        assert await generated_server.execute(nested) == {"getActivityExecution": {"hasActivity": {"name": "walk"}}}
+
+        await generated_server.execute(
+            'mutation($id: String!) { updateActivity(datasetContext: {name: "dataset-a"}, Id: $id, name: "run") }',
+            id=activity)
+        assert await generated_server.execute(by_reference) == {"getActivityExecution": None}
+        assert await generated_server.execute(nested) == {"getActivityExecution": {"hasActivity": {"name": "run"}}}
+
+    generated_server.run(check)
+
+
+def test_results_are_not_cached_in_memory_of_one_of_several_workers(generated_server, response_cache_backend,
+                                                                     monkeypatch):
+    monkeypatch.setattr(response_cache, "WORKER_COUNT", 2)
+
+    async def check():
+        activity = await create_activity(generated_server, "dataset-a")
+        for _ in range(2):
+            assert await generated_server.execute(THING_QUERY, dataset="dataset-a", id=activity) == {
+                "getThing": {"name": "walk"}}
+        assert response_cache_backend.entries == {}
+
+    generated_server.run(check)
+
+
+def test_deleted_dataset_leaves_no_cached_results(generated_server):
+    async def check():
+        activity = await create_activity(generated_server, "dataset-a")
+        await generated_server.execute(THING_QUERY, dataset="dataset-a", id=activity)
+        await generated_server.execute('mutation { deleteDataset(name: "dataset-a") }')
+
+        # A dataset created again under the same name starts empty.
+        await generated_server.execute('mutation { createDataset(name: "dataset-a") }')
+        assert await generated_server.execute(THING_QUERY, dataset="dataset-a", id=activity) == {"getThing": None}
+
+    generated_server.run(check)
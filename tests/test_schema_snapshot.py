@@ -0,0 +1,30 @@
+import pytest
+
+import schema_snapshot
+from schema_snapshot import GENERATED_SCHEMA_SNAPSHOT_FILE_PATH, verify_schema_snapshot
+
+
+@pytest.fixture
+def snapshot_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_snapshot_is_not_verified_at_startup_by_default(generated_schema, snapshot_directory):
+    assert schema_snapshot.VERIFY_SCHEMA_SNAPSHOT is False
+    (snapshot_directory / GENERATED_SCHEMA_SNAPSHOT_FILE_PATH).write_text("type Query { stale: Int }\n")
+    verify_schema_snapshot(generated_schema)
+
+
+def test_enabled_verification_rejects_a_schema_not_matching_the_snapshot(generated_schema, snapshot_directory,
+                                                                          monkeypatch):
+    monkeypatch.setattr(schema_snapshot, "VERIFY_SCHEMA_SNAPSHOT", True)
+    with pytest.raises(Exception, match="not found"):
+        verify_schema_snapshot(generated_schema)
+
+    (snapshot_directory / GENERATED_SCHEMA_SNAPSHOT_FILE_PATH).write_text("type Query { stale: Int }\n")
+    with pytest.raises(Exception, match="does not match the snapshot"):
+        verify_schema_snapshot(generated_schema)
+
+    (snapshot_directory / GENERATED_SCHEMA_SNAPSHOT_FILE_PATH).write_text(generated_schema.as_str() + "\n")
+    verify_schema_snapshot(generated_schema)